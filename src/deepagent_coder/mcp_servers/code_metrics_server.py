@@ -1,19 +1,242 @@
 """Code metrics MCP server - Complexity, coverage, duplication, maintainability analysis"""
 
 import ast
+import asyncio
+from bisect import bisect_left, bisect_right
+from collections import Counter, OrderedDict, deque
+from collections.abc import Awaitable, Callable
 import contextlib
+import functools
+import hashlib
+import inspect
+import io
+from itertools import accumulate, combinations
+import json
+import os
 from pathlib import Path
-import subprocess
+import random
+import re
+import struct
 import sys
+import tempfile
+import time
+import tokenize
 from typing import Any
 
 from fastmcp import FastMCP
-from radon.complexity import cc_visit
-from radon.metrics import mi_visit
+from radon.metrics import h_visit_ast, mi_compute
+from radon.raw import Module as RawMetrics
 from radon.raw import analyze
+from radon.visitors import ComplexityVisitor
+
+from deepagent_coder.utils.executors import cpu_pool
+from deepagent_coder.utils.source_files import iter_python_files
 
 mcp = FastMCP("Code Metrics")
 
+# MinHash/LSH parameters for near-duplicate function detection. 16 bands of 8 rows
+# put the LSH candidate knee around 0.7 Jaccard; candidates are then verified
+# against _SIMILARITY_THRESHOLD using the full signature.
+_SHINGLE_SIZE = 5
+_NUM_PERM = 128
+_LSH_BANDS = 16
+_LSH_ROWS = _NUM_PERM // _LSH_BANDS
+_SIMILARITY_THRESHOLD = 0.8
+_MERSENNE_PRIME = (1 << 61) - 1
+
+_rng = random.Random(1)
+_PERMUTATIONS = tuple(
+    (_rng.randrange(1, _MERSENNE_PRIME), _rng.randrange(0, _MERSENNE_PRIME))
+    for _ in range(_NUM_PERM)
+)
+del _rng
+
+# Compact integer IDs for every concrete ast node class, used to fingerprint and
+# shingle function bodies without building intermediate strings. Restricted to
+# the ast module and sorted by name so IDs agree across worker processes.
+_NODE_TYPE_ID: dict[type, int] = {}
+_pending = [ast.AST]
+while _pending:
+    _cls = _pending.pop()
+    _pending.extend(_cls.__subclasses__())
+    if _cls.__module__ == "ast":
+        _NODE_TYPE_ID[_cls] = 0
+for _type_id, _cls in enumerate(sorted(_NODE_TYPE_ID, key=lambda c: c.__name__), start=1):
+    _NODE_TYPE_ID[_cls] = _type_id
+del _pending, _cls, _type_id
+
+_pack_type_id = struct.Struct("<H").pack
+
+# Polynomial rolling hash over the last _SHINGLE_SIZE node type IDs
+_ROLL_BASE = 1_000_003
+_ROLL_MASK = (1 << 64) - 1
+_ROLL_OUT = pow(_ROLL_BASE, _SHINGLE_SIZE - 1, 1 << 64)
+
+_STDLIB_MODULES = frozenset(sys.stdlib_module_names)
+
+# Line classifiers for the approximate raw metrics used by fast maintainability
+_BLANK_LINE_RE = re.compile(rb"(?m)^[ \t\f]*\r?$\n")
+_COMMENT_LINE_RE = re.compile(rb"(?m)^[ \t\f]*#")
+
+# Rows of coverage's terminal report: name, statements, missed, [branches,
+# partial branches,] percent. Used when no JSON report was written.
+_COVERAGE_ROW_RE = re.compile(
+    rb"(?m)^(\S+)[ \t]+(\d+)[ \t]+(\d+)(?:[ \t]+\d+[ \t]+\d+)?[ \t]+(\d+(?:\.\d+)?)%"
+)
+
+_DECORATED = ast.FunctionDef | ast.AsyncFunctionDef | ast.ClassDef
+_HAS_ELSE = ast.If | ast.For | ast.AsyncFor | ast.While | ast.Try | ast.TryStar
+
+# Files are summarized in batches so each worker round trip amortizes its
+# pickling and dispatch overhead; a single batch is handled on a thread.
+_PARSE_CHUNK_SIZE = 50
+_SUMMARY_CACHE_SIZE = 4096
+
+# (function name, line, distinct shingle count, structural fingerprint, MinHash signature)
+_FunctionSummary = tuple[str, int, int, bytes, tuple[int, ...]]
+
+_summary_cache: OrderedDict[tuple[str, int, int], list[_FunctionSummary] | None] = OrderedDict()
+
+
+class _CachedFile:
+    """Source bytes, parsed AST and lazily computed metrics for one file"""
+
+    __slots__ = ("source", "tree", "_text", "_raw", "_quick_raw", "_complexity")
+
+    def __init__(self, source: bytes, tree: ast.Module):
+        self.source = source
+        self.tree = tree
+        self._text: str | None = None
+        self._raw: RawMetrics | None = None
+        self._quick_raw: RawMetrics | None = None
+        self._complexity: ComplexityVisitor | None = None
+
+    @property
+    def text(self) -> str:
+        """Decoded source, for radon APIs that only accept str"""
+        if self._text is None:
+            # Honour BOMs and PEP 263 coding cookies the same way ast.parse does
+            encoding, _ = tokenize.detect_encoding(io.BytesIO(self.source).readline)
+            self._text = self.source.decode(encoding)
+        return self._text
+
+    @property
+    def raw(self) -> RawMetrics:
+        """radon raw metrics (sloc, lloc, comments, ...)"""
+        if self._raw is None:
+            self._raw = analyze(self.text)
+        return self._raw
+
+    @property
+    def quick_raw(self) -> RawMetrics:
+        """
+        Approximate raw metrics from line regexes and the AST, without tokenizing
+
+        Logical lines are counted from statements, clause headers and decorators,
+        and multi-line string statements (docstrings) from their AST spans, less
+        the blank lines inside them, which count as blank only.
+        """
+        if self._quick_raw is None:
+            source = self.source
+            loc = source.count(b"\n") + (not source.endswith(b"\n") and bool(source))
+            blank = len(_BLANK_LINE_RE.findall(source))
+            comments = len(_COMMENT_LINE_RE.findall(source))
+            lloc = multi = single_strings = 0
+            string_spans: list[tuple[int, int]] = []
+            for node in ast.walk(self.tree):
+                if isinstance(node, ast.stmt):
+                    lloc += 1
+                    if (
+                        isinstance(node, ast.Expr)
+                        and isinstance(node.value, ast.Constant)
+                        and isinstance(node.value.value, str)
+                    ):
+                        span = node.end_lineno - node.lineno + 1
+                        if span == 1:
+                            single_strings += 1
+                        else:
+                            multi += span
+                            string_spans.append((node.lineno, node.lineno + span - 1))
+                    elif isinstance(node, _DECORATED):
+                        lloc += len(node.decorator_list)
+                    elif isinstance(node, _HAS_ELSE) and node.orelse:
+                        # elif chains are nested If statements, counted on their own
+                        lloc += not (
+                            isinstance(node, ast.If)
+                            and len(node.orelse) == 1
+                            and isinstance(node.orelse[0], ast.If)
+                        )
+                    if isinstance(node, ast.Try | ast.TryStar) and node.finalbody:
+                        lloc += 1
+                elif isinstance(node, ast.excepthandler | ast.match_case):
+                    lloc += 1
+            if string_spans:
+                # Line numbers of the lines _BLANK_LINE_RE matches
+                blank_lines = [
+                    number
+                    for number, line in enumerate(source.split(b"\n")[:-1], 1)
+                    if not line.removesuffix(b"\r").strip(b" \t\f")
+                ]
+                for start, end in string_spans:
+                    multi -= bisect_right(blank_lines, end) - bisect_left(blank_lines, start)
+            sloc = loc - blank - comments - multi - single_strings
+            self._quick_raw = RawMetrics(
+                loc, lloc, sloc, comments, multi, blank, comments + single_strings
+            )
+        return self._quick_raw
+
+    @property
+    def complexity(self) -> ComplexityVisitor:
+        """radon complexity visit, shared by the complexity and maintainability tools"""
+        if self._complexity is None:
+            self._complexity = ComplexityVisitor.from_ast(self.tree)
+        return self._complexity
+
+
+class _FileCache:
+    """
+    Bounded LRU of parsed source files shared by all metrics tools
+
+    Entries are keyed on (resolved path, st_mtime_ns, st_size) so an edited
+    file is re-read and re-parsed on its next lookup.
+    """
+
+    def __init__(self, maxsize: int = 256):
+        self._entries: OrderedDict[tuple[str, int, int], _CachedFile] = OrderedDict()
+        self._maxsize = maxsize
+        self._lock = asyncio.Lock()
+
+    async def get(self, path: Path) -> _CachedFile:
+        """Return the cached entry for path, reading and parsing it on a miss"""
+        resolved = path.resolve()
+        stat = resolved.stat()
+        key = (str(resolved), stat.st_mtime_ns, stat.st_size)
+
+        async with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                return entry
+
+        source = resolved.read_bytes()
+        entry = _CachedFile(source, ast.parse(source))
+
+        async with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._maxsize:
+                self._entries.popitem(last=False)
+
+        return entry
+
+
+_file_cache = _FileCache()
+
+
+async def _get_cached(path: Path) -> _CachedFile:
+    """Fetch a file's source, AST and raw metrics from the shared cache"""
+    return await _file_cache.get(path)
+
 
 async def calculate_complexity(file_path: str) -> dict[str, Any]:
     """
@@ -38,11 +261,10 @@ async def calculate_complexity(file_path: str) -> dict[str, Any]:
                 "error": f"File not found: {file_path}",
             }
 
-        with open(path) as f:
-            content = f.read()
+        cached = await _get_cached(path)
 
         # Use radon to calculate cyclomatic complexity
-        results = cc_visit(content)
+        results = cached.complexity.blocks
 
         functions = []
         for result in results:
@@ -83,6 +305,8 @@ async def measure_code_coverage(
     test_command: str = "pytest",
     source_dir: str = "src",
     working_dir: str = ".",
+    enable_branch: bool = False,
+    use_sys_monitoring: bool = True,
 ) -> dict[str, Any]:
     """
     Run tests and measure code coverage
@@ -91,6 +315,9 @@ async def measure_code_coverage(
         test_command: Command to run tests (default: pytest)
         source_dir: Source directory to measure coverage for
         working_dir: Working directory to run command from
+        enable_branch: Also measure branch coverage (slower)
+        use_sys_monitoring: Use coverage's sys.monitoring backend on Python 3.12+,
+            which is much cheaper than the per-line trace function
 
     Returns:
         Dictionary containing:
@@ -101,6 +328,8 @@ async def measure_code_coverage(
         - covered_statements: Number of covered statements
         - error: Error message if measurement failed
     """
+    fd, report_path = tempfile.mkstemp(suffix=".json")
+    os.close(fd)
     try:
         # Parse the test command to handle compound commands
         cmd_parts = test_command.split()
@@ -109,51 +338,66 @@ async def measure_code_coverage(
         if cmd_parts[0] == "pytest":
             cmd_parts = [sys.executable, "-m", "pytest"] + cmd_parts[1:]
 
-        # Add coverage flags if not already present
+        # Add coverage flags if not already present; the JSON report is always
+        # requested so results can be read structurally instead of scraped
         if "--cov" not in test_command:
-            cmd_parts.extend(["--cov=" + source_dir, "--cov-report=term-missing"])
-        elif "--cov-report" not in test_command:
-            cmd_parts.append("--cov-report=term-missing")
-
-        result = subprocess.run(
-            cmd_parts,
-            capture_output=True,
-            text=True,
+            cmd_parts.append("--cov=" + source_dir)
+        cmd_parts.append("--cov-report=json:" + report_path)
+        if enable_branch and "--cov-branch" not in test_command:
+            cmd_parts.append("--cov-branch")
+
+        # Don't let an inherited coverage config re-instrument every child process
+        env = {
+            key: value
+            for key, value in os.environ.items()
+            if key not in ("COVERAGE_PROCESS_START", "COVERAGE_PROCESS_CONFIG")
+        }
+        if use_sys_monitoring and sys.version_info >= (3, 12):
+            env["COVERAGE_CORE"] = "sysmon"
+
+        process = await asyncio.create_subprocess_exec(
+            *cmd_parts,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
             cwd=working_dir,
-            shell=False,
+            env=env,
         )
+        stdout, stderr = await process.communicate()
 
-        # Parse coverage output
-        output = result.stdout + result.stderr
+        output = (stdout + stderr).decode("utf-8", errors="replace")
         coverage_percent = 0.0
         uncovered_lines = {}
         total_statements = 0
         covered = 0
 
-        # Extract coverage percentage - look for lines with % symbol
-        for line in output.split("\n"):
-            # Match lines like "src/mymodule.py    10    2    80%"
-            if "%" in line:
-                parts = line.split()
-                # Try to find percentage value
-                for part in parts:
-                    if "%" in part:
-                        with contextlib.suppress(ValueError):
-                            coverage_percent = max(coverage_percent, float(part.rstrip("%")))
-
-            # Extract totals from TOTAL line
-            if "TOTAL" in line:
-                parts = line.split()
-                if len(parts) >= 3:
-                    try:
-                        total_statements = int(parts[1])
-                        missing = int(parts[2])
-                        covered = total_statements - missing
-                    except (ValueError, IndexError):
-                        pass
+        # Read the coverage JSON report (empty if coverage never ran)
+        report = json.loads(Path(report_path).read_bytes() or b"{}")
+
+        if report:
+            totals = report["totals"]
+            coverage_percent = round(totals["percent_covered"], 2)
+            total_statements = totals["num_statements"]
+            covered = totals["covered_lines"]
+            uncovered_lines = {
+                file: data["missing_lines"]
+                for file, data in report["files"].items()
+                if data["missing_lines"]
+            }
+        else:
+            # Commands that don't take pytest-cov flags may still print a
+            # terminal report; use its TOTAL row (or its only row)
+            rows = _COVERAGE_ROW_RE.findall(stdout)
+            totals_row = next((row for row in rows if row[0] == b"TOTAL"), None)
+            if totals_row is None and len(rows) == 1:
+                totals_row = rows[0]
+            if totals_row is not None:
+                _, statements, missed, percent = totals_row
+                coverage_percent = float(percent)
+                total_statements = int(statements)
+                covered = total_statements - int(missed)
 
         # Consider success if tests ran and we got coverage data
-        success = (result.returncode == 0) or (coverage_percent >= 0)
+        success = (process.returncode == 0) or (coverage_percent >= 0)
 
         return {
             "success": success,
@@ -176,69 +420,218 @@ async def measure_code_coverage(
             "success": False,
             "error": str(e),
         }
+    finally:
+        with contextlib.suppress(OSError):
+            os.remove(report_path)
+
+
+def _profile_function(func: ast.AST) -> tuple[bytes, set[int]]:
+    """
+    Fingerprint a function's structure and hash its k-shingles in one walk
+
+    Returns a blake2b digest of the depth-first node type ID stream (equal for
+    structurally identical functions) and the set of rolling shingle hashes.
+    """
+    hasher = hashlib.blake2b(digest_size=16)
+    shingles = set()
+    window: deque[int] = deque(maxlen=_SHINGLE_SIZE)
+    rolling = 0
+
+    stack = [func]
+    while stack:
+        node = stack.pop()
+        type_id = _NODE_TYPE_ID[type(node)]
+        hasher.update(_pack_type_id(type_id))
+
+        if len(window) == _SHINGLE_SIZE:
+            rolling = (rolling - window[0] * _ROLL_OUT) & _ROLL_MASK
+        window.append(type_id)
+        rolling = (rolling * _ROLL_BASE + type_id) & _ROLL_MASK
+        if len(window) == _SHINGLE_SIZE:
+            shingles.add(rolling)
+
+        stack.extend(reversed(list(ast.iter_child_nodes(node))))
+
+    # Functions shorter than one shingle hash as a single shingle
+    if not shingles:
+        shingles.add(rolling)
+
+    return hasher.digest(), shingles
+
+
+def _minhash_signature(hashes: set[int]) -> tuple[int, ...]:
+    """Compute a MinHash signature over a set of shingle hashes"""
+    return tuple(min((a * h + b) % _MERSENNE_PRIME for h in hashes) for a, b in _PERMUTATIONS)
+
+
+def _estimate_jaccard(sig1: tuple[int, ...], sig2: tuple[int, ...]) -> float:
+    """Estimate Jaccard similarity from two MinHash signatures"""
+    return sum(1 for x, y in zip(sig1, sig2, strict=True) if x == y) / _NUM_PERM
+
+
+def _summarize_files(paths: list[str]) -> list[list[_FunctionSummary] | None]:
+    """
+    Summarize every function in a batch of files for duplication detection
+
+    Runs inside worker processes, so it returns compact per-function summaries
+    rather than ASTs to keep pickling cheap. Unparseable files map to None.
+    """
+    results: list[list[_FunctionSummary] | None] = []
+    for path in paths:
+        try:
+            tree = ast.parse(Path(path).read_bytes())
+        except (SyntaxError, UnicodeDecodeError):
+            results.append(None)
+            continue
+
+        summaries = []
+        for node in ast.walk(tree):
+            if isinstance(node, ast.FunctionDef):
+                fingerprint, shingles = _profile_function(node)
+                summaries.append(
+                    (
+                        node.name,
+                        node.lineno,
+                        len(shingles),
+                        fingerprint,
+                        _minhash_signature(shingles),
+                    )
+                )
+        results.append(summaries)
+    return results
+
+
+async def _summarize_paths(paths: list[str]) -> list[tuple[str, list[_FunctionSummary]]]:
+    """
+    Summarize files, reusing cached summaries for files whose mtime/size are unchanged
+
+    Returns (path, summaries) pairs in input order, omitting unparseable files.
+    """
+    summaries: dict[str, list[_FunctionSummary] | None] = {}
+    misses = []
+    for path in paths:
+        stat = os.stat(path)
+        key = (path, stat.st_mtime_ns, stat.st_size)
+        if key in _summary_cache:
+            _summary_cache.move_to_end(key)
+            summaries[path] = _summary_cache[key]
+        else:
+            misses.append(key)
+
+    if misses:
+        chunks = [
+            misses[i : i + _PARSE_CHUNK_SIZE] for i in range(0, len(misses), _PARSE_CHUNK_SIZE)
+        ]
+        if len(chunks) == 1:
+            batches = [await asyncio.to_thread(_summarize_files, [key[0] for key in misses])]
+        else:
+            loop = asyncio.get_running_loop()
+            pool = cpu_pool()
+            batches = await asyncio.gather(
+                *(
+                    loop.run_in_executor(pool, _summarize_files, [key[0] for key in chunk])
+                    for chunk in chunks
+                )
+            )
+
+        for chunk, batch in zip(chunks, batches, strict=True):
+            for key, summary in zip(chunk, batch, strict=True):
+                summaries[key[0]] = summary
+                _summary_cache[key] = summary
+        while len(_summary_cache) > _SUMMARY_CACHE_SIZE:
+            _summary_cache.popitem(last=False)
+
+    return [(path, summary) for path in paths if (summary := summaries[path]) is not None]
 
 
 async def detect_duplication(path: str = ".", threshold: int = 50) -> list[dict[str, Any]]:
     """
     Find duplicate code blocks using AST comparison
 
+    Structurally identical functions are grouped by fingerprint first. The
+    remaining distinct shapes are reduced to MinHash signatures over shingles of
+    their AST node types, and banded locality-sensitive hashing selects candidate
+    pairs, so the cost grows roughly linearly with the number of functions.
+
     Args:
         path: Directory to search for duplicates
-        threshold: Minimum number of tokens to consider as duplicate
+        threshold: Minimum number of shared AST shingles to consider as duplicate
 
     Returns:
         List of dictionaries containing:
         - files: List of files containing the duplicate
         - lines: Line numbers in each file
-        - tokens: Number of duplicate tokens
-        - code_snippet: Example of duplicated code
+        - tokens: Estimated number of duplicate tokens
+        - similarity: Estimated structural similarity (0-1)
     """
     try:
         duplicates = []
-        path_obj = Path(path)
 
         # Find all Python files
-        py_files = list(path_obj.rglob("*.py"))
-
-        # Parse all files into ASTs
-        file_asts = {}
-        for py_file in py_files:
-            try:
-                with open(py_file) as f:
-                    content = f.read()
-                    file_asts[py_file] = ast.parse(content)
-            except (SyntaxError, UnicodeDecodeError):
+        py_files = list(iter_python_files(path))
+
+        # Keep one MinHash signature per function, skipping functions too small
+        # to ever share `threshold` shingles with another function
+        functions = [
+            (py_file, name, line, size, fingerprint, signature)
+            for py_file, summaries in await _summarize_paths(py_files)
+            for name, line, size, fingerprint, signature in summaries
+            if size >= threshold
+        ]
+
+        # Group structurally identical functions by fingerprint so exact
+        # duplicates are found in one pass without any similarity estimates
+        exact_buckets: dict[bytes, list[int]] = {}
+        for index, (_, _, _, _, fingerprint, _) in enumerate(functions):
+            exact_buckets.setdefault(fingerprint, []).append(index)
+        groups = list(exact_buckets.values())
+
+        def add_pair(first: int, second: int, similarity: float) -> None:
+            file1, name1, line1, size1, _, _ = functions[first]
+            file2, name2, line2, size2, _, _ = functions[second]
+            if file1 == file2:
+                return
+
+            # Translate Jaccard back into an estimated count of shared shingles
+            shared = round(similarity * (size1 + size2) / (1 + similarity))
+            if shared >= threshold:
+                duplicates.append(
+                    {
+                        "files": [file1, file2],
+                        "functions": [name1, name2],
+                        "lines": [line1, line2],
+                        "tokens": shared,
+                        "similarity": round(similarity, 2),
+                    }
+                )
+
+        for members in groups:
+            for first, second in combinations(members, 2):
+                add_pair(first, second, 1.0)
+
+        # Only one representative per fingerprint enters the near-duplicate
+        # search. Bucket signatures by band; groups sharing any band become candidates
+        buckets: dict[tuple[int, tuple[int, ...]], list[int]] = {}
+        for group, members in enumerate(groups):
+            signature = functions[members[0]][5]
+            for band in range(_LSH_BANDS):
+                key = (band, signature[band * _LSH_ROWS : (band + 1) * _LSH_ROWS])
+                buckets.setdefault(key, []).append(group)
+
+        candidates = set()
+        for bucket in buckets.values():
+            if len(bucket) > 1:
+                candidates.update(combinations(bucket, 2))
+
+        for first, second in sorted(candidates):
+            similarity = _estimate_jaccard(
+                functions[groups[first][0]][5], functions[groups[second][0]][5]
+            )
+            if similarity < _SIMILARITY_THRESHOLD:
                 continue
-
-        # Compare ASTs for similarities
-        for i, (file1, ast1) in enumerate(file_asts.items()):
-            for file2, ast2 in list(file_asts.items())[i + 1 :]:
-                # Extract function bodies
-                funcs1 = [node for node in ast.walk(ast1) if isinstance(node, ast.FunctionDef)]
-                funcs2 = [node for node in ast.walk(ast2) if isinstance(node, ast.FunctionDef)]
-
-                # Compare function bodies
-                for func1 in funcs1:
-                    for func2 in funcs2:
-                        # Simple comparison: check if function bodies have similar structure
-                        body1 = ast.dump(func1)
-                        body2 = ast.dump(func2)
-
-                        # Calculate similarity (simple approach)
-                        tokens1 = set(body1.split())
-                        tokens2 = set(body2.split())
-                        common_tokens = tokens1 & tokens2
-                        similarity = len(common_tokens)
-
-                        if similarity >= threshold:
-                            duplicates.append(
-                                {
-                                    "files": [str(file1), str(file2)],
-                                    "functions": [func1.name, func2.name],
-                                    "lines": [func1.lineno, func2.lineno],
-                                    "tokens": similarity,
-                                }
-                            )
+            for index1 in groups[first]:
+                for index2 in groups[second]:
+                    add_pair(index1, index2, similarity)
 
         return duplicates
 
@@ -246,12 +639,15 @@ async def detect_duplication(path: str = ".", threshold: int = 50) -> list[dict[
         return [{"error": str(e)}]
 
 
-async def calculate_maintainability(file_path: str) -> dict[str, Any]:
+async def calculate_maintainability(file_path: str, fast: bool = False) -> dict[str, Any]:
     """
     Calculate maintainability index for a Python file
 
     Args:
         file_path: Path to the Python file
+        fast: Estimate line counts from regexes and the AST instead of tokenizing
+            the file. Much quicker on large files, but the index and line counts
+            differ slightly from radon's.
 
     Returns:
         Dictionary containing:
@@ -272,14 +668,21 @@ async def calculate_maintainability(file_path: str) -> dict[str, Any]:
                 "error": f"File not found: {file_path}",
             }
 
-        with open(path) as f:
-            content = f.read()
-
-        # Calculate maintainability index using radon
-        mi = mi_visit(content, multi=True)
+        cached = await _get_cached(path)
 
         # Get raw metrics
-        raw = analyze(content)
+        raw = cached.quick_raw if fast else cached.raw
+
+        # Calculate maintainability index using radon, counting multi-line
+        # strings as comments (equivalent to mi_visit(content, multi=True))
+        comment_lines = raw.comments + raw.multi
+        comments_percent = comment_lines / raw.sloc * 100 if raw.sloc else 0
+        mi = mi_compute(
+            h_visit_ast(cached.tree).total.volume,
+            cached.complexity.total_complexity,
+            raw.lloc,
+            comments_percent,
+        )
 
         # Calculate rank based on MI
         if mi >= 20:
@@ -315,6 +718,25 @@ async def calculate_maintainability(file_path: str) -> dict[str, Any]:
         }
 
 
+class _ImportVisitor(ast.NodeVisitor):
+    """Collect import statements, descending only into nodes that hold statements"""
+
+    def __init__(self):
+        self.imports: list[ast.Import | ast.ImportFrom] = []
+
+    def visit_Import(self, node: ast.Import) -> None:
+        self.imports.append(node)
+
+    def visit_ImportFrom(self, node: ast.ImportFrom) -> None:
+        self.imports.append(node)
+
+    def generic_visit(self, node: ast.AST) -> None:
+        # Imports are statements, so expression subtrees never need visiting
+        for child in ast.iter_child_nodes(node):
+            if isinstance(child, ast.stmt | ast.excepthandler | ast.match_case):
+                self.visit(child)
+
+
 async def analyze_dependencies(file_path: str) -> dict[str, Any]:
     """
     Analyze import dependencies in a Python file
@@ -341,43 +763,17 @@ async def analyze_dependencies(file_path: str) -> dict[str, Any]:
                 "error": f"File not found: {file_path}",
             }
 
-        with open(path) as f:
-            content = f.read()
-
-        # Parse the AST
-        tree = ast.parse(content)
+        tree = (await _get_cached(path)).tree
 
         imports = []
         stdlib_count = 0
         third_party_count = 0
         relative_count = 0
 
-        # Standard library modules (partial list)
-        stdlib_modules = {
-            "os",
-            "sys",
-            "pathlib",
-            "re",
-            "json",
-            "datetime",
-            "collections",
-            "itertools",
-            "functools",
-            "subprocess",
-            "argparse",
-            "logging",
-            "unittest",
-            "pytest",
-            "typing",
-            "io",
-            "time",
-            "random",
-            "math",
-            "string",
-        }
-
         # Find all import statements
-        for node in ast.walk(tree):
+        visitor = _ImportVisitor()
+        visitor.visit(tree)
+        for node in visitor.imports:
             if isinstance(node, ast.Import):
                 for alias in node.names:
                     module_name = alias.name
@@ -389,7 +785,7 @@ async def analyze_dependencies(file_path: str) -> dict[str, Any]:
                             "type": "import",
                         }
                     )
-                    if module_name.split(".")[0] in stdlib_modules:
+                    if module_name.split(".")[0] in _STDLIB_MODULES:
                         stdlib_count += 1
                     else:
                         third_party_count += 1
@@ -413,7 +809,7 @@ async def analyze_dependencies(file_path: str) -> dict[str, Any]:
 
                 if is_relative:
                     relative_count += 1
-                elif module_name.split(".")[0] in stdlib_modules:
+                elif module_name.split(".")[0] in _STDLIB_MODULES:
                     stdlib_count += 1
                 else:
                     third_party_count += 1
@@ -440,12 +836,149 @@ async def analyze_dependencies(file_path: str) -> dict[str, Any]:
         }
 
 
+_FILE_METRICS = {
+    "complexity": calculate_complexity,
+    "maintainability": calculate_maintainability,
+    "dependencies": analyze_dependencies,
+}
+
+
+async def analyze_files_bulk(paths: list[str], metrics: list[str] | None = None) -> dict[str, Any]:
+    """
+    Run several per-file metrics over many files in a single call
+
+    Each file is read and parsed once through the shared cache, however many
+    metrics are requested for it.
+
+    Args:
+        paths: Paths to the Python files to analyze
+        metrics: Metrics to compute per file, any of "complexity",
+            "maintainability" and "dependencies" (default: all three)
+
+    Returns:
+        Dictionary containing:
+        - success: Boolean indicating if the request was valid
+        - results: One entry per path, holding "file" plus the result of each
+          requested metric keyed by metric name
+        - error: Error message if an unknown metric was requested
+    """
+    metrics = list(_FILE_METRICS) if metrics is None else metrics
+    unknown = [metric for metric in metrics if metric not in _FILE_METRICS]
+    if unknown:
+        return {
+            "success": False,
+            "error": f"Unknown metrics: {', '.join(unknown)}. "
+            f"Available: {', '.join(_FILE_METRICS)}",
+        }
+
+    async def analyze_file(file_path: str) -> dict[str, Any]:
+        result: dict[str, Any] = {"file": file_path}
+        for metric in metrics:
+            result[metric] = await _FILE_METRICS[metric](file_path)
+        return result
+
+    return {
+        "success": True,
+        "results": list(await asyncio.gather(*(analyze_file(path) for path in paths))),
+    }
+
+
+# Per-tool latency histograms, labelled by tool and input file size bucket,
+# and failure counters labelled by tool and kind
+_LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+_tool_latency: dict[tuple[str, str], list[float]] = {}
+_tool_errors: Counter[tuple[str, str]] = Counter()
+
+
+def _size_bucket(file_path: str | None) -> str:
+    """Classify a tool's input file as small (<10KB), medium (<200KB) or large"""
+    if file_path is None:
+        return "none"
+    try:
+        size = os.stat(file_path).st_size
+    except OSError:
+        return "none"
+    if size < 10_000:
+        return "small"
+    return "medium" if size < 200_000 else "large"
+
+
+def _observe(tool: str, size_bucket: str, seconds: float) -> None:
+    """Record one call; entries hold per-bucket counts, then +Inf count and sum"""
+    entry = _tool_latency.setdefault((tool, size_bucket), [0] * (len(_LATENCY_BUCKETS) + 2))
+    entry[bisect_left(_LATENCY_BUCKETS, seconds)] += 1
+    entry[-1] += seconds
+
+
+def _timed(func: Callable[..., Awaitable[Any]]) -> Callable[..., Awaitable[Any]]:
+    """Wrap a tool so every call is timed and failures are counted"""
+    tool = func.__name__
+    takes_file = next(iter(inspect.signature(func).parameters)) == "file_path"
+
+    @functools.wraps(func)
+    async def wrapper(*args: Any, **kwargs: Any) -> Any:
+        file_path = kwargs.get("file_path", args[0] if args else None) if takes_file else None
+        start = time.perf_counter_ns()
+        try:
+            result = await func(*args, **kwargs)
+        except Exception as e:
+            _tool_errors[tool, type(e).__name__] += 1
+            raise
+        finally:
+            _observe(tool, _size_bucket(file_path), (time.perf_counter_ns() - start) / 1e9)
+        if isinstance(result, dict) and result.get("success") is False:
+            _tool_errors[tool, "failed"] += 1
+        return result
+
+    return wrapper
+
+
+async def get_tool_metrics() -> dict[str, Any]:
+    """
+    Report latency histograms and failure counts for this server's tools
+
+    Returns:
+        Dictionary containing:
+        - success: Always True
+        - latency: One entry per (tool, size_bucket) with count, sum_seconds
+          and cumulative bucket counts keyed by upper bound in seconds
+        - errors: One entry per (tool, kind) with its count, where kind is
+          "failed" for error results or the exception type name
+    """
+    latency = []
+    for (tool, size_bucket), entry in sorted(_tool_latency.items()):
+        cumulative = list(accumulate(entry[:-1]))
+        latency.append(
+            {
+                "tool": tool,
+                "size_bucket": size_bucket,
+                "count": cumulative[-1],
+                "sum_seconds": round(entry[-1], 6),
+                "buckets": {
+                    **dict(zip(map(str, _LATENCY_BUCKETS), cumulative, strict=False)),
+                    "+Inf": cumulative[-1],
+                },
+            }
+        )
+
+    return {
+        "success": True,
+        "latency": latency,
+        "errors": [
+            {"tool": tool, "kind": kind, "count": count}
+            for (tool, kind), count in sorted(_tool_errors.items())
+        ],
+    }
+
+
 # Register tools with MCP
-mcp.tool(calculate_complexity)
-mcp.tool(measure_code_coverage)
-mcp.tool(detect_duplication)
-mcp.tool(calculate_maintainability)
-mcp.tool(analyze_dependencies)
+mcp.tool(_timed(calculate_complexity))
+mcp.tool(_timed(measure_code_coverage))
+mcp.tool(_timed(detect_duplication))
+mcp.tool(_timed(calculate_maintainability))
+mcp.tool(_timed(analyze_dependencies))
+mcp.tool(_timed(analyze_files_bulk))
+mcp.tool(get_tool_metrics)
 
 
 if __name__ == "__main__":
@@ -1,5 +1,6 @@
 """Container tools MCP server - Docker, Kubernetes, Terraform, and YAML operations"""
 
+import logging
 from pathlib import Path
 from typing import Any
 
@@ -8,6 +9,19 @@ import yaml
 
 from .shell_server import run_command
 
+logger = logging.getLogger(__name__)
+
+# Prefer the libyaml-backed loader/dumper; the pure-Python ones are an order of
+# magnitude slower on large manifests
+try:
+    from yaml import CSafeDumper as _YamlDumper
+    from yaml import CSafeLoader as _YamlLoader
+except ImportError:
+    from yaml import SafeDumper as _YamlDumper  # type: ignore[assignment]
+    from yaml import SafeLoader as _YamlLoader  # type: ignore[assignment]
+
+    logger.warning("libyaml is not available; falling back to the pure-Python YAML parser")
+
 mcp = FastMCP("Container Tools")
 
 
@@ -16,15 +30,26 @@ async def docker_command(
     cwd: str | None = None,
     timeout: int = 300,
     env: dict[str, str] | None = None,
+    max_output_bytes: int = 1_048_576,
+    tail: bool = False,
 ) -> dict[str, Any]:
     """
     Execute a Docker command
 
+    Use this tool to run Docker commands for container management:
+    - Container operations: docker ps, docker run, docker stop
+    - Image operations: docker build, docker pull, docker push
+    - Network operations: docker network create, docker network ls
+    - Volume operations: docker volume create, docker volume ls
+
     Args:
         command: Docker command to execute (e.g., "ps", "build -t myimage .")
         cwd: Working directory for command execution (optional)
         timeout: Maximum execution time in seconds (default: 300)
         env: Additional environment variables (optional)
+        max_output_bytes: Maximum bytes of output returned (default: 1 MiB);
+            longer output is truncated
+        tail: Return the end of truncated output instead of the start, e.g. for logs
 
     Returns:
         Dictionary containing:
@@ -32,10 +57,18 @@ async def docker_command(
         - output: Command output (stdout)
         - error: Error message (stderr) if command failed
         - command: The full command that was executed
+        - truncated: Whether output was cut to max_output_bytes
     """
     full_command = f"docker {command}"
 
-    result = await run_command(full_command, cwd=cwd, timeout=timeout, env=env)
+    result = await run_command(
+        full_command,
+        cwd=cwd,
+        timeout=timeout,
+        env=env,
+        max_output_bytes=max_output_bytes,
+        tail=tail,
+    )
 
     # Format response based on success/failure
     if result["returncode"] == 0:
@@ -43,12 +76,14 @@ async def docker_command(
             "success": True,
             "output": result["stdout"],
             "command": full_command,
+            "truncated": result.get("truncated", False),
         }
     else:
         return {
             "success": False,
             "error": result.get("stderr") or result.get("error", "Unknown error"),
             "command": full_command,
+            "truncated": result.get("truncated", False),
         }
 
 
@@ -57,15 +92,26 @@ async def docker_compose_command(
     cwd: str | None = None,
     timeout: int = 600,
     env: dict[str, str] | None = None,
+    max_output_bytes: int = 1_048_576,
+    tail: bool = False,
 ) -> dict[str, Any]:
     """
     Execute a Docker Compose command
 
+    Use this tool to manage multi-container Docker applications:
+    - Start services: docker-compose up -d
+    - Stop services: docker-compose down
+    - View logs: docker-compose logs
+    - Scale services: docker-compose scale web=3
+
     Args:
         command: Docker Compose command (e.g., "up -d", "down", "logs")
         cwd: Working directory containing docker-compose.yml (optional)
         timeout: Maximum execution time in seconds (default: 600)
         env: Additional environment variables (optional)
+        max_output_bytes: Maximum bytes of output returned (default: 1 MiB);
+            longer output is truncated
+        tail: Return the end of truncated output instead of the start, e.g. for logs
 
     Returns:
         Dictionary containing:
@@ -73,22 +119,32 @@ async def docker_compose_command(
         - output: Command output
         - error: Error message if command failed
         - command: The full command that was executed
+        - truncated: Whether output was cut to max_output_bytes
     """
     full_command = f"docker-compose {command}"
 
-    result = await run_command(full_command, cwd=cwd, timeout=timeout, env=env)
+    result = await run_command(
+        full_command,
+        cwd=cwd,
+        timeout=timeout,
+        env=env,
+        max_output_bytes=max_output_bytes,
+        tail=tail,
+    )
 
     if result["returncode"] == 0:
         return {
             "success": True,
             "output": result["stdout"],
             "command": full_command,
+            "truncated": result.get("truncated", False),
         }
     else:
         return {
             "success": False,
             "error": result.get("stderr") or result.get("error", "Unknown error"),
             "command": full_command,
+            "truncated": result.get("truncated", False),
         }
 
 
@@ -97,15 +153,26 @@ async def kubectl_command(
     cwd: str | None = None,
     timeout: int = 300,
     env: dict[str, str] | None = None,
+    max_output_bytes: int = 1_048_576,
+    tail: bool = False,
 ) -> dict[str, Any]:
     """
     Execute a kubectl command for Kubernetes operations
 
+    Use this tool to interact with Kubernetes clusters:
+    - Get resources: kubectl get pods, kubectl get services
+    - Apply configurations: kubectl apply -f deployment.yaml
+    - Describe resources: kubectl describe pod mypod
+    - Delete resources: kubectl delete deployment myapp
+
     Args:
         command: kubectl command (e.g., "get pods", "apply -f deployment.yaml")
         cwd: Working directory for command execution (optional)
         timeout: Maximum execution time in seconds (default: 300)
         env: Additional environment variables (optional)
+        max_output_bytes: Maximum bytes of output returned (default: 1 MiB);
+            longer output is truncated
+        tail: Return the end of truncated output instead of the start, e.g. for logs
 
     Returns:
         Dictionary containing:
@@ -113,22 +180,32 @@ async def kubectl_command(
         - output: Command output
         - error: Error message if command failed
         - command: The full command that was executed
+        - truncated: Whether output was cut to max_output_bytes
     """
     full_command = f"kubectl {command}"
 
-    result = await run_command(full_command, cwd=cwd, timeout=timeout, env=env)
+    result = await run_command(
+        full_command,
+        cwd=cwd,
+        timeout=timeout,
+        env=env,
+        max_output_bytes=max_output_bytes,
+        tail=tail,
+    )
 
     if result["returncode"] == 0:
         return {
             "success": True,
             "output": result["stdout"],
             "command": full_command,
+            "truncated": result.get("truncated", False),
         }
     else:
         return {
             "success": False,
             "error": result.get("stderr") or result.get("error", "Unknown error"),
             "command": full_command,
+            "truncated": result.get("truncated", False),
         }
 
 
@@ -137,15 +214,26 @@ async def terraform_command(
     cwd: str | None = None,
     timeout: int = 600,
     env: dict[str, str] | None = None,
+    max_output_bytes: int = 1_048_576,
+    tail: bool = False,
 ) -> dict[str, Any]:
     """
     Execute a Terraform command for infrastructure as code
 
+    Use this tool to manage infrastructure with Terraform:
+    - Initialize: terraform init
+    - Plan changes: terraform plan
+    - Apply changes: terraform apply
+    - Destroy resources: terraform destroy
+
     Args:
         command: Terraform command (e.g., "init", "plan", "apply")
         cwd: Working directory containing Terraform files (optional)
         timeout: Maximum execution time in seconds (default: 600)
         env: Additional environment variables (optional)
+        max_output_bytes: Maximum bytes of output returned (default: 1 MiB);
+            longer output is truncated
+        tail: Return the end of truncated output instead of the start, e.g. for logs
 
     Returns:
         Dictionary containing:
@@ -153,22 +241,32 @@ async def terraform_command(
         - output: Command output
         - error: Error message if command failed
         - command: The full command that was executed
+        - truncated: Whether output was cut to max_output_bytes
     """
     full_command = f"terraform {command}"
 
-    result = await run_command(full_command, cwd=cwd, timeout=timeout, env=env)
+    result = await run_command(
+        full_command,
+        cwd=cwd,
+        timeout=timeout,
+        env=env,
+        max_output_bytes=max_output_bytes,
+        tail=tail,
+    )
 
     if result["returncode"] == 0:
         return {
             "success": True,
             "output": result["stdout"],
             "command": full_command,
+            "truncated": result.get("truncated", False),
         }
     else:
         return {
             "success": False,
             "error": result.get("stderr") or result.get("error", "Unknown error"),
             "command": full_command,
+            "truncated": result.get("truncated", False),
         }
 
 
@@ -176,6 +274,12 @@ async def read_yaml_file(file_path: str) -> dict[str, Any]:
     """
     Read and parse a YAML file
 
+    Use this tool to read YAML configuration files:
+    - Docker Compose files (docker-compose.yml)
+    - Kubernetes manifests (deployment.yaml, service.yaml)
+    - CI/CD configurations (.gitlab-ci.yml, .github/workflows/*.yml)
+    - Application configurations
+
     Args:
         file_path: Path to the YAML file to read
 
@@ -196,8 +300,8 @@ async def read_yaml_file(file_path: str) -> dict[str, Any]:
                 "file": file_path,
             }
 
-        with open(path, encoding="utf-8") as f:
-            data = yaml.safe_load(f)
+        # libyaml detects the encoding itself, so hand it the raw bytes
+        data = yaml.load(path.read_bytes(), Loader=_YamlLoader)
 
         return {
             "success": True,
@@ -223,6 +327,12 @@ async def write_yaml_file(file_path: str, data: dict[str, Any]) -> dict[str, Any
     """
     Write data to a YAML file
 
+    Use this tool to create or update YAML configuration files:
+    - Generate Docker Compose configurations
+    - Create Kubernetes manifests
+    - Write CI/CD pipeline definitions
+    - Update application configuration files
+
     Args:
         file_path: Path where the YAML file should be written
         data: Python dictionary/list to serialize as YAML
@@ -240,7 +350,7 @@ async def write_yaml_file(file_path: str, data: dict[str, Any]) -> dict[str, Any
         path.parent.mkdir(parents=True, exist_ok=True)
 
         with open(path, "w", encoding="utf-8") as f:
-            yaml.safe_dump(data, f, default_flow_style=False, sort_keys=False)
+            yaml.dump(data, f, Dumper=_YamlDumper, default_flow_style=False, sort_keys=False)
 
         return {
             "success": True,
@@ -261,181 +371,13 @@ async def write_yaml_file(file_path: str, data: dict[str, Any]) -> dict[str, Any
         }
 
 
-# MCP Tool wrappers
-@mcp.tool()
-async def run_docker_command(
-    command: str,
-    cwd: str | None = None,
-    timeout: int = 300,
-    env: dict[str, str] | None = None,
-) -> dict[str, Any]:
-    """
-    Execute a Docker command
-
-    Use this tool to run Docker commands for container management:
-    - Container operations: docker ps, docker run, docker stop
-    - Image operations: docker build, docker pull, docker push
-    - Network operations: docker network create, docker network ls
-    - Volume operations: docker volume create, docker volume ls
-
-    Args:
-        command: Docker command to execute (e.g., "ps", "build -t myimage .")
-        cwd: Working directory for command execution (optional)
-        timeout: Maximum execution time in seconds (default: 300)
-        env: Additional environment variables (optional)
-
-    Returns:
-        Dictionary containing:
-        - success: Boolean indicating if command succeeded
-        - output: Command output (stdout)
-        - error: Error message (stderr) if command failed
-        - command: The full command that was executed
-    """
-    return await docker_command(command, cwd, timeout, env)
-
-
-@mcp.tool()
-async def run_docker_compose_command(
-    command: str,
-    cwd: str | None = None,
-    timeout: int = 600,
-    env: dict[str, str] | None = None,
-) -> dict[str, Any]:
-    """
-    Execute a Docker Compose command
-
-    Use this tool to manage multi-container Docker applications:
-    - Start services: docker-compose up -d
-    - Stop services: docker-compose down
-    - View logs: docker-compose logs
-    - Scale services: docker-compose scale web=3
-
-    Args:
-        command: Docker Compose command (e.g., "up -d", "down", "logs")
-        cwd: Working directory containing docker-compose.yml (optional)
-        timeout: Maximum execution time in seconds (default: 600)
-        env: Additional environment variables (optional)
-
-    Returns:
-        Dictionary containing:
-        - success: Boolean indicating if command succeeded
-        - output: Command output
-        - error: Error message if command failed
-        - command: The full command that was executed
-    """
-    return await docker_compose_command(command, cwd, timeout, env)
-
-
-@mcp.tool()
-async def run_kubectl_command(
-    command: str,
-    cwd: str | None = None,
-    timeout: int = 300,
-    env: dict[str, str] | None = None,
-) -> dict[str, Any]:
-    """
-    Execute a kubectl command for Kubernetes operations
-
-    Use this tool to interact with Kubernetes clusters:
-    - Get resources: kubectl get pods, kubectl get services
-    - Apply configurations: kubectl apply -f deployment.yaml
-    - Describe resources: kubectl describe pod mypod
-    - Delete resources: kubectl delete deployment myapp
-
-    Args:
-        command: kubectl command (e.g., "get pods", "apply -f deployment.yaml")
-        cwd: Working directory for command execution (optional)
-        timeout: Maximum execution time in seconds (default: 300)
-        env: Additional environment variables (optional)
-
-    Returns:
-        Dictionary containing:
-        - success: Boolean indicating if command succeeded
-        - output: Command output
-        - error: Error message if command failed
-        - command: The full command that was executed
-    """
-    return await kubectl_command(command, cwd, timeout, env)
-
-
-@mcp.tool()
-async def run_terraform_command(
-    command: str,
-    cwd: str | None = None,
-    timeout: int = 600,
-    env: dict[str, str] | None = None,
-) -> dict[str, Any]:
-    """
-    Execute a Terraform command for infrastructure as code
-
-    Use this tool to manage infrastructure with Terraform:
-    - Initialize: terraform init
-    - Plan changes: terraform plan
-    - Apply changes: terraform apply
-    - Destroy resources: terraform destroy
-
-    Args:
-        command: Terraform command (e.g., "init", "plan", "apply")
-        cwd: Working directory containing Terraform files (optional)
-        timeout: Maximum execution time in seconds (default: 600)
-        env: Additional environment variables (optional)
-
-    Returns:
-        Dictionary containing:
-        - success: Boolean indicating if command succeeded
-        - output: Command output
-        - error: Error message if command failed
-        - command: The full command that was executed
-    """
-    return await terraform_command(command, cwd, timeout, env)
-
-
-@mcp.tool()
-async def read_yaml(file_path: str) -> dict[str, Any]:
-    """
-    Read and parse a YAML file
-
-    Use this tool to read YAML configuration files:
-    - Docker Compose files (docker-compose.yml)
-    - Kubernetes manifests (deployment.yaml, service.yaml)
-    - CI/CD configurations (.gitlab-ci.yml, .github/workflows/*.yml)
-    - Application configurations
-
-    Args:
-        file_path: Path to the YAML file to read
-
-    Returns:
-        Dictionary containing:
-        - success: Boolean indicating if file was read successfully
-        - data: Parsed YAML content as a Python dictionary/list
-        - error: Error message if reading/parsing failed
-        - file: The file path that was read
-    """
-    return await read_yaml_file(file_path)
-
-
-@mcp.tool()
-async def write_yaml(file_path: str, data: dict[str, Any]) -> dict[str, Any]:
-    """
-    Write data to a YAML file
-
-    Use this tool to create or update YAML configuration files:
-    - Generate Docker Compose configurations
-    - Create Kubernetes manifests
-    - Write CI/CD pipeline definitions
-    - Update application configuration files
-
-    Args:
-        file_path: Path where the YAML file should be written
-        data: Python dictionary/list to serialize as YAML
-
-    Returns:
-        Dictionary containing:
-        - success: Boolean indicating if file was written successfully
-        - file: The file path that was written
-        - error: Error message if writing failed
-    """
-    return await write_yaml_file(file_path, data)
+# Register tools with MCP
+mcp.tool(name="run_docker_command")(docker_command)
+mcp.tool(name="run_docker_compose_command")(docker_compose_command)
+mcp.tool(name="run_kubectl_command")(kubectl_command)
+mcp.tool(name="run_terraform_command")(terraform_command)
+mcp.tool(name="read_yaml")(read_yaml_file)
+mcp.tool(name="write_yaml")(write_yaml_file)
 
 
 if __name__ == "__main__":
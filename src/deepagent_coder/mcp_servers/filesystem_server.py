@@ -1,16 +1,192 @@
 # src/deepagent_coder/mcp_servers/filesystem_server.py
 """Filesystem operations MCP server - file and directory management tools"""
 
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+import ctypes
+import fnmatch
+import mmap
+import os
 from pathlib import Path
+import re
 import shutil
-from typing import Any
+import stat as stat_module
+import sys
+from typing import Any, NamedTuple
 
 from fastmcp import FastMCP
 
 mcp = FastMCP("Filesystem Tools")
 
+# O_NONBLOCK keeps opening a FIFO from hanging before it can be rejected
+_READ_FLAGS = os.O_RDONLY | getattr(os, "O_NONBLOCK", 0) | getattr(os, "O_CLOEXEC", 0)
+_WRITE_FLAGS = os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, "O_CLOEXEC", 0)
+# Large writes are encoded in chunks of this many characters and flushed with
+# writev in batches, so the whole encoded copy never exists at once
+_WRITE_CHUNK_CHARS = 65536
+_WRITEV_BATCH = 16
+# Reads and writes above this size run in a worker thread; smaller ones finish
+# faster inline than the thread hand-off would take
+_OFFLOAD_BYTES = 65536
+# Files above this size are decoded from a memory map
+_MMAP_MIN_BYTES = 1_048_576
+# Unlinks are metadata-bound, so a few threads keep the disk queue busy
+_RMTREE_WORKERS = 8
+# Below this many files in a directory, unlinking them in turn beats the pool hand-off
+_RMTREE_PARALLEL_MIN_FILES = 1000
+
+
+class _FileStat(NamedTuple):
+    """The subset of stat fields the filesystem tools report"""
+
+    st_mode: int
+    st_size: int
+    st_mtime: float
+    st_ctime: float
+
+
+class _StatxTimestamp(ctypes.Structure):
+    _fields_ = [
+        ("tv_sec", ctypes.c_int64),
+        ("tv_nsec", ctypes.c_uint32),
+        ("_reserved", ctypes.c_int32),
+    ]
+
+
+class _Statx(ctypes.Structure):
+    _fields_ = [
+        ("stx_mask", ctypes.c_uint32),
+        ("stx_blksize", ctypes.c_uint32),
+        ("stx_attributes", ctypes.c_uint64),
+        ("stx_nlink", ctypes.c_uint32),
+        ("stx_uid", ctypes.c_uint32),
+        ("stx_gid", ctypes.c_uint32),
+        ("stx_mode", ctypes.c_uint16),
+        ("_spare0", ctypes.c_uint16),
+        ("stx_ino", ctypes.c_uint64),
+        ("stx_size", ctypes.c_uint64),
+        ("stx_blocks", ctypes.c_uint64),
+        ("stx_attributes_mask", ctypes.c_uint64),
+        ("stx_atime", _StatxTimestamp),
+        ("stx_btime", _StatxTimestamp),
+        ("stx_ctime", _StatxTimestamp),
+        ("stx_mtime", _StatxTimestamp),
+        ("_rest", ctypes.c_uint8 * 128),
+    ]
+
+
+_AT_FDCWD = -100
+_AT_SYMLINK_NOFOLLOW = 0x100
+_AT_STATX_DONT_SYNC = 0x4000
+_STATX_BASIC_STATS = 0x7FF
+
+
+def _load_statx() -> Any:
+    """Return libc's statx(2) wrapper on Linux, or None where it is unavailable"""
+    if not sys.platform.startswith("linux"):
+        return None
+    try:
+        statx = ctypes.CDLL(None, use_errno=True).statx
+    except (AttributeError, OSError):
+        return None
+    statx.argtypes = [
+        ctypes.c_int,
+        ctypes.c_char_p,
+        ctypes.c_int,
+        ctypes.c_uint,
+        ctypes.POINTER(_Statx),
+    ]
+    statx.restype = ctypes.c_int
+    return statx
+
+
+_statx = _load_statx()
+
 
-async def _write_file_impl(path: str, content: str) -> dict[str, Any]:
+def _stat(path: str, follow_symlinks: bool = True, fresh: bool = False) -> _FileStat:
+    """
+    Stat a path, accepting the kernel's cached attributes unless fresh is set
+
+    On Linux this uses statx(2) with AT_STATX_DONT_SYNC, which lets network
+    filesystems such as NFS answer from cache instead of revalidating with the
+    server. Elsewhere, or with fresh=True, it is a plain stat.
+    """
+    if _statx is None or fresh:
+        st = os.stat(path, follow_symlinks=follow_symlinks)
+        return _FileStat(st.st_mode, st.st_size, st.st_mtime, st.st_ctime)
+
+    flags = _AT_STATX_DONT_SYNC | (0 if follow_symlinks else _AT_SYMLINK_NOFOLLOW)
+    buf = _Statx()
+    if _statx(_AT_FDCWD, os.fsencode(path), flags, _STATX_BASIC_STATS, ctypes.byref(buf)) != 0:
+        errno = ctypes.get_errno()
+        raise OSError(errno, os.strerror(errno), path)
+    return _FileStat(
+        buf.stx_mode,
+        buf.stx_size,
+        buf.stx_mtime.tv_sec + buf.stx_mtime.tv_nsec * 1e-9,
+        buf.stx_ctime.tv_sec + buf.stx_ctime.tv_nsec * 1e-9,
+    )
+
+
+def _read_fd(fd: int, size: int) -> bytes:
+    """Read a file descriptor to EOF, expecting about size bytes"""
+    data = os.read(fd, size) if size else b""
+    # Short reads happen for very large files or files that grew after fstat
+    chunks = [data]
+    while chunk := os.read(fd, max(size, 65536)):
+        chunks.append(chunk)
+    return b"".join(chunks) if len(chunks) > 1 else data
+
+
+def _pread_fd(fd: int, size: int, offset: int) -> bytes:
+    """Read up to size bytes starting at offset, without moving the file position"""
+    if not hasattr(os, "pread"):
+        os.lseek(fd, offset, os.SEEK_SET)
+        return os.read(fd, size)
+    chunks = []
+    while size > 0 and (chunk := os.pread(fd, size, offset)):
+        chunks.append(chunk)
+        size -= len(chunk)
+        offset += len(chunk)
+    return b"".join(chunks)
+
+
+def _write_fd(fd: int, data: bytes | memoryview) -> None:
+    """Write all of data to a file descriptor"""
+    view = memoryview(data)
+    while view:
+        view = view[os.write(fd, view) :]
+
+
+def _write_text_fd(fd: int, content: str) -> int:
+    """Encode content to UTF-8 and write it to a file descriptor, returning the byte count"""
+    if len(content) <= _WRITE_CHUNK_CHARS or not hasattr(os, "writev"):
+        data = content.encode("utf-8")
+        _write_fd(fd, data)
+        return len(data)
+
+    written = 0
+    batch_chars = _WRITE_CHUNK_CHARS * _WRITEV_BATCH
+    for start in range(0, len(content), batch_chars):
+        buffers = [
+            content[i : i + _WRITE_CHUNK_CHARS].encode("utf-8")
+            for i in range(start, min(start + batch_chars, len(content)), _WRITE_CHUNK_CHARS)
+        ]
+        total = sum(map(len, buffers))
+        done = os.writev(fd, buffers)
+        if done < total:
+            # Short write: finish the rest of this batch one buffer at a time
+            for buffer in buffers:
+                if done >= len(buffer):
+                    done -= len(buffer)
+                    continue
+                _write_fd(fd, memoryview(buffer)[done:])
+                done = 0
+        written += total
+    return written
+
+
+def _write_file_impl(path: str, content: str) -> dict[str, Any]:
     """
     Write content to a file
 
@@ -27,14 +203,18 @@ async def _write_file_impl(path: str, content: str) -> dict[str, Any]:
         # Create parent directories if they don't exist
         file_path.parent.mkdir(parents=True, exist_ok=True)
 
-        # Write content to file
-        file_path.write_text(content, encoding="utf-8")
+        # Write content to file with a single open/write/close
+        fd = os.open(file_path, _WRITE_FLAGS, 0o666)
+        try:
+            size = _write_text_fd(fd, content)
+        finally:
+            os.close(fd)
 
         return {
             "success": True,
             "path": str(file_path),
-            "size": len(content),
-            "message": f"Successfully wrote {len(content)} bytes to {path}",
+            "size": size,
+            "message": f"Successfully wrote {size} bytes to {path}",
         }
 
     except PermissionError:
@@ -46,39 +226,70 @@ async def _write_file_impl(path: str, content: str) -> dict[str, Any]:
 @mcp.tool()  # type: ignore[misc]
 async def write_file(path: str, content: str) -> dict[str, Any]:
     """Write content to a file, creating directories if needed"""
-    return await _write_file_impl(path, content)
+    if len(content) > _OFFLOAD_BYTES:
+        return await asyncio.to_thread(_write_file_impl, path, content)
+    return _write_file_impl(path, content)
 
 
-async def _read_file_impl(path: str) -> dict[str, Any]:
+def _read_file_impl(path: str, offset: int = 0, length: int | None = None) -> dict[str, Any]:
     """
     Read content from a file
 
     Args:
         path: Path to the file
+        offset: Byte offset to start reading from
+        length: Maximum number of bytes to read (default: to end of file)
 
     Returns:
-        File content and metadata
+        File content and metadata. Partial reads also report the offset and
+        length read; characters split at the slice edges are replaced.
     """
+    if offset < 0 or (length is not None and length < 0):
+        return {"error": "offset and length must not be negative"}
+    partial = offset > 0 or length is not None
+
     try:
         file_path = Path(path)
 
-        if not file_path.exists():
-            return {"error": f"File not found: {path}"}
-
-        if not file_path.is_file():
-            return {"error": f"Not a file: {path}"}
-
-        content = file_path.read_text(encoding="utf-8")
-        stat = file_path.stat()
-
-        return {
+        # One fd serves the existence check, the type check and the read
+        fd = os.open(file_path, _READ_FLAGS)
+        try:
+            stat = os.fstat(fd)
+            if not stat_module.S_ISREG(stat.st_mode):
+                return {"error": f"Not a file: {path}"}
+            if partial:
+                available = max(stat.st_size - offset, 0)
+                size = available if length is None else min(length, available)
+                data = _pread_fd(fd, size, offset)
+                length = len(data)
+                content = data.decode("utf-8", errors="replace")
+            elif stat.st_size > _MMAP_MIN_BYTES:
+                # Decode straight out of the page cache instead of copying the
+                # file into a bytes object first
+                with mmap.mmap(fd, 0, access=mmap.ACCESS_READ) as mapped:
+                    content = str(mapped, "utf-8")
+            else:
+                content = _read_fd(fd, stat.st_size).decode("utf-8")
+        finally:
+            os.close(fd)
+        if "\r" in content:
+            # Match text-mode reads, which translate \r\n and \r to \n
+            content = content.replace("\r\n", "\n").replace("\r", "\n")
+
+        result = {
             "success": True,
             "path": str(file_path),
             "content": content,
             "size": stat.st_size,
             "modified": stat.st_mtime,
         }
+        if partial:
+            result["offset"] = offset
+            result["length"] = length
+        return result
 
+    except FileNotFoundError:
+        return {"error": f"File not found: {path}"}
     except PermissionError:
         return {"error": f"Permission denied: {path}"}
     except UnicodeDecodeError:
@@ -88,17 +299,46 @@ async def _read_file_impl(path: str) -> dict[str, Any]:
 
 
 @mcp.tool()  # type: ignore[misc]
-async def read_file(path: str) -> dict[str, Any]:
-    """Read content from a file"""
-    return await _read_file_impl(path)
+async def read_file(path: str, offset: int = 0, length: int | None = None) -> dict[str, Any]:
+    """Read content from a file, optionally only length bytes starting at byte offset"""
+    if length is None or length > _OFFLOAD_BYTES:
+        try:
+            size = os.stat(path).st_size - offset
+        except OSError:
+            size = 0  # let the read report the error
+        if size > _OFFLOAD_BYTES:
+            return await asyncio.to_thread(_read_file_impl, path, offset, length)
+    return _read_file_impl(path, offset, length)
+
+
+def _describe_entry(entry: os.DirEntry[str]) -> dict[str, Any]:
+    """Build the listing record for one scandir entry"""
+    try:
+        stat = _stat(entry.path)
+    except FileNotFoundError:
+        # Dangling symlink: describe the link itself
+        stat = _stat(entry.path, follow_symlinks=False)
+    return {
+        "name": entry.name,
+        "path": entry.path,
+        "type": "directory" if stat_module.S_ISDIR(stat.st_mode) else "file",
+        "size": stat.st_size if stat_module.S_ISREG(stat.st_mode) else None,
+        "modified": stat.st_mtime,
+    }
+
 
+def _name_key(record: dict[str, Any]) -> str:
+    """Case-insensitive sort key for listing records"""
+    return record["name"].lower()
 
-async def _list_directory_impl(path: str) -> dict[str, Any]:
+
+async def _list_directory_impl(path: str, ignore: list[str] | None = None) -> dict[str, Any]:
     """
     List contents of a directory
 
     Args:
         path: Path to the directory
+        ignore: Glob patterns for entry names to leave out (e.g. ".git", "*.pyc")
 
     Returns:
         List of files and directories with metadata
@@ -106,30 +346,37 @@ async def _list_directory_impl(path: str) -> dict[str, Any]:
     try:
         dir_path = Path(path)
 
-        if not dir_path.exists():
-            return {"error": f"Directory not found: {path}"}
-
-        if not dir_path.is_dir():
-            return {"error": f"Not a directory: {path}"}
-
-        entries = []
-        for entry in dir_path.iterdir():
-            stat = entry.stat()
-            entries.append(
-                {
-                    "name": entry.name,
-                    "path": str(entry),
-                    "type": "directory" if entry.is_dir() else "file",
-                    "size": stat.st_size if entry.is_file() else None,
-                    "modified": stat.st_mtime,
-                }
-            )
-
-        # Sort: directories first, then files, alphabetically
-        entries.sort(key=lambda x: (x["type"] != "directory", str(x["name"]).lower()))
+        # One alternation regex matches all patterns; ignored entries are
+        # dropped before they cost a stat
+        ignored = (
+            re.compile("|".join(fnmatch.translate(pattern) for pattern in ignore)).match
+            if ignore
+            else None
+        )
+
+        directories: list[dict[str, Any]] = []
+        files: list[dict[str, Any]] = []
+        # scandir reports entry types from the directory listing itself, so only
+        # the stat for size/mtime costs a syscall per entry
+        with os.scandir(dir_path) as it:
+            for entry in it:
+                if ignored and ignored(entry.name):
+                    continue
+                record = _describe_entry(entry)
+                (directories if record["type"] == "directory" else files).append(record)
+
+        # Sort: directories first, then files, alphabetically. Sorting the two
+        # groups separately keeps the key a plain string instead of a tuple
+        directories.sort(key=_name_key)
+        files.sort(key=_name_key)
+        entries = directories + files
 
         return {"success": True, "path": str(dir_path), "entries": entries, "count": len(entries)}
 
+    except FileNotFoundError:
+        return {"error": f"Directory not found: {path}"}
+    except NotADirectoryError:
+        return {"error": f"Not a directory: {path}"}
     except PermissionError:
         return {"error": f"Permission denied: {path}"}
     except Exception as e:
@@ -137,9 +384,74 @@ async def _list_directory_impl(path: str) -> dict[str, Any]:
 
 
 @mcp.tool()  # type: ignore[misc]
-async def list_directory(path: str) -> dict[str, Any]:
-    """List contents of a directory"""
-    return await _list_directory_impl(path)
+async def list_directory(path: str, ignore: list[str] | None = None) -> dict[str, Any]:
+    """List contents of a directory, skipping names that match any ignore glob"""
+    return await _list_directory_impl(path, ignore)
+
+
+def _walk_directory(root: str, max_entries: int) -> tuple[list[dict[str, Any]], bool]:
+    """Collect entry records below root, not descending into symlinked directories"""
+    entries: list[dict[str, Any]] = []
+    stack = [root]
+    while stack:
+        directory = stack.pop()
+        try:
+            it = os.scandir(directory)
+        except PermissionError:
+            # Skip unreadable subdirectories; only the root is an error
+            if directory is root:
+                raise
+            continue
+        with it:
+            for entry in it:
+                if len(entries) >= max_entries:
+                    return entries, True
+                entries.append(_describe_entry(entry))
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(entry.path)
+    return entries, False
+
+
+async def _list_directory_deep_impl(path: str, max_entries: int = 10000) -> dict[str, Any]:
+    """
+    Recursively list a directory tree
+
+    The whole walk runs in one worker thread, so a large tree costs one
+    event-loop round trip rather than one per directory.
+
+    Args:
+        path: Path to the root directory
+        max_entries: Maximum number of entries to return
+
+    Returns:
+        Files and directories with metadata, sorted by path
+    """
+    try:
+        entries, truncated = await asyncio.to_thread(_walk_directory, path, max_entries)
+        entries.sort(key=lambda x: x["path"])
+
+        return {
+            "success": True,
+            "path": str(Path(path)),
+            "entries": entries,
+            "count": len(entries),
+            "truncated": truncated,
+        }
+
+    except FileNotFoundError:
+        return {"error": f"Directory not found: {path}"}
+    except NotADirectoryError:
+        return {"error": f"Not a directory: {path}"}
+    except PermissionError as e:
+        return {"error": f"Permission denied: {e.filename or path}"}
+    except Exception as e:
+        return {"error": f"Failed to list directory: {str(e)}"}
+
+
+@mcp.tool()  # type: ignore[misc]
+async def list_directory_deep(path: str, max_entries: int = 10000) -> dict[str, Any]:
+    """List a directory tree recursively, up to max_entries entries"""
+    return await _list_directory_deep_impl(path, max_entries)
 
 
 async def _create_directory_impl(path: str) -> dict[str, Any]:
@@ -155,17 +467,17 @@ async def _create_directory_impl(path: str) -> dict[str, Any]:
     try:
         dir_path = Path(path)
 
-        if dir_path.exists():
-            if dir_path.is_dir():
-                return {
-                    "success": True,
-                    "path": str(dir_path),
-                    "message": f"Directory already exists: {path}",
-                }
-            else:
+        try:
+            dir_path.mkdir(parents=True)
+        except FileExistsError:
+            # Only look at what is there once mkdir has reported a conflict
+            if not stat_module.S_ISDIR(os.stat(dir_path).st_mode):
                 return {"error": f"Path exists but is not a directory: {path}"}
-
-        dir_path.mkdir(parents=True, exist_ok=True)
+            return {
+                "success": True,
+                "path": str(dir_path),
+                "message": f"Directory already exists: {path}",
+            }
 
         return {
             "success": True,
@@ -200,10 +512,12 @@ async def _move_file_impl(source: str, destination: str) -> dict[str, Any]:
         src_path = Path(source)
         dst_path = Path(destination)
 
-        if not src_path.exists():
+        try:
+            os.stat(src_path)
+        except FileNotFoundError:
             return {"error": f"Source not found: {source}"}
 
-        if dst_path.exists():
+        if os.path.exists(dst_path):
             return {"error": f"Destination already exists: {destination}"}
 
         # Create parent directory if needed
@@ -243,10 +557,13 @@ async def _delete_file_impl(path: str) -> dict[str, Any]:
     try:
         file_path = Path(path)
 
-        if not file_path.exists():
+        # A single stat answers both "does it exist" and "is it a file"
+        try:
+            mode = os.stat(file_path).st_mode
+        except FileNotFoundError:
             return {"error": f"File not found: {path}"}
 
-        if not file_path.is_file():
+        if not stat_module.S_ISREG(mode):
             return {"error": f"Not a file (use delete_directory for directories): {path}"}
 
         file_path.unlink()
@@ -269,13 +586,53 @@ async def delete_file(path: str) -> dict[str, Any]:
     return await _delete_file_impl(path)
 
 
-async def _delete_directory_impl(path: str, recursive: bool = False) -> dict[str, Any]:
+def _parallel_rmtree(root: str) -> None:
+    """
+    Delete a directory tree, unlinking the files of large directories from a thread pool
+
+    Like shutil.rmtree, it works relative to open directory descriptors, so a
+    directory swapped for a symlink mid-walk cannot redirect deletion outside
+    the tree.
+    """
+    if os.path.islink(root):
+        raise OSError("Cannot call rmtree on a symbolic link")
+
+    with ThreadPoolExecutor(max_workers=_RMTREE_WORKERS) as executor:
+        # Bottom-up, so each directory is empty by the time its parent removes it.
+        # A directory's fd is only open during its own iteration.
+        for _, dirnames, filenames, dir_fd in os.fwalk(root, topdown=False):
+
+            def unlink(name: str, dir_fd: int = dir_fd) -> None:
+                os.unlink(name, dir_fd=dir_fd)
+
+            if len(filenames) < _RMTREE_PARALLEL_MIN_FILES:
+                for name in filenames:
+                    unlink(name)
+            else:
+                # Consume the results so the first failure is raised here
+                for _ in executor.map(unlink, filenames):
+                    pass
+
+            for name in dirnames:
+                try:
+                    os.rmdir(name, dir_fd=dir_fd)
+                except NotADirectoryError:
+                    # A symlink to a directory: remove the link, not its target
+                    unlink(name)
+
+    os.rmdir(root)
+
+
+async def _delete_directory_impl(
+    path: str, recursive: bool = False, parallel: bool = False
+) -> dict[str, Any]:
     """
     Delete a directory
 
     Args:
         path: Path to the directory
         recursive: If True, delete non-empty directories
+        parallel: Unlink files from a thread pool when deleting recursively
 
     Returns:
         Success status
@@ -283,13 +640,17 @@ async def _delete_directory_impl(path: str, recursive: bool = False) -> dict[str
     try:
         dir_path = Path(path)
 
-        if not dir_path.exists():
+        try:
+            mode = os.stat(dir_path).st_mode
+        except FileNotFoundError:
             return {"error": f"Directory not found: {path}"}
 
-        if not dir_path.is_dir():
+        if not stat_module.S_ISDIR(mode):
             return {"error": f"Not a directory: {path}"}
 
-        if recursive:
+        if recursive and parallel:
+            _parallel_rmtree(str(dir_path))
+        elif recursive:
             shutil.rmtree(dir_path)
         else:
             dir_path.rmdir()  # Only works for empty directories
@@ -311,17 +672,21 @@ async def _delete_directory_impl(path: str, recursive: bool = False) -> dict[str
 
 
 @mcp.tool()  # type: ignore[misc]
-async def delete_directory(path: str, recursive: bool = False) -> dict[str, Any]:
+async def delete_directory(
+    path: str, recursive: bool = False, parallel: bool = False
+) -> dict[str, Any]:
     """Delete a directory (optionally recursive for non-empty directories)"""
-    return await _delete_directory_impl(path, recursive)
+    return await _delete_directory_impl(path, recursive, parallel)
 
 
-async def _get_file_info_impl(path: str) -> dict[str, Any]:
+async def _get_file_info_impl(path: str, fresh: bool = False) -> dict[str, Any]:
     """
     Get file or directory metadata
 
     Args:
         path: Path to the file or directory
+        fresh: Revalidate metadata with the filesystem instead of accepting
+            cached attributes (only matters on network filesystems)
 
     Returns:
         File metadata
@@ -329,27 +694,26 @@ async def _get_file_info_impl(path: str) -> dict[str, Any]:
     try:
         file_path = Path(path)
 
-        if not file_path.exists():
-            return {"error": f"Path not found: {path}"}
-
-        stat = file_path.stat()
+        stat = _stat(str(file_path), fresh=fresh)
 
         info = {
             "success": True,
             "path": str(file_path),
             "name": file_path.name,
-            "type": "directory" if file_path.is_dir() else "file",
+            "type": "directory" if stat_module.S_ISDIR(stat.st_mode) else "file",
             "size": stat.st_size,
             "modified": stat.st_mtime,
             "created": stat.st_ctime,
             "permissions": oct(stat.st_mode)[-3:],
         }
 
-        if file_path.is_file():
+        if stat_module.S_ISREG(stat.st_mode):
             info["extension"] = file_path.suffix
 
         return info
 
+    except FileNotFoundError:
+        return {"error": f"Path not found: {path}"}
     except PermissionError:
         return {"error": f"Permission denied: {path}"}
     except Exception as e:
@@ -357,9 +721,9 @@ async def _get_file_info_impl(path: str) -> dict[str, Any]:
 
 
 @mcp.tool()  # type: ignore[misc]
-async def get_file_info(path: str) -> dict[str, Any]:
-    """Get metadata for a file or directory"""
-    return await _get_file_info_impl(path)
+async def get_file_info(path: str, fresh: bool = False) -> dict[str, Any]:
+    """Get metadata for a file or directory (fresh=True bypasses cached network FS metadata)"""
+    return await _get_file_info_impl(path, fresh)
 
 
 def run_server() -> None:
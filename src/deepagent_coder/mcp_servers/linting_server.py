@@ -10,10 +10,32 @@ Provides tools for code quality and linting operations:
 """
 
 import asyncio
+import atexit
+import hashlib
 import json
+import os
 from pathlib import Path
 import re
+import shutil
+import subprocess
 import sys
+import tempfile
+
+from deepagent_coder.utils.fast_json import json_loads
+from deepagent_coder.utils.ruff_command import ruff_command
+
+# mypy diagnostics: path:line: [severity:] message
+_MYPY_RE = re.compile(r"^(.+?):(\d+):(?:\s+(\w+):)?\s*(.+)$", re.MULTILINE)
+
+# black's summary, e.g. "1 file reformatted, 2 files left unchanged."
+_BLACK_REFORMATTED_RE = re.compile(r"(\d+) files? (?:would be )?reformatted")
+_BLACK_UNCHANGED_RE = re.compile(r"(\d+) files? (?:would be )?left unchanged")
+
+# mypy daemons, one per distinct set of options, so repeated type checks reuse
+# warm type state instead of re-analyzing everything from a cold start. Each
+# daemon has its own lock, so checks with different options run concurrently
+_dmypy_dir: str | None = None
+_dmypy_locks: dict[str, asyncio.Lock] = {}
 
 
 async def _run_command(
@@ -30,6 +52,14 @@ async def _run_command(
     Returns:
         Tuple of (stdout, stderr, returncode)
     """
+    stdout, stderr, returncode = await _run_command_bytes(cmd, cwd, timeout)
+    return stdout.decode("utf-8", errors="replace"), stderr, returncode
+
+
+async def _run_command_bytes(
+    cmd: list[str], cwd: str | None = None, timeout: int = 300
+) -> tuple[bytes, str, int]:
+    """Like _run_command, but leave stdout undecoded for parsers that take bytes"""
     try:
         process = await asyncio.create_subprocess_exec(
             *cmd, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE, cwd=cwd
@@ -39,21 +69,20 @@ async def _run_command(
             stdout_bytes, stderr_bytes = await asyncio.wait_for(
                 process.communicate(), timeout=timeout
             )
-            stdout = stdout_bytes.decode("utf-8", errors="replace")
             stderr = stderr_bytes.decode("utf-8", errors="replace")
             returncode = process.returncode or 0
 
-            return stdout, stderr, returncode
+            return stdout_bytes, stderr, returncode
 
         except TimeoutError:
             process.kill()
             await process.communicate()
-            return "", f"Command timed out after {timeout}s", 1
+            return b"", f"Command timed out after {timeout}s", 1
 
     except FileNotFoundError:
-        return "", f"Command not found: {cmd[0]}", 127
+        return b"", f"Command not found: {cmd[0]}", 127
     except Exception as e:
-        return "", f"Error running command: {str(e)}", 1
+        return b"", f"Error running command: {str(e)}", 1
 
 
 async def run_ruff_impl(path: str, fix: bool = False, config: str | None = None) -> dict:
@@ -72,8 +101,7 @@ async def run_ruff_impl(path: str, fix: bool = False, config: str | None = None)
     if not path_obj.exists():
         return {"error": f"Path not found: {path}"}
 
-    # Always use as Python module
-    cmd = [sys.executable, "-m", "ruff", "check", str(path_obj), "--output-format=json"]
+    cmd = [*ruff_command(), "check", str(path_obj), "--output-format=json"]
 
     if fix:
         cmd.append("--fix")
@@ -81,7 +109,7 @@ async def run_ruff_impl(path: str, fix: bool = False, config: str | None = None)
     if config:
         cmd.extend(["--config", config])
 
-    stdout, stderr, returncode = await _run_command(cmd)
+    stdout, stderr, _ = await _run_command_bytes(cmd)
 
     # Ruff returns non-zero if it finds issues, which is expected
     if stderr and "not found" in stderr.lower():
@@ -89,7 +117,7 @@ async def run_ruff_impl(path: str, fix: bool = False, config: str | None = None)
 
     try:
         # Parse JSON output
-        issues = json.loads(stdout) if stdout.strip() else []
+        issues = json_loads(stdout) if stdout.strip() else []
 
         result = {
             "path": str(path_obj),
@@ -110,12 +138,37 @@ async def run_ruff_impl(path: str, fix: bool = False, config: str | None = None)
         return {
             "path": str(path_obj),
             "total_issues": 0,
-            "raw_output": stdout,
+            "raw_output": stdout.decode("utf-8", errors="replace"),
             "fixed": fix,
             "message": "Could not parse ruff output",
         }
 
 
+def _stop_dmypy_daemons() -> None:
+    """Stop every mypy daemon started by this process"""
+    for status_file in _dmypy_locks:
+        subprocess.run(
+            [sys.executable, "-m", "mypy.dmypy", "--status-file", status_file, "stop"],
+            capture_output=True,
+            timeout=30,
+            check=False,
+        )
+    if _dmypy_dir is not None:
+        shutil.rmtree(_dmypy_dir, ignore_errors=True)
+
+
+def _dmypy_status_file(options: list[str]) -> str:
+    """Return the daemon status file for a set of mypy options"""
+    global _dmypy_dir
+    if _dmypy_dir is None:
+        _dmypy_dir = tempfile.mkdtemp(prefix="dmypy-")
+        atexit.register(_stop_dmypy_daemons)
+    digest = hashlib.sha1("\0".join(options).encode(), usedforsecurity=False).hexdigest()[:12]
+    status_file = os.path.join(_dmypy_dir, f"{digest}.json")
+    _dmypy_locks.setdefault(status_file, asyncio.Lock())
+    return status_file
+
+
 async def run_mypy_impl(path: str, strict: bool = False, config: str | None = None) -> dict:
     """
     Implementation for run_mypy tool.
@@ -132,35 +185,49 @@ async def run_mypy_impl(path: str, strict: bool = False, config: str | None = No
     if not path_obj.exists():
         return {"error": f"Path not found: {path}"}
 
-    # Always use as Python module
-    cmd = [sys.executable, "-m", "mypy", str(path_obj)]
+    options = []
 
     if strict:
-        cmd.append("--strict")
+        options.append("--strict")
 
     if config:
-        cmd.extend(["--config-file", config])
-
-    stdout, stderr, returncode = await _run_command(cmd)
+        options.extend(["--config-file", config])
+
+    # Check through the mypy daemon; 'dmypy run' starts it on first use and
+    # restarts it if its options change
+    status_file = _dmypy_status_file(options)
+    cmd = [
+        sys.executable,
+        "-m",
+        "mypy.dmypy",
+        "--status-file",
+        status_file,
+        "run",
+        "--",
+        *options,
+        str(path_obj),
+    ]
+    async with _dmypy_locks[status_file]:
+        stdout, stderr, returncode = await _run_command(cmd)
+
+    if returncode == 2 and "daemon" in stderr.lower():
+        # The daemon could not be used; fall back to a one-off mypy run
+        cmd = [sys.executable, "-m", "mypy", *options, str(path_obj)]
+        stdout, stderr, returncode = await _run_command(cmd)
 
     if stderr and "not found" in stderr.lower():
         return {"error": stderr}
 
-    # Parse mypy output (format: file:line: error: message)
-    issues = []
-    for line in stdout.splitlines():
-        # Match pattern: path:line: error_type: message
-        match = re.match(r"^(.+?):(\d+):(?:\s+(\w+):)?\s*(.+)$", line)
-        if match:
-            file_path, line_num, error_type, message = match.groups()
-            issues.append(
-                {
-                    "file": file_path,
-                    "line": int(line_num),
-                    "type": error_type or "error",
-                    "message": message.strip(),
-                }
-            )
+    # Parse mypy output (format: file:line: error: message) in one pass
+    issues = [
+        {
+            "file": file_path,
+            "line": int(line_num),
+            "type": error_type or "error",
+            "message": message.strip(),
+        }
+        for file_path, line_num, error_type, message in _MYPY_RE.findall(stdout)
+    ]
 
     result = {
         "path": str(path_obj),
@@ -210,21 +277,12 @@ async def run_black_impl(path: str, check: bool = False, line_length: int | None
     if stderr and "not found" in stderr.lower():
         return {"error": stderr}
 
-    # Parse output for file counts
-    reformatted = 0
-    unchanged = 0
-
+    # Parse the summary for file counts
     combined_output = stdout + stderr
-    for line in combined_output.splitlines():
-        if "reformatted" in line.lower():
-            # Extract number from "X file(s) reformatted"
-            match = re.search(r"(\d+)\s+file", line)
-            if match:
-                reformatted = int(match.group(1))
-        elif "left unchanged" in line.lower():
-            match = re.search(r"(\d+)\s+file", line)
-            if match:
-                unchanged = int(match.group(1))
+    match = _BLACK_REFORMATTED_RE.search(combined_output)
+    reformatted = int(match.group(1)) if match else 0
+    match = _BLACK_UNCHANGED_RE.search(combined_output)
+    unchanged = int(match.group(1)) if match else 0
 
     result = {
         "path": str(path_obj),
@@ -289,14 +347,22 @@ async def lint_project_impl(path: str, fix: bool = False, strict_mypy: bool = Fa
     if not path_obj.is_dir():
         return {"error": f"Path is not a directory: {path}"}
 
-    # Run all tools in parallel
-    ruff_task = asyncio.create_task(run_ruff_impl(path, fix=fix))
-    mypy_task = asyncio.create_task(run_mypy_impl(path, strict=strict_mypy))
-    black_task = asyncio.create_task(run_black_impl(path, check=not fix))
+    async def ruff_then_black() -> tuple[dict, dict]:
+        # Both rewrite files when fixing, so they must not run concurrently
+        ruff_result = await run_ruff_impl(path, fix=True)
+        return ruff_result, await run_black_impl(path, check=False)
 
-    ruff_result = await ruff_task
-    mypy_result = await mypy_task
-    black_result = await black_task
+    # Run all tools in parallel
+    if fix:
+        (ruff_result, black_result), mypy_result = await asyncio.gather(
+            ruff_then_black(), run_mypy_impl(path, strict=strict_mypy)
+        )
+    else:
+        ruff_result, mypy_result, black_result = await asyncio.gather(
+            run_ruff_impl(path, fix=False),
+            run_mypy_impl(path, strict=strict_mypy),
+            run_black_impl(path, check=True),
+        )
 
     # Aggregate results
     total_issues = 0
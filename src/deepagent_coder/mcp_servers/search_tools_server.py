@@ -1,15 +1,251 @@
 """Search Tools MCP Server - filesystem search and navigation tools"""
 
-import json
-import shutil
+import asyncio
+import codecs
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable, Iterable, Iterator
+from concurrent.futures import ThreadPoolExecutor
+import contextlib
+import fnmatch
+import functools
+import itertools
+import logging
+import mmap
+import os
+import sqlite3
+import stat as stat_module
 import subprocess
+import sys
+import threading
+import time
 from typing import Any
 
+try:
+    import grp
+    import pwd
+except ImportError:  # Windows has no user or group database
+    grp = None  # type: ignore[assignment]
+    pwd = None  # type: ignore[assignment]
+
 from fastmcp import FastMCP
 
+from deepagent_coder.utils.fast_json import json_loads
+from deepagent_coder.utils.trigram_index import TrigramIndex
+from deepagent_coder.utils.which import which
+
+logger = logging.getLogger(__name__)
+
 mcp = FastMCP("Search Tools")
 
 
+def _in_thread[**P, R](fn: Callable[P, R]) -> Callable[P, Awaitable[R]]:
+    """
+    Wrap a blocking tool so the server runs it on a worker thread.
+
+    FastMCP calls synchronous tools on the event loop, so one long search would
+    stall every other request. The plain function stays importable for callers
+    that don't need the loop.
+    """
+
+    @functools.wraps(fn)
+    async def wrapper(*args: P.args, **kwargs: P.kwargs) -> R:
+        return await asyncio.to_thread(fn, *args, **kwargs)
+
+    return wrapper
+
+
+# Explicit file lists are passed to grep/rg in batches to stay under ARG_MAX
+_GREP_BATCH_FILES = 1000
+
+# Results returned per call by grep, ripgrep, find and ls unless the caller
+# asks for a different page size
+_MAX_RESULTS = 500
+
+_NO_RESULT = object()
+
+
+def _paginate[T](
+    results: Iterable[T], offset: int, max_results: int | None
+) -> tuple[list[T], bool]:
+    """
+    Take one page of results and report whether more follow.
+
+    Only one result past the page is consumed. A generator is then closed, so
+    a search behind it stops instead of producing output nobody reads.
+    """
+    iterator = iter(results)
+    try:
+        start = max(offset, 0)
+        stop = None if max_results is None else start + max_results
+        page = list(itertools.islice(iterator, start, stop))
+        more = stop is not None and next(iterator, _NO_RESULT) is not _NO_RESULT
+    finally:
+        close = getattr(iterator, "close", None)
+        if close is not None:
+            close()
+    return page, more
+
+
+def _truncation_marker(offset: int, max_results: int | None) -> dict[str, Any]:
+    """Final entry of a page that has more results after it"""
+    return {"truncated": True, "next_offset": max(offset, 0) + (max_results or 0)}
+
+
+# ls -l switches from showing the time to the year after about six months
+_SIX_MONTHS = 182 * 24 * 3600
+
+
+def _iter_raw_lines(cmd: list[str], timeout: int) -> Iterator[bytes]:
+    """
+    Yield a command's raw output lines, newline included, as they arrive.
+
+    Lines are parsed while the command is still running, so the full output is
+    never held in memory. Raises subprocess.TimeoutExpired if the command runs
+    longer than timeout seconds.
+    """
+    process = subprocess.Popen(
+        cmd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, bufsize=1 << 20
+    )
+    timed_out = threading.Event()
+
+    def kill() -> None:
+        timed_out.set()
+        process.kill()
+
+    timer = threading.Timer(timeout, kill)
+    timer.start()
+    try:
+        assert process.stdout is not None
+        yield from process.stdout
+        if timed_out.is_set():
+            raise subprocess.TimeoutExpired(cmd, timeout)
+    finally:
+        timer.cancel()
+        # The caller may stop early; don't leave the command running
+        if process.poll() is None:
+            process.kill()
+        process.stdout.close()  # type: ignore[union-attr]
+        process.wait()
+
+
+def _parse_rg_json(lines: Iterable[bytes], context: bool = False) -> Iterator[dict[str, Any]]:
+    """
+    Yield the match records from ripgrep --json output, and its context lines if
+    context is set
+
+    Each line's text is given as in the file, less its line ending.
+    """
+    markers = (b'"type":"match"', b'"type":"context"') if context else (b'"type":"match"',)
+    types = ("match", "context") if context else ("match",)
+    for line in lines:
+        # rg writes compact JSON, and a quote inside a string value is escaped,
+        # so this skips the other records without parsing them
+        if not any(marker in line for marker in markers):
+            continue
+        try:
+            data = json_loads(line)
+        except ValueError:
+            # Skip malformed JSON lines
+            continue
+        if data.get("type") in types:
+            match_data = data["data"]
+            # Context records have no submatches
+            submatches = match_data.get("submatches") or [{}]
+            yield {
+                "file": match_data["path"].get("text", ""),
+                "line": match_data["line_number"],
+                "text": match_data["lines"].get("text", "").rstrip("\r\n"),
+                "column": submatches[0].get("start", 0),
+            }
+
+
+def _run_rg_json(
+    args: list[str], timeout: int = 60, context: bool = False
+) -> Iterator[dict[str, Any]]:
+    """Run ripgrep with structured output and yield its matches as they arrive"""
+    lines = _iter_raw_lines(["rg", "--json", "-n", *args], timeout)
+    yield from _parse_rg_json(lines, context)
+
+
+def _grep_rg(
+    pattern: str,
+    paths: list[str],
+    file_pattern: str | None,
+    recursive: bool,
+    context_before: int,
+    context_after: int,
+    ignore_case: bool,
+    regex: bool,
+) -> Iterator[dict[str, Any]]:
+    """grep() through ripgrep, which reports file names without delimiter ambiguity"""
+    if not recursive:
+        # Without -r, grep skips directories instead of searching inside them
+        paths = [p for p in paths if not os.path.isdir(p)]
+        if not paths:
+            return
+    # Search every file grep -r would: hidden files and ignored paths included
+    args = ["--no-ignore", "--hidden"]
+    if ignore_case:
+        args.append("-i")
+    if not regex:
+        args.append("-F")
+    if context_before > 0:
+        args.extend(["-B", str(context_before)])
+    if context_after > 0:
+        args.extend(["-A", str(context_after)])
+    if file_pattern:
+        args.extend(["--glob", file_pattern])
+    args.extend(["-e", pattern, *paths])
+
+    # Context lines are part of grep's output too
+    for m in _run_rg_json(args, context=True):
+        yield {"file": m["file"], "line": str(m["line"]), "text": m["text"], "pattern": pattern}
+
+
+def _grep_gnu(cmd: list[str], pattern: str) -> Iterator[dict[str, Any]]:
+    """Run GNU grep with -n -H -Z and yield its output lines as matches"""
+    for raw in _iter_raw_lines(cmd, timeout=60):
+        # Format: file\0line:text, or file\0line-text for context lines
+        file_path, sep, rest = raw.partition(b"\0")
+        digits = len(rest) - len(rest.lstrip(b"0123456789"))
+        if not sep or not digits or rest[digits : digits + 1] not in (b":", b"-"):
+            continue
+        line_num, text = rest[:digits], rest[digits + 1 :]
+        yield {
+            "file": file_path.decode("utf-8", errors="replace"),
+            "line": line_num.decode("ascii"),
+            "text": text.decode("utf-8", errors="replace").rstrip("\r\n"),
+            "pattern": pattern,
+        }
+
+
+def _indexed_candidates(
+    pattern: str, path: str, file_pattern: str | None, ignore_case: bool
+) -> list[str] | None:
+    """Files below path the trigram index says may match, or None to search everything"""
+    # grep -F matches any one of a pattern's lines, so each line narrows on its own
+    lines = pattern.split("\n")
+    # The index folds ASCII case only, and needs a whole trigram to look up
+    if any(len(line.encode("utf-8")) < 3 for line in lines) or (
+        ignore_case and not pattern.isascii()
+    ):
+        return None
+    try:
+        index = TrigramIndex()
+        candidates = sorted({c for line in lines for c in index.candidates(path, line)})
+    except (OSError, sqlite3.Error) as e:
+        logger.warning("Trigram index unavailable, searching all files: %s", e)
+        return None
+
+    # Report paths the way grep -r on the original path would
+    root = os.path.abspath(path)
+    return [
+        os.path.join(path, os.path.relpath(candidate, root))
+        for candidate in candidates
+        if file_pattern is None or fnmatch.fnmatchcase(os.path.basename(candidate), file_pattern)
+    ]
+
+
 def grep(
     pattern: str,
     path: str = ".",
@@ -19,6 +255,9 @@ def grep(
     context_after: int = 0,
     ignore_case: bool = False,
     regex: bool = False,
+    indexed: bool = False,
+    max_results: int | None = _MAX_RESULTS,
+    offset: int = 0,
 ) -> list[dict[str, Any]]:
     """
     Search for pattern in files using grep.
@@ -32,10 +271,30 @@ def grep(
         context_after: Number of lines to show after match
         ignore_case: Case-insensitive search
         regex: Treat pattern as regex (default: fixed string)
+        indexed: Narrow recursive fixed-string searches with a persistent
+            trigram index, so repeated searches of a large tree only read
+            files that can contain the pattern
+        max_results: Maximum matches returned (default: 500; None for all)
+        offset: Number of matches to skip, to fetch the next page
 
     Returns:
-        List of matches with file, line number, and text
+        List of matches with file, line number, and text. When more matches
+        follow, a final {"truncated": True, "next_offset": N} entry says where
+        the next page starts.
     """
+    targets = [path]
+    if indexed and recursive and not regex and os.path.isdir(path):
+        candidates = _indexed_candidates(pattern, path, file_pattern, ignore_case)
+        if candidates is not None:
+            if not candidates:
+                return []
+            targets = candidates
+    batches = [
+        targets[i : i + _GREP_BATCH_FILES] for i in range(0, len(targets), _GREP_BATCH_FILES)
+    ]
+
+    use_rg = which("rg") is not None
+
     cmd = ["grep"]
 
     # Build grep flags
@@ -48,8 +307,9 @@ def grep(
     else:
         cmd.append("-F")  # Fixed string (faster)
 
-    # Line numbers always
-    cmd.append("-n")
+    # Line numbers and file names always; -Z ends each file name with a NUL
+    # so names containing ':' still parse
+    cmd.extend(["-n", "-H", "-Z"])
 
     # Context lines
     if context_before > 0:
@@ -57,51 +317,132 @@ def grep(
     if context_after > 0:
         cmd.extend(["-A", str(context_after)])
 
-    # Add pattern and path
-    cmd.append(pattern)
-    cmd.append(path)
-
     # File pattern filter
     if file_pattern:
         cmd.extend(["--include", file_pattern])
 
-    try:
-        result = subprocess.run(
-            cmd,
-            capture_output=True,
-            text=True,
-            timeout=60,
-        )
-
-        # Parse grep output
-        matches = []
-        for line in result.stdout.strip().split("\n"):
-            if line and ":" in line:
-                # Format: file:line:text or file:line-text (for context)
-                parts = line.split(":", 2)
-                if len(parts) >= 3:
-                    file_path = parts[0]
-                    line_num = parts[1]
-                    text = parts[2] if len(parts) > 2 else ""
-
-                    matches.append(
-                        {
-                            "file": file_path,
-                            "line": line_num,
-                            "text": text,
-                            "pattern": pattern,
-                        }
-                    )
+    cmd.extend(["-e", pattern])
+
+    def search() -> Iterator[dict[str, Any]]:
+        for batch in batches:
+            if use_rg:
+                yield from _grep_rg(
+                    pattern,
+                    batch,
+                    file_pattern,
+                    recursive,
+                    context_before,
+                    context_after,
+                    ignore_case,
+                    regex,
+                )
+            else:
+                yield from _grep_gnu([*cmd, *batch], pattern)
 
-        return matches
+    try:
+        matches, more = _paginate(search(), offset, max_results)
     except subprocess.TimeoutExpired:
         return [{"error": "Search timed out after 60 seconds"}]
     except Exception as e:
         return [{"error": f"Grep failed: {str(e)}"}]
+    if more:
+        matches.append(_truncation_marker(offset, max_results))
+    return matches
 
 
 # Register the function as an MCP tool
-mcp.tool()(grep)
+mcp.tool()(_in_thread(grep))
+
+
+# Parallel directory reads pay off on Linux; on macOS readdir serializes on a
+# kernel lock, so the walk stays on one thread there
+_PARALLEL_WALK = sys.platform != "darwin"
+_WALK_WORKERS = min(32, (os.cpu_count() or 1) * 2)
+
+# The find -type letters this walker supports
+_ENTRY_TYPES = ("f", "d", "l")
+
+# A selective filter over a huge tree may never fill a page, so the walk is
+# abandoned after this many seconds
+_FIND_TIMEOUT = 30
+
+
+def _entry_type(entry: os.DirEntry[str]) -> str:
+    """find's -type letter for an entry, from the directory listing without a stat"""
+    if entry.is_symlink():
+        return "l"
+    if entry.is_dir(follow_symlinks=False):
+        return "d"
+    return "f" if entry.is_file(follow_symlinks=False) else "?"
+
+
+def _walk(
+    root: str,
+    max_depth: int | None,
+    type_filter: str | None,
+    name_glob: str | None,
+    parallel: bool = False,
+    deadline: float | None = None,
+) -> Iterator[str]:
+    """
+    Yield the paths find would print, walking the tree breadth-first with scandir
+
+    Raises TimeoutError once time.monotonic() passes deadline.
+    """
+
+    def wanted(name: str, entry_type: str) -> bool:
+        if type_filter is not None and entry_type != type_filter:
+            return False
+        return name_glob is None or fnmatch.fnmatchcase(name, name_glob)
+
+    # Like find, the starting point is itself a candidate at depth 0
+    mode = os.lstat(root).st_mode
+    if stat_module.S_ISLNK(mode):
+        root_type = "l"
+    elif stat_module.S_ISDIR(mode):
+        root_type = "d"
+    else:
+        root_type = "f" if stat_module.S_ISREG(mode) else "?"
+    if wanted(os.path.basename(root.rstrip(os.sep)) or root, root_type):
+        yield root
+
+    def scan(directory: str) -> tuple[list[str], list[str]]:
+        matches: list[str] = []
+        subdirectories: list[str] = []
+        try:
+            it = os.scandir(directory)
+        except OSError:
+            # find reports unreadable directories and carries on
+            return matches, subdirectories
+        with it:
+            for entry in it:
+                entry_type = _entry_type(entry)
+                if wanted(entry.name, entry_type):
+                    matches.append(entry.path)
+                if entry_type == "d":
+                    subdirectories.append(entry.path)
+        return matches, subdirectories
+
+    level = [root] if root_type == "d" else []
+    depth = 0
+    with ThreadPoolExecutor(max_workers=_WALK_WORKERS) as executor:
+        while level and (max_depth is None or depth < max_depth):
+            # Directories of one level are scanned concurrently; scandir drops
+            # the GIL, so the kernel can service several readdirs at once
+            if parallel and _PARALLEL_WALK and len(level) > 1:
+                results = executor.map(scan, level)
+            else:
+                results = map(scan, level)
+            next_level = []
+            for matches, subdirectories in results:
+                if deadline is not None and time.monotonic() > deadline:
+                    # Don't wait for the rest of the level's scans
+                    executor.shutdown(wait=False, cancel_futures=True)
+                    raise TimeoutError
+                yield from matches
+                next_level.extend(subdirectories)
+            level = next_level
+            depth += 1
 
 
 def find(
@@ -110,6 +451,9 @@ def find(
     type: str | None = None,  # "f" for file, "d" for directory
     extension: str | None = None,
     max_depth: int | None = None,
+    parallel: bool = False,
+    max_results: int | None = _MAX_RESULTS,
+    offset: int = 0,
 ) -> list[str]:
     """
     Find files and directories by name, type, or extension.
@@ -120,47 +464,129 @@ def find(
         type: "f" for files only, "d" for directories only
         extension: File extension to match (without dot)
         max_depth: Maximum depth to search
+        parallel: Read directories from several threads; faster on network or
+            cold-cache filesystems, slower when the tree is already cached
+        max_results: Maximum paths returned (default: 500; None for all)
+        offset: Number of paths to skip, to fetch the next page
 
     Returns:
-        List of file/directory paths
+        List of file/directory paths. When more paths follow, the walk stops
+        and a final "Truncated: ..." entry gives the offset of the next page.
     """
-    cmd = ["find", path]
-
-    if max_depth is not None:
-        cmd.extend(["-maxdepth", str(max_depth)])
-
-    if type:
-        cmd.extend(["-type", type])
-
-    if name:
-        cmd.extend(["-name", name])
-    elif extension:
-        cmd.extend(["-name", f"*.{extension}"])
+    if type is not None and type not in _ENTRY_TYPES:
+        return [f"Error: Unsupported type: {type}"]
 
+    name_glob = name or (f"*.{extension}" if extension else None)
+    deadline = time.monotonic() + _FIND_TIMEOUT
     try:
-        result = subprocess.run(
-            cmd,
-            capture_output=True,
-            text=True,
-            timeout=30,
+        paths, more = _paginate(
+            _walk(path, max_depth, type, name_glob, parallel, deadline), offset, max_results
         )
-
-        files = [f for f in result.stdout.strip().split("\n") if f]
-        return files
-    except subprocess.TimeoutExpired:
-        return ["Error: Find timed out after 30 seconds"]
+    except TimeoutError:
+        return [f"Error: Find timed out after {_FIND_TIMEOUT} seconds"]
     except Exception as e:
         return [f"Error: {str(e)}"]
+    if more:
+        next_offset = _truncation_marker(offset, max_results)["next_offset"]
+        paths.append(f"Truncated: more results, next_offset={next_offset}")
+    return paths
 
 
 # Register the find function as an MCP tool
-mcp.tool()(find)
+mcp.tool()(_in_thread(find))
+
+
+class _PathEntry:
+    """A path given by name rather than by scandir, shaped like an os.DirEntry"""
+
+    def __init__(self, path: str, name: str | None = None) -> None:
+        self.name = path if name is None else name
+        self.path = path
+
+    def stat(self, *, follow_symlinks: bool = True) -> os.stat_result:
+        return os.stat(self.path, follow_symlinks=follow_symlinks)
+
+
+_LS_CACHE_SIZE = 256
+
+# Directories modified this recently are re-read, since a further change within
+# the same timestamp tick would not alter their mtime
+_LS_RACY_SECONDS = 2.0
+
+_ls_cache: OrderedDict[tuple[int, int, int], tuple[str, ...]] = OrderedDict()
+# ls runs on worker threads, and OrderedDict reordering is not thread-safe
+_ls_cache_lock = threading.Lock()
+
+
+def _directory_names(path: str) -> tuple[str, ...]:
+    """
+    Sorted names of all entries in a directory, hidden ones included.
+
+    Adding, removing or renaming an entry updates the directory's mtime, so a
+    listing is reused for as long as the mtime is unchanged.
+    """
+    st = os.stat(path)
+    key = (st.st_dev, st.st_ino, st.st_mtime_ns)
+    with _ls_cache_lock:
+        if key in _ls_cache:
+            _ls_cache.move_to_end(key)
+            return _ls_cache[key]
+
+    with os.scandir(path) as it:
+        names = tuple(sorted(entry.name for entry in it))
+    if time.time() - st.st_mtime >= _LS_RACY_SECONDS:
+        with _ls_cache_lock:
+            _ls_cache[key] = names
+            while len(_ls_cache) > _LS_CACHE_SIZE:
+                _ls_cache.popitem(last=False)
+    return names
+
+
+@functools.cache
+def _user_name(uid: int) -> str:
+    try:
+        return pwd.getpwuid(uid).pw_name  # type: ignore[union-attr]
+    except (AttributeError, KeyError):
+        return str(uid)
+
+
+@functools.cache
+def _group_name(gid: int) -> str:
+    try:
+        return grp.getgrgid(gid).gr_name  # type: ignore[union-attr]
+    except (AttributeError, KeyError):
+        return str(gid)
+
+
+def _long_listing(entry: _PathEntry) -> dict[str, Any]:
+    """Describe an entry with the fields of an 'ls -l' line"""
+    st = entry.stat(follow_symlinks=False)
+    modified = time.localtime(st.st_mtime)
+    # ls shows the time for recent files and the year for older ones
+    if abs(time.time() - st.st_mtime) < _SIX_MONTHS:
+        when = time.strftime("%H:%M", modified)
+    else:
+        when = str(modified.tm_year)
+    name = entry.name
+    if stat_module.S_ISLNK(st.st_mode):
+        name = f"{name} -> {os.readlink(entry.path)}"
+    return {
+        "permissions": stat_module.filemode(st.st_mode),
+        "links": str(st.st_nlink),
+        "owner": _user_name(st.st_uid),
+        "group": _group_name(st.st_gid),
+        "size": str(st.st_size),
+        "date": f"{time.strftime('%b', modified)} {modified.tm_mday} {when}",
+        "name": name,
+    }
 
 
 def ls(
     path: str = ".",
     all_files: bool = False,
     long_format: bool = False,
+    max_results: int | None = _MAX_RESULTS,
+    offset: int = 0,
 ) -> list[dict[str, Any]] | list[str]:
     """
     List directory contents.
@@ -169,64 +595,89 @@ def ls(
         path: Directory to list
         all_files: Include hidden files (starting with .)
         long_format: Show detailed information (permissions, size, date)
+        max_results: Maximum entries returned (default: 500; None for all)
+        offset: Number of entries to skip, to fetch the next page
 
     Returns:
-        List of files/directories (strings or dicts if long_format)
+        List of files/directories (strings or dicts if long_format). When more
+        entries follow, a final truncation entry gives the next page's offset:
+        {"truncated": True, "next_offset": N} in long format, otherwise
+        "Truncated: more results, next_offset=N".
     """
-    cmd = ["ls"]
-
-    if all_files:
-        cmd.append("-a")
-    if long_format:
-        cmd.append("-l")
-
-    cmd.append(path)
-
     try:
-        result = subprocess.run(
-            cmd,
-            capture_output=True,
-            text=True,
-            timeout=10,
-        )
-
+        if os.path.isdir(path):
+            names, more = _paginate(
+                (n for n in _directory_names(path) if all_files or not n.startswith(".")),
+                offset,
+                max_results,
+            )
+            marker = _truncation_marker(offset, max_results)
+            if long_format:
+                # Entry metadata changes without touching the directory's
+                # mtime, so only the names come from the cache; only the
+                # entries on this page are stat'ed
+                listing = [_long_listing(_PathEntry(os.path.join(path, n), n)) for n in names]
+                return [*listing, marker] if more else listing
+            if more:
+                names.append(f"Truncated: more results, next_offset={marker['next_offset']}")
+            return names
+
+        # Like ls, a file argument lists just that file
+        os.lstat(path)
         if long_format:
-            # Parse ls -l output
-            files = []
-            lines = result.stdout.strip().split("\n")
-
-            # Skip first line if it's "total XXX"
-            start_idx = 1 if lines and lines[0].startswith("total") else 0
-
-            for line in lines[start_idx:]:
-                if line:
-                    parts = line.split(None, 8)
-                    if len(parts) >= 9:
-                        files.append(
-                            {
-                                "permissions": parts[0],
-                                "links": parts[1],
-                                "owner": parts[2],
-                                "group": parts[3],
-                                "size": parts[4],
-                                "date": f"{parts[5]} {parts[6]} {parts[7]}",
-                                "name": parts[8],
-                            }
-                        )
-                    elif len(parts) >= 1:
-                        # Simpler format for some systems
-                        files.append({"name": " ".join(parts)})
-            return files
-        else:
-            files = result.stdout.strip().split("\n")
-            return [f for f in files if f]
+            return [_long_listing(_PathEntry(path))]
+        return [path]
 
     except Exception as e:
         return [{"error": str(e)}]
 
 
 # Register the ls function as an MCP tool
-mcp.tool()(ls)
+mcp.tool()(_in_thread(ls))
+
+
+def _open_noatime(path: str) -> int:
+    """Open a file for reading without updating its access time where allowed"""
+    noatime = getattr(os, "O_NOATIME", 0)
+    if noatime:
+        try:
+            return os.open(path, os.O_RDONLY | noatime)
+        except PermissionError:
+            # O_NOATIME needs file ownership or CAP_FOWNER
+            pass
+    return os.open(path, os.O_RDONLY)
+
+
+def _open_sequential(path: str) -> int:
+    """Open a file that will be read front to back, widening kernel readahead"""
+    fd = _open_noatime(path)
+    if hasattr(os, "posix_fadvise"):
+        with contextlib.suppress(OSError):
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_SEQUENTIAL)
+    return fd
+
+
+# Files at least this large have their first lines located through a mapping
+_HEAD_MMAP_MIN_BYTES = 65536
+
+
+def _head_mapped(fd: int, lines: int) -> str:
+    """First lines of a large file, decoding only the bytes up to the last of them"""
+    with mmap.mmap(fd, 0, access=mmap.ACCESS_READ) as mapped:
+        end = 0
+        for _ in range(lines):
+            found = mapped.find(b"\n", end)
+            if found < 0:
+                end = len(mapped)
+                break
+            end = found + 1
+        text = mapped[:end].decode("utf-8")
+    # Match text-mode line iteration, which also breaks lines on a lone \r
+    head_lines = text.replace("\r\n", "\n").replace("\r", "\n").split("\n")
+    if head_lines[-1] == "":
+        # A final line break does not start another line
+        head_lines.pop()
+    return "\n".join(line.rstrip() for line in head_lines[:lines])
 
 
 def head(file_path: str, lines: int = 10) -> str:
@@ -241,7 +692,9 @@ def head(file_path: str, lines: int = 10) -> str:
         First N lines of file as string
     """
     try:
-        with open(file_path, encoding="utf-8") as f:
+        with open(_open_sequential(file_path), encoding="utf-8") as f:
+            if lines > 0 and os.fstat(f.fileno()).st_size >= _HEAD_MMAP_MIN_BYTES:
+                return _head_mapped(f.fileno(), lines)
             head_lines = []
             for i, line in enumerate(f):
                 if i >= lines:
@@ -253,7 +706,28 @@ def head(file_path: str, lines: int = 10) -> str:
 
 
 # Register the head function as an MCP tool
-mcp.tool()(head)
+mcp.tool()(_in_thread(head))
+
+
+_TAIL_BLOCK_SIZE = 65536
+
+
+def _tail_blocks(file_path: str, lines: int) -> list[bytes]:
+    """Read whole blocks back from the end of a file until they hold the last lines"""
+    blocks: list[bytes] = []
+    newlines = 0
+    with open(_open_noatime(file_path), "rb") as f:
+        position = f.seek(0, os.SEEK_END)
+        # One newline more than lines, since the file usually ends with one
+        while position > 0 and newlines <= lines:
+            size = min(_TAIL_BLOCK_SIZE, position)
+            position -= size
+            f.seek(position)
+            block = f.read(size)
+            newlines += block.count(b"\n")
+            blocks.append(block)
+    blocks.reverse()
+    return blocks
 
 
 def tail(file_path: str, lines: int = 10) -> str:
@@ -268,16 +742,22 @@ def tail(file_path: str, lines: int = 10) -> str:
         Last N lines of file as string
     """
     try:
-        with open(file_path, encoding="utf-8") as f:
-            all_lines = f.readlines()
-            tail_lines = all_lines[-lines:] if len(all_lines) > lines else all_lines
-        return "".join(tail_lines).rstrip()
+        if lines <= 0:
+            return ""
+        data = b"".join(_tail_blocks(file_path, lines))
+        tail_lines = data.splitlines(keepends=True)[-lines:]
+        text = b"".join(tail_lines).decode("utf-8")
+        # Match text-mode reads, which translate \r\n and \r to \n
+        return text.replace("\r\n", "\n").replace("\r", "\n").rstrip()
     except Exception as e:
         return f"Error: {str(e)}"
 
 
 # Register the tail function as an MCP tool
-mcp.tool()(tail)
+mcp.tool()(_in_thread(tail))
+
+
+_WC_CHUNK_SIZE = 1 << 20
 
 
 def wc(
@@ -299,18 +779,37 @@ def wc(
         Dictionary with requested counts
     """
     try:
-        with open(file_path, encoding="utf-8") as f:
-            content = f.read()
+        # Counts match reading the whole file in text mode, where \r\n and \r
+        # become \n, but only one chunk is held in memory at a time
+        decoder = codecs.getincrementaldecoder("utf-8")()
+        breaks = crlf = word_count = length = 0
+        last = ""
+        with open(_open_sequential(file_path), "rb") as f:
+            while True:
+                chunk = f.read(_WC_CHUNK_SIZE)
+                text = decoder.decode(chunk, final=not chunk)
+                if text:
+                    breaks += text.count("\n") + text.count("\r")
+                    crlf += text.count("\r\n")
+                    if last == "\r" and text[0] == "\n":
+                        crlf += 1
+                    if words:
+                        word_count += len(text.split())
+                        # A word straddling the chunk boundary was counted twice
+                        if last and not last.isspace() and not text[0].isspace():
+                            word_count -= 1
+                    length += len(text)
+                    last = text[-1]
+                if not chunk:
+                    break
 
         result = {}
         if lines:
-            result["lines"] = content.count("\n") + (
-                1 if content and not content.endswith("\n") else 0
-            )
+            result["lines"] = breaks - crlf + (1 if last and last not in "\r\n" else 0)
         if words:
-            result["words"] = len(content.split())
+            result["words"] = word_count
         if chars:
-            result["characters"] = len(content)
+            result["characters"] = length - crlf
 
         return result
     except Exception as e:
@@ -318,7 +817,7 @@ def wc(
 
 
 # Register the wc function as an MCP tool
-mcp.tool()(wc)
+mcp.tool()(_in_thread(wc))
 
 
 def ripgrep(
@@ -327,6 +826,8 @@ def ripgrep(
     file_type: str | None = None,
     context: int = 0,
     multiline: bool = False,
+    max_results: int | None = _MAX_RESULTS,
+    offset: int = 0,
 ) -> list[dict[str, Any]]:
     """
     Fast search using ripgrep (if available), falls back to grep.
@@ -337,65 +838,65 @@ def ripgrep(
         file_type: Language/file type to filter (e.g., "py", "js")
         context: Number of context lines before and after match
         multiline: Enable multiline search
+        max_results: Maximum matches returned (default: 500; None for all)
+        offset: Number of matches to skip, to fetch the next page
 
     Returns:
-        List of matches with file, line number, and text
+        List of matches with file, line number, and text. When more matches
+        follow, a final {"truncated": True, "next_offset": N} entry says where
+        the next page starts.
     """
     # Check if ripgrep is available
-    if not shutil.which("rg"):
+    if not which("rg"):
         # Fallback to grep
-        return grep(pattern=pattern, path=path, recursive=True, regex=True)
+        return grep(
+            pattern=pattern,
+            path=path,
+            recursive=True,
+            regex=True,
+            max_results=max_results,
+            offset=offset,
+        )
 
-    cmd = ["rg", "--json", "-n"]
+    args = []
 
     if file_type:
-        cmd.extend(["-t", file_type])
+        args.extend(["-t", file_type])
 
     if context > 0:
-        cmd.extend(["-C", str(context)])
+        args.extend(["-C", str(context)])
 
     if multiline:
-        cmd.append("--multiline")
+        args.append("--multiline")
 
-    cmd.extend([pattern, path])
+    args.extend([pattern, path])
 
-    try:
-        result = subprocess.run(
-            cmd,
-            capture_output=True,
-            text=True,
-            timeout=60,
-        )
+    def search() -> Iterator[dict[str, Any]]:
+        for match in _run_rg_json(args):
+            match["text"] = match["text"].strip()
+            yield match
 
-        matches = []
-        for line in result.stdout.strip().split("\n"):
-            if line:
-                try:
-                    data = json.loads(line)
-                    if data.get("type") == "match":
-                        match_data = data["data"]
-                        matches.append(
-                            {
-                                "file": match_data["path"]["text"],
-                                "line": match_data["line_number"],
-                                "text": match_data["lines"]["text"].strip(),
-                                "column": match_data.get("submatches", [{}])[0].get("start", 0),
-                            }
-                        )
-                except json.JSONDecodeError:
-                    # Skip malformed JSON lines
-                    pass
-
-        return matches if matches else []
+    try:
+        matches, more = _paginate(search(), offset, max_results)
+        if more:
+            matches.append(_truncation_marker(offset, max_results))
+        return matches
     except subprocess.TimeoutExpired:
         return [{"error": "Ripgrep timed out after 60 seconds"}]
     except Exception:
         # Fallback to grep on any error
-        return grep(pattern=pattern, path=path, recursive=True, regex=True)
+        return grep(
+            pattern=pattern,
+            path=path,
+            recursive=True,
+            regex=True,
+            max_results=max_results,
+            offset=offset,
+        )
 
 
 # Register the ripgrep function as an MCP tool
-mcp.tool()(ripgrep)
+mcp.tool()(_in_thread(ripgrep))
 
 
 def run_server():
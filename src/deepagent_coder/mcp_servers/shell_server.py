@@ -1,22 +1,102 @@
 """Shell command execution MCP server - run arbitrary shell commands"""
 
 import asyncio
+from collections import deque
+import functools
 import os
 import platform
-import shutil
+import re
+import shlex
 import sys
 from typing import Any
 
 from fastmcp import FastMCP
 
+from deepagent_coder.utils.which import which
+
 mcp = FastMCP("Shell Tools")
 
+_READ_CHUNK_SIZE = 65536
+
+# Characters that make a command need the shell: operators, expansions,
+# globs, comments and line breaks
+_SHELL_SYNTAX = re.compile(r"[|&;<>()$`\\*?\[\]#~{}\n\r]")
+
+# Builtins and keywords, which either have no executable or behave differently
+# from it (echo, printf, test)
+_SHELL_WORDS = frozenset("""
+    ! . : [ alias bg break case cd command continue do done echo elif else esac eval
+    exec exit export false fc fg fi for function getopts hash if in jobs kill local
+    printf pwd read readonly return select set shift source test then time times
+    trap true type ulimit umask unalias unset until wait while
+    """.split())  # noqa: SIM905
+
+
+@functools.lru_cache(maxsize=256)
+def _direct_argv(command: str) -> tuple[str, ...] | None:
+    """
+    Split a command that the shell would run as a single plain program
+
+    Returns None when running it needs the shell: any operator, expansion or
+    glob, a leading variable assignment, a builtin or keyword, or a program
+    named by path (which would resolve against the command's cwd).
+    """
+    if _SHELL_SYNTAX.search(command):
+        return None
+    try:
+        argv = tuple(shlex.split(command))
+    except ValueError:
+        return None
+    if not argv or argv[0] in _SHELL_WORDS or "=" in argv[0] or "/" in argv[0]:
+        return None
+    return argv
+
+
+async def _read_capped(stream: asyncio.StreamReader, limit: int, tail: bool) -> tuple[bytes, bool]:
+    """
+    Drain a subprocess pipe while holding at most about limit bytes of it
+
+    Keeps the first limit bytes, or the last limit bytes (starting on a line
+    boundary) when tail is set. Returns the kept bytes and whether any output
+    was dropped.
+    """
+    chunks: deque[bytes] = deque()
+    size = 0
+    truncated = False
+    while chunk := await stream.read(_READ_CHUNK_SIZE):
+        if tail:
+            chunks.append(chunk)
+            size += len(chunk)
+            while len(chunks) > 1 and size - len(chunks[0]) >= limit:
+                size -= len(chunks.popleft())
+                truncated = True
+        elif size < limit:
+            chunks.append(chunk[: limit - size])
+            size += len(chunks[-1])
+            truncated = truncated or len(chunk) > len(chunks[-1])
+        else:
+            truncated = True
+
+    data = b"".join(chunks)
+    if tail and len(data) > limit:
+        data = data[len(data) - limit :]
+        truncated = True
+    if tail and truncated:
+        # Drop the partial first line
+        newline = data.find(b"\n")
+        if newline != -1:
+            data = data[newline + 1 :]
+    return data, truncated
+
 
 async def run_command(
     command: str,
     cwd: str | None = None,
     timeout: int = 300,
     env: dict[str, str] | None = None,
+    max_output_bytes: int | None = None,
+    tail: bool = False,
+    encoding: str | None = "utf-8",
 ) -> dict[str, Any]:
     """
     Execute a shell command with proper safety controls
@@ -26,9 +106,17 @@ async def run_command(
         cwd: Working directory (optional, defaults to current directory)
         timeout: Maximum execution time in seconds (default: 300/5 minutes)
         env: Environment variables to set (optional, merges with current env)
+        max_output_bytes: Cap on bytes kept from each of stdout and stderr
+            (optional, unbounded by default). Output is streamed, so memory
+            stays bounded however much the command prints.
+        tail: Keep the end of capped output instead of the beginning
+        encoding: Codec for decoding stdout and stderr (default: utf-8). None
+            returns a completed command's output as raw bytes, for callers
+            that never need text.
 
     Returns:
-        Dictionary with stdout, stderr, returncode, and optional error
+        Dictionary with stdout, stderr, returncode, and optional error. When
+        max_output_bytes is set, also truncated (True if output was dropped).
 
     Example:
         >>> await run_command("echo 'Hello World'")
@@ -38,16 +126,21 @@ async def run_command(
         {'stdout': '...', 'stderr': '', 'returncode': 0}
     """
     try:
-        # Prepare environment
-        command_env = os.environ.copy()
-        if env:
-            command_env.update(env)
+        # Without overrides the child simply inherits our environment
+        command_env = {**os.environ, **env} if env else None
 
         # Determine shell based on platform
         if platform.system() == "Windows":
             shell_cmd = ["cmd", "/c", command]
         else:
-            shell_cmd = ["/bin/sh", "-c", command]
+            # A plain program invocation skips the shell's own startup. Unknown
+            # programs and PATH overrides are left to the shell, so its "not
+            # found" handling is unchanged
+            argv = _direct_argv(command)
+            if argv is not None and not (env and "PATH" in env) and which(argv[0]):
+                shell_cmd = list(argv)
+            else:
+                shell_cmd = ["/bin/sh", "-c", command]
 
         # Execute command
         process = await asyncio.create_subprocess_exec(
@@ -59,13 +152,30 @@ async def run_command(
         )
 
         try:
-            stdout, stderr = await asyncio.wait_for(process.communicate(), timeout=timeout)
-
-            return {
-                "stdout": stdout.decode("utf-8", errors="replace"),
-                "stderr": stderr.decode("utf-8", errors="replace"),
-                "returncode": process.returncode,
-            }
+            if max_output_bytes is None:
+                stdout, stderr = await asyncio.wait_for(process.communicate(), timeout=timeout)
+            else:
+                assert process.stdout is not None and process.stderr is not None
+                (stdout, stdout_truncated), (stderr, stderr_truncated), _ = await asyncio.wait_for(
+                    asyncio.gather(
+                        _read_capped(process.stdout, max_output_bytes, tail),
+                        _read_capped(process.stderr, max_output_bytes, tail),
+                        process.wait(),
+                    ),
+                    timeout=timeout,
+                )
+
+            if encoding is None:
+                result: dict[str, Any] = {"stdout": stdout, "stderr": stderr}
+            else:
+                result = {
+                    "stdout": stdout.decode(encoding, errors="replace"),
+                    "stderr": stderr.decode(encoding, errors="replace"),
+                }
+            result["returncode"] = process.returncode
+            if max_output_bytes is not None:
+                result["truncated"] = stdout_truncated or stderr_truncated
+            return result
 
         except TimeoutError:
             process.kill()
@@ -106,6 +216,8 @@ async def run_shell_command(
     cwd: str | None = None,
     timeout: int = 300,
     env: dict[str, str] | None = None,
+    max_output_bytes: int = 1_048_576,
+    tail: bool = False,
 ) -> dict[str, Any]:
     """
     Execute a shell command
@@ -122,6 +234,9 @@ async def run_shell_command(
         cwd: Working directory for command execution (optional)
         timeout: Maximum execution time in seconds (default: 300)
         env: Additional environment variables (optional)
+        max_output_bytes: Maximum bytes returned from each of stdout and stderr
+            (default: 1 MiB); longer output is truncated
+        tail: Return the end of truncated output instead of the start, e.g. for logs
 
     Returns:
         Dictionary containing:
@@ -129,8 +244,15 @@ async def run_shell_command(
         - stderr: Command standard error
         - returncode: Exit code (0 for success)
         - error: Error message if command failed
+        - truncated: Whether output was cut to max_output_bytes
     """
-    return await run_command(command, cwd, timeout, env)
+    return await run_command(
+        command, cwd, timeout, env, max_output_bytes=max_output_bytes, tail=tail
+    )
+
+
+# Shell path -> version string reported by get_shell_info
+_shell_versions: dict[str, str] = {}
 
 
 async def get_shell_info() -> dict[str, Any]:
@@ -150,16 +272,20 @@ async def get_shell_info() -> dict[str, Any]:
         shell = os.environ.get("SHELL", "/bin/sh")
         shell_path = shell
 
-    # Get shell version
-    try:
-        if system == "Windows":
-            version_result = await run_command("ver")
-        else:
-            version_result = await run_command(f"{shell} --version 2>&1 | head -1")
+    # Get shell version; a shell binary's version doesn't change while we run,
+    # so probe each shell once
+    version = _shell_versions.get(shell_path)
+    if version is None:
+        try:
+            if system == "Windows":
+                version_result = await run_command("ver")
+            else:
+                version_result = await run_command(f"{shell} --version 2>&1 | head -1")
 
-        version = version_result.get("stdout", "").strip() or "Unknown"
-    except Exception:
-        version = "Unknown"
+            version = version_result.get("stdout", "").strip() or "Unknown"
+            _shell_versions[shell_path] = version
+        except Exception:
+            version = "Unknown"
 
     return {
         "shell": shell,
@@ -194,7 +320,7 @@ async def check_command_exists(command: str) -> dict[str, Any]:
         - exists: Boolean indicating if command is available
         - path: Full path to command (if exists)
     """
-    command_path = shutil.which(command)
+    command_path = which(command)
 
     return {
         "exists": command_path is not None,
@@ -1,28 +1,292 @@
 """Static analysis MCP server - Linting, security scanning, type/doc coverage"""
 
 import ast
+import asyncio
+from collections.abc import Callable, Sequence
+import functools
+import hashlib
+from importlib import metadata
+from importlib.util import find_spec
+import logging
+import os
 from pathlib import Path
-import subprocess
+import sqlite3
 import sys
 from typing import Any
 
 from fastmcp import FastMCP
 
+from deepagent_coder.utils.executors import cpu_pool
+from deepagent_coder.utils.fast_json import json_loads
+from deepagent_coder.utils.result_cache import Fingerprint, ResultCache, file_digest
+from deepagent_coder.utils.ruff_command import ruff_command
+from deepagent_coder.utils.source_files import iter_python_files
+
+logger = logging.getLogger(__name__)
+
 mcp = FastMCP("Static Analysis")
 
+# Bump when a tool's result format changes, so older cached results are ignored
+_CACHE_VERSION = 2
+
+# Config files the linters and bandit pick up from a file's directory upwards
+_CONFIG_NAMES = (
+    "pyproject.toml",
+    "setup.cfg",
+    "tox.ini",
+    ".pylintrc",
+    "pylintrc",
+    "ruff.toml",
+    ".ruff.toml",
+    ".flake8",
+    ".bandit",
+)
+
+# Linters whose findings for a file depend only on the file and its config.
+# pylint infers types across imported modules, so its results are not cached,
+# and ruff lints faster than the cache answers and keeps a cache of its own
+_CACHEABLE_LINTERS = frozenset({"flake8"})
+
+# Linter used for Python files when none is given: ruff if it is installed
+# in the server's environment, as it runs far faster than pylint
+_DEFAULT_PYTHON_LINTER = "ruff" if find_spec("ruff") is not None else "pylint"
+
+
+@functools.cache
+def _tool_version(tool: str) -> str:
+    try:
+        return metadata.version(tool)
+    except metadata.PackageNotFoundError:
+        return "unknown"
+
+
+def _tool_keys(tool: str, file_paths: list[str], config_file: str | None = None) -> list[str]:
+    """
+    Cache keys for a tool's results on each of file_paths, covering the tool's
+    version and every config file it could read
+
+    Config files are looked up once per directory, not once per file.
+    """
+    config_digest = file_digest(config_file).hex() if config_file else None
+    by_directory: dict[Path, str] = {}
+    keys = []
+    for file_path in file_paths:
+        directory = Path(file_path).resolve().parent
+        key = by_directory.get(directory)
+        if key is None:
+            parts = [str(_CACHE_VERSION), _tool_version(tool)]
+            for parent in (directory, *directory.parents):
+                for name in _CONFIG_NAMES:
+                    try:
+                        st = os.stat(parent / name)
+                    except OSError:
+                        continue
+                    parts.append(f"{parent / name}:{st.st_mtime_ns}:{st.st_size}")
+            if config_digest:
+                parts.append(config_digest)
+            digest = hashlib.blake2b(chr(0).join(parts).encode()).hexdigest()
+            key = by_directory[directory] = f"{tool}:{digest}"
+        keys.append(key)
+    return keys
+
+
+async def _cache_lookup(items: list[tuple[str, str]]) -> Sequence[tuple[Fingerprint | None, Any]]:
+    """
+    Cached result (or None) for each (tool, path), looked up in one transaction
+    off the event loop; a broken cache only costs a recomputation
+    """
+    if not items:
+        return []
+    try:
+        return await asyncio.to_thread(lambda: ResultCache().lookup_many(items))
+    except (OSError, sqlite3.Error, ValueError) as e:
+        logger.warning("Result cache unavailable: %s", e)
+        return [(None, None)] * len(items)
+
+
+async def _cache_store(entries: list[tuple[str, str, Fingerprint | None, Any]]) -> None:
+    """Cache (tool, path, fingerprint, result) entries computed from the file states lookup saw"""
+    stored = [
+        (tool, path, fingerprint, result)
+        for tool, path, fingerprint, result in entries
+        if fingerprint is not None
+    ]
+    if not stored:
+        return
+    try:
+        await asyncio.to_thread(lambda: ResultCache().store_many(stored))
+    except (OSError, sqlite3.Error, ValueError) as e:
+        logger.warning("Could not cache results: %s", e)
+
+
+async def _run_tool(cmd: list[str]) -> bytes:
+    """
+    Run an analysis tool without blocking the event loop and return its stdout
+
+    The output is left undecoded: JSON reports go straight to the parser,
+    which validates UTF-8 itself, saving a decoded copy of a large report.
+    """
+    process = await asyncio.create_subprocess_exec(
+        *cmd,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+    )
+    stdout, _ = await process.communicate()
+    return stdout
+
+
+def _lint_command(linter: str, paths: list[str], config_file: str | None) -> list[str]:
+    """Command line running linter once over all of paths"""
+    # Use Python module for Python-based tools (pylint, flake8, bandit); ruff's
+    # module only execs its binary, so run that directly when it can be found
+    cmd = [*ruff_command()] if linter == "ruff" else [sys.executable, "-m", linter]
+
+    # Add config file if provided
+    if config_file and linter == "pylint":
+        cmd.extend(["--rcfile", config_file])
+
+    # Add output format
+    if linter == "pylint":
+        cmd.append("--output-format=json")
+    elif linter == "ruff":
+        cmd.extend(["check", "--output-format=json"])
+    elif linter == "flake8":
+        cmd.append("--format=json")
+    cmd.extend(paths)
+    return cmd
+
+
+def _text_issues(output: bytes) -> list[tuple[str | None, dict[str, Any]]]:
+    """One issue per non-blank line of a linter's text output"""
+    text = output.decode("utf-8", errors="replace")
+    return [(None, {"message": line}) for line in text.splitlines() if line.strip()]
+
+
+def _parse_lint_output(linter: str, output: bytes) -> list[tuple[str | None, dict[str, Any]]]:
+    """Issues in a linter's output, each with the file it was reported for (if known)"""
+    issues: list[tuple[str | None, dict[str, Any]]] = []
+
+    # Parse pylint JSON output
+    if linter == "pylint":
+        try:
+            if output and not output.isspace():
+                for issue in json_loads(output):
+                    issues.append(
+                        (
+                            issue.get("path"),
+                            {
+                                "line": issue.get("line", 0),
+                                "column": issue.get("column", 0),
+                                "type": issue.get("type", "unknown"),
+                                "message": issue.get("message", ""),
+                                "symbol": issue.get("symbol", ""),
+                                "message_id": issue.get("message-id", ""),
+                            },
+                        )
+                    )
+        except ValueError:
+            # If JSON parsing fails, treat output as text
+            issues = _text_issues(output)
+
+    # Parse ruff JSON output
+    elif linter == "ruff":
+        try:
+            if output and not output.isspace():
+                for issue in json_loads(output):
+                    issues.append(
+                        (
+                            issue.get("filename"),
+                            {
+                                "line": issue.get("location", {}).get("row", 0),
+                                "column": issue.get("location", {}).get("column", 0),
+                                "type": issue.get("code", "unknown"),
+                                "message": issue.get("message", ""),
+                            },
+                        )
+                    )
+        except ValueError:
+            pass
+
+    # For other linters, parse text output
+    else:
+        issues = _text_issues(output)
+
+    return issues
+
+
+async def _git(cwd: str, *args: str) -> bytes:
+    """stdout of a git command, raising ValueError with git's message if it fails"""
+    process = await asyncio.create_subprocess_exec(
+        "git",
+        "-C",
+        cwd,
+        *args,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+    )
+    stdout, stderr = await process.communicate()
+    if process.returncode != 0:
+        raise ValueError(
+            stderr.decode("utf-8", errors="replace").strip() or f"git {args[0]} failed"
+        )
+    return stdout
+
+
+async def _changed_files(paths: list[str], ref: str) -> set[str]:
+    """
+    Real paths of files added or modified since ref in the repository holding paths
+
+    Compares the working tree with the merge base of ref and HEAD, so commits
+    made on ref since the branch point are ignored, and uncommitted and
+    untracked files count as changed.
+    """
+    cwd = os.path.commonpath([os.path.dirname(os.path.realpath(p)) for p in paths])
+    root = os.fsdecode((await _git(cwd, "rev-parse", "--show-toplevel")).rstrip(b"\n"))
+    diff = await _git(root, "diff", "--name-only", "-z", "--diff-filter=ACMR", "--merge-base", ref)
+    untracked = await _git(root, "ls-files", "-z", "--others", "--exclude-standard")
+    return {
+        os.path.realpath(os.path.join(root, os.fsdecode(name)))
+        for name in (diff + untracked).split(b"\0")
+        if name
+    }
+
+
+async def _split_unchanged(paths: list[str], since_ref: str | None) -> tuple[list[str], list[str]]:
+    """
+    Paths changed since since_ref (all of them if it is None), and the rest
+
+    Missing paths are kept, so the caller still reports them.
+    """
+    if since_ref is None or not paths:
+        return paths, []
+    changed = await _changed_files(paths, since_ref)
+    kept: list[str] = []
+    skipped: list[str] = []
+    for p in paths:
+        unchanged = os.path.realpath(p) not in changed and os.path.exists(p)
+        (skipped if unchanged else kept).append(p)
+    return kept, skipped
+
 
 async def run_linter(
-    file_path: str,
+    file_path: str | None = None,
     linter: str | None = None,
     config_file: str | None = None,
+    file_paths: list[str] | None = None,
+    since_ref: str | None = None,
 ) -> dict[str, Any]:
     """
-    Run appropriate linter on a file
+    Run appropriate linter on a file, or on several files in one invocation
 
     Args:
         file_path: Path to file to lint
-        linter: Linter to use (pylint, ruff, flake8, etc.) - auto-detects if None
+        linter: Linter to use (pylint, ruff, flake8, etc.) - auto-detects if None,
+            preferring ruff over pylint for Python files
         config_file: Path to config file for linter
+        file_paths: Paths of several files to lint together, instead of
+            file_path; the linter starts (and loads its plugins) only once
+        since_ref: Git ref (e.g. origin/main); only files added or modified
+            since it, including uncommitted changes, are linted
 
     Returns:
         Dictionary containing:
@@ -30,112 +294,116 @@ async def run_linter(
         - issues: List of linting issues found
         - linter_used: Name of linter that was used
         - error: Error message if linting failed
+        With file_paths, also:
+        - files: The files that were linted
+        - issues_by_file: Issues grouped by file; each issue in issues also
+          carries its file
+        With since_ref, also:
+        - skipped: Files not linted because they are unchanged since since_ref
     """
+    batch = file_paths is not None
+    paths = list(file_paths) if file_paths is not None else [file_path] if file_path else []
     try:
-        path = Path(file_path)
+        if not paths:
+            return {
+                "success": False,
+                "error": "No file given to lint",
+            }
 
-        if not path.exists():
+        missing = [p for p in paths if not Path(p).exists()]
+        if missing:
             return {
                 "success": False,
-                "error": f"File not found: {file_path}",
+                "error": f"File not found: {', '.join(missing)}",
             }
 
+        paths, skipped = await _split_unchanged(paths, since_ref)
+
         # Auto-detect linter based on file type
         if linter is None:
-            if path.suffix == ".py":
-                # Try pylint first as it's most comprehensive
-                linter = "pylint"
+            other = next((Path(p).suffix for p in paths if Path(p).suffix != ".py"), None)
+            if other is None:
+                linter = _DEFAULT_PYTHON_LINTER
             else:
                 return {
                     "success": False,
-                    "error": f"No default linter for {path.suffix} files",
+                    "error": f"No default linter for {other} files",
                 }
 
-        # Build command - always use Python module for Python-based tools
-        # (pylint, ruff, flake8, bandit are all Python modules)
-        cmd = [sys.executable, "-m", linter]
-
-        # Add config file if provided
-        if config_file and linter == "pylint":
-            cmd.extend(["--rcfile", config_file])
-
-        # Add output format
-        if linter == "pylint":
-            cmd.extend(["--output-format=json", str(file_path)])
-        elif linter == "ruff":
-            cmd.extend(["check", "--output-format=json", str(file_path)])
-        elif linter == "flake8":
-            cmd.extend(["--format=json", str(file_path)])
-        else:
-            cmd.append(str(file_path))
-
-        # Run linter
-        result = subprocess.run(
-            cmd,
-            capture_output=True,
-            text=True,
-        )
-
-        # Parse output
-        issues = []
-        output = result.stdout
-
-        # Parse pylint JSON output
-        if linter == "pylint":
-            try:
-                import json
-
-                if output.strip():
-                    pylint_issues = json.loads(output)
-                    for issue in pylint_issues:
-                        issues.append(
-                            {
-                                "line": issue.get("line", 0),
-                                "column": issue.get("column", 0),
-                                "type": issue.get("type", "unknown"),
-                                "message": issue.get("message", ""),
-                                "symbol": issue.get("symbol", ""),
-                                "message_id": issue.get("message-id", ""),
-                            }
-                        )
-            except json.JSONDecodeError:
-                # If JSON parsing fails, treat output as text
-                for line in output.split("\n"):
-                    if line.strip():
-                        issues.append({"message": line})
-
-        # Parse ruff JSON output
-        elif linter == "ruff":
-            try:
-                import json
-
-                if output.strip():
-                    ruff_issues = json.loads(output)
-                    for issue in ruff_issues:
-                        issues.append(
-                            {
-                                "line": issue.get("location", {}).get("row", 0),
-                                "column": issue.get("location", {}).get("column", 0),
-                                "type": issue.get("code", "unknown"),
-                                "message": issue.get("message", ""),
-                            }
-                        )
-            except json.JSONDecodeError:
-                pass
+        # Files unchanged since a previous run reuse its issues
+        issues_by_file: dict[str, list[dict[str, Any]]] = {p: [] for p in paths}
+        pending: dict[str, tuple[str, Fingerprint | None]] = {}
+        to_lint = paths
+        if linter in _CACHEABLE_LINTERS:
+            to_lint = []
+            tools = _tool_keys(linter, paths, config_file)
+            lookups = await _cache_lookup(list(zip(tools, paths, strict=True)))
+            for p, tool, (fingerprint, cached) in zip(paths, tools, lookups, strict=True):
+                if cached is not None:
+                    issues_by_file[p] = cached
+                else:
+                    pending[p] = (tool, fingerprint)
+                    to_lint.append(p)
+
+        unattributed: list[dict[str, Any]] = []
+        if to_lint:
+            # Run linter
+            output = await _run_tool(_lint_command(linter, [str(p) for p in to_lint], config_file))
+
+            # Linters report paths their own way (relative, absolute), so match
+            # them back to the paths we were given
+            by_real_path = {os.path.realpath(p): p for p in to_lint}
+            for reported, issue in _parse_lint_output(linter, output):
+                owner: str | None
+                if len(to_lint) == 1:
+                    owner = to_lint[0]
+                elif reported is not None:
+                    owner = by_real_path.get(os.path.realpath(reported), reported)
+                else:
+                    # Text output conventionally starts with "path:line:"
+                    message = issue["message"]
+                    owner = next((p for p in to_lint if message.startswith(f"{p}:")), None)
+                if owner is None:
+                    unattributed.append(issue)
+                else:
+                    issues_by_file.setdefault(owner, []).append(issue)
+
+            # Output that can't be tied to a file could belong to any of them
+            if not unattributed:
+                await _cache_store(
+                    [
+                        (tool, p, fingerprint, issues_by_file[p])
+                        for p, (tool, fingerprint) in pending.items()
+                    ]
+                )
 
-        # For other linters, parse text output
+        if not batch:
+            issues = [issue for file_issues in issues_by_file.values() for issue in file_issues]
+            result: dict[str, Any] = {
+                "success": True,
+                "file": file_path,
+                "linter_used": linter,
+                "issues": issues,
+                "total_issues": len(issues),
+            }
         else:
-            for line in output.split("\n"):
-                if line.strip():
-                    issues.append({"message": line})
-
-        return {
-            "success": True,
-            "file": file_path,
-            "linter_used": linter,
-            "issues": issues,
-            "total_issues": len(issues),
-        }
+            issues_by_file = {
+                owner: [{"file": owner, **issue} for issue in file_issues]
+                for owner, file_issues in issues_by_file.items()
+            }
+            issues = [issue for file_issues in issues_by_file.values() for issue in file_issues]
+            issues.extend(unattributed)
+            result = {
+                "success": True,
+                "files": paths,
+                "linter_used": linter,
+                "issues": issues,
+                "issues_by_file": issues_by_file,
+                "total_issues": len(issues),
+            }
+        if since_ref is not None:
+            result["skipped"] = skipped
+        return result
 
     except FileNotFoundError:
         return {
@@ -149,6 +417,11 @@ async def run_linter(
         }
 
 
+def _contains_python(root: str) -> bool:
+    """Whether a Python file exists under root, stopping at the first one found"""
+    return next(iter_python_files(root), None) is not None
+
+
 async def security_scan(
     path: str,
     language: str | None = None,
@@ -183,28 +456,31 @@ async def security_scan(
                 language = "python" if suffix == ".py" else "unknown"
             else:
                 # For directories, assume Python if .py files exist
-                language = "python" if list(path_obj.rglob("*.py")) else "unknown"
+                language = "python" if _contains_python(path) else "unknown"
 
         vulnerabilities = []
 
+        # Results for a single file are cached; a directory's depend on which
+        # files it holds
+        cache_tool = None
+        fingerprint = None
+        if language == "python" and path_obj.is_file():
+            cache_tool = _tool_keys("bandit", [path])[0]
+            [(fingerprint, cached)] = await _cache_lookup([(cache_tool, path)])
+            if cached is not None:
+                return cached
+
         # Use appropriate security scanner
         if language == "python":
             # Use bandit for Python - always use as Python module
             cmd = [sys.executable, "-m", "bandit", "-f", "json", "-r", str(path)]
 
-            result = subprocess.run(
-                cmd,
-                capture_output=True,
-                text=True,
-            )
+            output = await _run_tool(cmd)
 
             # Parse bandit JSON output
             try:
-                import json
-
-                output = result.stdout
-                if output.strip():
-                    bandit_data = json.loads(output)
+                if output and not output.isspace():
+                    bandit_data = json_loads(output)
                     for issue in bandit_data.get("results", []):
                         vulnerabilities.append(
                             {
@@ -217,7 +493,7 @@ async def security_scan(
                                 "code": issue.get("code", ""),
                             }
                         )
-            except (json.JSONDecodeError, KeyError):
+            except (ValueError, KeyError):
                 # If parsing fails, return empty list
                 pass
 
@@ -227,13 +503,16 @@ async def security_scan(
                 "error": f"No security scanner available for {language}",
             }
 
-        return {
+        scan = {
             "success": True,
             "path": path,
             "language_detected": language,
             "vulnerabilities": vulnerabilities,
             "total_vulnerabilities": len(vulnerabilities),
         }
+        if cache_tool is not None:
+            await _cache_store([(cache_tool, path, fingerprint, scan)])
+        return scan
 
     except FileNotFoundError:
         return {
@@ -247,80 +526,144 @@ async def security_scan(
         }
 
 
-async def check_type_coverage(file_path: str) -> dict[str, Any]:
-    """
-    Analyze type annotation coverage
+# Files per worker task when many files are analysed at once
+_ANALYSIS_CHUNK_SIZE = 50
 
-    Args:
-        file_path: Path to Python file
+# Misses with less source than this in total are analysed on a thread; with
+# more, parsing outweighs the process pool round trip, and moving it off the
+# server process keeps concurrent calls from serializing on the GIL
+_POOL_MIN_BYTES = 64 * 1024
 
-    Returns:
-        Dictionary containing:
-        - success: Boolean indicating if analysis succeeded
-        - type_coverage_percent: Percentage of functions with type annotations
-        - total_functions: Total number of functions
-        - typed_functions: Number of functions with type annotations
-        - untyped_functions: List of functions without annotations
-        - error: Error message if analysis failed
-    """
-    try:
-        path = Path(file_path)
+# Fields holding nested statements, in source order; except handlers and
+# match cases hold their own in a body
+_BLOCK_FIELDS = ("body", "handlers", "orelse", "finalbody", "cases")
 
-        if not path.exists():
-            return {
-                "success": False,
-                "error": f"File not found: {file_path}",
-            }
 
-        with open(path) as f:
-            content = f.read()
+class _CoverageVisitor(ast.NodeVisitor):
+    """Collects type annotation and docstring coverage in one descent of a module"""
+
+    def __init__(self) -> None:
+        self.total_functions = 0
+        self.typed_functions = 0
+        self.untyped_functions: list[dict[str, Any]] = []
+        self.total_items = 0
+        self.documented_items = 0
+        self.undocumented_items: list[dict[str, Any]] = []
 
-        # Parse AST
-        tree = ast.parse(content)
+    def visit_FunctionDef(self, node: ast.FunctionDef | ast.AsyncFunctionDef) -> None:
+        self.total_functions += 1
 
-        total_functions = 0
-        typed_functions = 0
-        untyped_functions = []
+        # Check if function has type annotations
+        has_return_type = node.returns is not None
 
-        # Find all function definitions
-        for node in ast.walk(tree):
-            if isinstance(node, ast.FunctionDef):
-                total_functions += 1
+        # Check if parameters have type annotations
+        has_param_types = all(
+            arg.annotation is not None for arg in node.args.args if arg.arg != "self"
+        )
 
-                # Check if function has type annotations
-                has_return_type = node.returns is not None
+        # Consider function typed if it has return type and all params are typed
+        if has_return_type and has_param_types:
+            self.typed_functions += 1
+        else:
+            self.untyped_functions.append(
+                {
+                    "name": node.name,
+                    "line": node.lineno,
+                    "has_return_type": has_return_type,
+                    "has_param_types": has_param_types,
+                }
+            )
 
-                # Check if parameters have type annotations
-                has_param_types = all(
-                    arg.annotation is not None for arg in node.args.args if arg.arg != "self"
-                )
+        self._check_docstring(node, "function")
+        self.generic_visit(node)
 
-                # Consider function typed if it has return type and all params are typed
-                if has_return_type and has_param_types:
-                    typed_functions += 1
-                else:
-                    untyped_functions.append(
-                        {
-                            "name": node.name,
-                            "line": node.lineno,
-                            "has_return_type": has_return_type,
-                            "has_param_types": has_param_types,
-                        }
-                    )
+    visit_AsyncFunctionDef = visit_FunctionDef
 
-        # Calculate coverage
-        type_coverage_percent = (
-            (typed_functions / total_functions * 100) if total_functions > 0 else 0
-        )
+    def visit_ClassDef(self, node: ast.ClassDef) -> None:
+        self._check_docstring(node, "class")
+        self.generic_visit(node)
 
-        return {
-            "success": True,
-            "file": file_path,
-            "type_coverage_percent": round(type_coverage_percent, 2),
-            "total_functions": total_functions,
-            "typed_functions": typed_functions,
-            "untyped_functions": untyped_functions,
-        }
+    def _check_docstring(
+        self, node: ast.FunctionDef | ast.AsyncFunctionDef | ast.ClassDef, item_type: str
+    ) -> None:
+        self.total_items += 1
+        if ast.get_docstring(node):
+            self.documented_items += 1
+        else:
+            self.undocumented_items.append(
+                {
+                    "name": node.name,
+                    "type": item_type,
+                    "line": node.lineno,
+                }
+            )
+
+    def generic_visit(self, node: ast.AST) -> None:
+        # Definitions are always statements, so expressions are never entered
+        for field in _BLOCK_FIELDS:
+            block = getattr(node, field, None)
+            if isinstance(block, list):
+                for child in block:
+                    self.visit(child)
+
+
+@functools.lru_cache(maxsize=64)
+def _parse_cached(path: str, mtime_ns: int, size: int) -> ast.Module:  # noqa: ARG001
+    """Parsed module at path; the stat fields in the key retire stale trees"""
+    with open(path) as f:
+        return ast.parse(f.read())
+
+
+def _parse_file(file_path: str) -> ast.Module:
+    """
+    Parse a Python file, reusing the tree of an earlier parse if unchanged
+
+    The tree is shared between callers and must not be modified.
+    """
+    st = os.stat(file_path)
+    return _parse_cached(os.path.abspath(file_path), st.st_mtime_ns, st.st_size)
+
+
+def _analyze_ast(tree: ast.Module) -> tuple[dict[str, Any], dict[str, Any]]:
+    """Compute a module's type and documentation coverage"""
+    visitor = _CoverageVisitor()
+    visitor.visit(tree)
+
+    # Calculate coverage
+    total_functions = visitor.total_functions
+    type_coverage_percent = (
+        (visitor.typed_functions / total_functions * 100) if total_functions > 0 else 0
+    )
+    total_items = visitor.total_items
+    doc_coverage_percent = (visitor.documented_items / total_items * 100) if total_items > 0 else 0
+
+    type_coverage = {
+        "type_coverage_percent": round(type_coverage_percent, 2),
+        "total_functions": total_functions,
+        "typed_functions": visitor.typed_functions,
+        "untyped_functions": visitor.untyped_functions,
+    }
+    doc_coverage = {
+        "doc_coverage_percent": round(doc_coverage_percent, 2),
+        "total_items": total_items,
+        "documented_items": visitor.documented_items,
+        "undocumented_items": visitor.undocumented_items,
+        "module_docstring": ast.get_docstring(tree) is not None,
+    }
+    return type_coverage, doc_coverage
+
+
+def _analyze_file(file_path: str, kinds: tuple[str, ...]) -> dict[str, Any]:
+    """Coverage of an existing file, with the metrics of the given kinds"""
+    try:
+        type_coverage, doc_coverage = _analyze_ast(_parse_file(file_path))
+
+        result = {"success": True, "file": file_path}
+        if "type" in kinds:
+            result.update(type_coverage)
+        if "documentation" in kinds:
+            result.update(doc_coverage)
+        return result
 
     except SyntaxError as e:
         return {
@@ -334,6 +677,147 @@ async def check_type_coverage(file_path: str) -> dict[str, Any]:
         }
 
 
+def _type_coverage(file_path: str) -> dict[str, Any]:
+    """check_type_coverage for an existing file, run in-process or in a worker"""
+    return _analyze_file(file_path, ("type",))
+
+
+def _documentation_coverage(file_path: str) -> dict[str, Any]:
+    """documentation_coverage for an existing file, run in-process or in a worker"""
+    return _analyze_file(file_path, ("documentation",))
+
+
+def _full_coverage(file_path: str) -> dict[str, Any]:
+    """full_coverage for an existing file, run in-process or in a worker"""
+    return _analyze_file(file_path, ("type", "documentation"))
+
+
+def _analyze_files(
+    analyze: Callable[[str], dict[str, Any]], paths: list[str]
+) -> list[dict[str, Any]]:
+    """Apply one coverage analysis to a chunk of files"""
+    return [analyze(path) for path in paths]
+
+
+async def _coverage(
+    tool: str, analyze: Callable[[str], dict[str, Any]], file_paths: list[str]
+) -> list[dict[str, Any]]:
+    """
+    Run a coverage analysis over files, reusing cached results
+
+    Misses are analysed across the process pool, since AST walks hold the
+    GIL, unless there is too little source to be worth shipping to a worker.
+    """
+    cache_tool = f"{tool}:{_CACHE_VERSION}"
+    results: list[dict[str, Any] | None] = []
+    misses: list[tuple[int, str, Fingerprint | None]] = []
+    miss_bytes = 0
+    exists = [Path(file_path).exists() for file_path in file_paths]
+    found_paths = [file_path for file_path, found in zip(file_paths, exists, strict=True) if found]
+    lookups = iter(await _cache_lookup([(cache_tool, file_path) for file_path in found_paths]))
+    for index, (file_path, found) in enumerate(zip(file_paths, exists, strict=True)):
+        if not found:
+            results.append({"success": False, "error": f"File not found: {file_path}"})
+            continue
+        fingerprint, cached = next(lookups)
+        results.append(cached)
+        if cached is None:
+            misses.append((index, file_path, fingerprint))
+            miss_bytes += fingerprint.size if fingerprint else 0
+
+    chunks = [
+        misses[i : i + _ANALYSIS_CHUNK_SIZE] for i in range(0, len(misses), _ANALYSIS_CHUNK_SIZE)
+    ]
+    if len(chunks) == 1 and miss_bytes < _POOL_MIN_BYTES:
+        batches = [await asyncio.to_thread(_analyze_files, analyze, [m[1] for m in misses])]
+    else:
+        loop = asyncio.get_running_loop()
+        pool = cpu_pool()
+        batches = await asyncio.gather(
+            *(
+                loop.run_in_executor(pool, _analyze_files, analyze, [m[1] for m in chunk])
+                for chunk in chunks
+            )
+        )
+
+    computed = []
+    for chunk, batch in zip(chunks, batches, strict=True):
+        for (index, file_path, fingerprint), result in zip(chunk, batch, strict=True):
+            results[index] = result
+            if result["success"]:
+                computed.append((cache_tool, file_path, fingerprint, result))
+    await _cache_store(computed)
+
+    return [result for result in results if result is not None]
+
+
+async def _coverage_many(
+    tool: str,
+    analyze: Callable[[str], dict[str, Any]],
+    file_paths: list[str],
+    since_ref: str | None,
+) -> dict[str, Any]:
+    """Result of a multi-file coverage tool"""
+    try:
+        paths, skipped = await _split_unchanged(file_paths, since_ref)
+    except ValueError as e:
+        return {
+            "success": False,
+            "error": str(e),
+        }
+
+    result: dict[str, Any] = {
+        "success": True,
+        "results": await _coverage(tool, analyze, paths),
+    }
+    if since_ref is not None:
+        result["skipped"] = skipped
+    return result
+
+
+async def check_type_coverage(file_path: str) -> dict[str, Any]:
+    """
+    Analyze type annotation coverage
+
+    Args:
+        file_path: Path to Python file
+
+    Returns:
+        Dictionary containing:
+        - success: Boolean indicating if analysis succeeded
+        - type_coverage_percent: Percentage of functions with type annotations
+        - total_functions: Total number of functions
+        - typed_functions: Number of functions with type annotations
+        - untyped_functions: List of functions without annotations
+        - error: Error message if analysis failed
+    """
+    (result,) = await _coverage("type_coverage", _type_coverage, [file_path])
+    return result
+
+
+async def check_type_coverage_many(
+    file_paths: list[str], since_ref: str | None = None
+) -> dict[str, Any]:
+    """
+    Analyze type annotation coverage of many files in one call
+
+    Files are analysed in parallel across CPU cores.
+
+    Args:
+        file_paths: Paths to Python files
+        since_ref: Git ref (e.g. origin/main); only files added or modified
+            since it, including uncommitted changes, are analysed
+
+    Returns:
+        Dictionary containing:
+        - success: True
+        - results: One check_type_coverage result per path, in order
+        - skipped: With since_ref, the paths left out as unchanged
+        - error: Error message if since_ref could not be compared
+    """
+    return await _coverage_many("type_coverage", _type_coverage, file_paths, since_ref)
+
+
 async def documentation_coverage(file_path: str) -> dict[str, Any]:
     """
     Check documentation completeness
@@ -351,69 +835,51 @@ async def documentation_coverage(file_path: str) -> dict[str, Any]:
         - module_docstring: Whether module has docstring
         - error: Error message if analysis failed
     """
-    try:
-        path = Path(file_path)
+    (result,) = await _coverage("documentation_coverage", _documentation_coverage, [file_path])
+    return result
 
-        if not path.exists():
-            return {
-                "success": False,
-                "error": f"File not found: {file_path}",
-            }
 
-        with open(path) as f:
-            content = f.read()
+async def documentation_coverage_many(
+    file_paths: list[str], since_ref: str | None = None
+) -> dict[str, Any]:
+    """
+    Check documentation completeness of many files in one call
 
-        # Parse AST
-        tree = ast.parse(content)
+    Files are analysed in parallel across CPU cores.
 
-        total_items = 0
-        documented_items = 0
-        undocumented_items = []
+    Args:
+        file_paths: Paths to Python files
+        since_ref: Git ref (e.g. origin/main); only files added or modified
+            since it, including uncommitted changes, are analysed
 
-        # Check module docstring
-        module_docstring = ast.get_docstring(tree) is not None
+    Returns:
+        Dictionary containing:
+        - success: True
+        - results: One documentation_coverage result per path, in order
+        - skipped: With since_ref, the paths left out as unchanged
+        - error: Error message if since_ref could not be compared
+    """
+    return await _coverage_many(
+        "documentation_coverage", _documentation_coverage, file_paths, since_ref
+    )
 
-        # Find all documentable items
-        for node in ast.walk(tree):
-            if isinstance(node, ast.FunctionDef | ast.ClassDef):
-                total_items += 1
 
-                docstring = ast.get_docstring(node)
-                if docstring:
-                    documented_items += 1
-                else:
-                    item_type = "function" if isinstance(node, ast.FunctionDef) else "class"
-                    undocumented_items.append(
-                        {
-                            "name": node.name,
-                            "type": item_type,
-                            "line": node.lineno,
-                        }
-                    )
+async def full_coverage(file_path: str) -> dict[str, Any]:
+    """
+    Analyze type annotation and documentation coverage together
 
-        # Calculate coverage
-        doc_coverage_percent = (documented_items / total_items * 100) if total_items > 0 else 0
+    Parses the file once, which is cheaper than calling check_type_coverage
+    and documentation_coverage separately.
 
-        return {
-            "success": True,
-            "file": file_path,
-            "doc_coverage_percent": round(doc_coverage_percent, 2),
-            "total_items": total_items,
-            "documented_items": documented_items,
-            "undocumented_items": undocumented_items,
-            "module_docstring": module_docstring,
-        }
+    Args:
+        file_path: Path to Python file
 
-    except SyntaxError as e:
-        return {
-            "success": False,
-            "error": f"Syntax error in file: {e}",
-        }
-    except Exception as e:
-        return {
-            "success": False,
-            "error": str(e),
-        }
+    Returns:
+        Dictionary containing the fields of both check_type_coverage and
+        documentation_coverage
+    """
+    (result,) = await _coverage("full_coverage", _full_coverage, [file_path])
+    return result
 
 
 # Register tools with MCP
@@ -421,6 +887,9 @@ mcp.tool(run_linter)
 mcp.tool(security_scan)
 mcp.tool(check_type_coverage)
 mcp.tool(documentation_coverage)
+mcp.tool(check_type_coverage_many)
+mcp.tool(documentation_coverage_many)
+mcp.tool(full_coverage)
 
 
 if __name__ == "__main__":
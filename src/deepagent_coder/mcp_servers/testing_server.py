@@ -2,15 +2,42 @@
 """Testing tools MCP server - test execution and coverage"""
 
 import asyncio
+from collections import deque
+from importlib.util import find_spec
 from pathlib import Path
 import re
 import sys
+import tempfile
 from typing import Any
+from xml.etree import ElementTree
 
 from fastmcp import FastMCP
 
+from deepagent_coder.utils import pytest_runner
+
 mcp = FastMCP("Testing Tools")
 
+# Lines of a test run's stdout and stderr kept, from the end of each
+_OUTPUT_TAIL_LINES = 2000
+
+_READ_CHUNK_SIZE = 65536
+
+# Coverage runs are sharded across cores when pytest-xdist and pytest-cov are
+# installed alongside the server
+_HAS_XDIST = find_spec("xdist") is not None and find_spec("pytest_cov") is not None
+
+# Summary line like "3 passed, 1 failed in 0.05s"
+_PYTEST_SUMMARY_RE = re.compile(r"(\d+)\s+passed|(\d+)\s+failed|(\d+)\s+skipped|(\d+)\s+errors?\b")
+
+# unittest's "Ran 5 tests in 0.001s" and "FAILED (failures=1, errors=2)"
+_UNITTEST_RAN_RE = re.compile(r"Ran (\d+) test")
+_UNITTEST_FAILED_RE = re.compile(r"FAILED.*failures=(\d+)")
+_UNITTEST_ERRORS_RE = re.compile(r"errors=(\d+)")
+
+# coverage report's "TOTAL ... XX%" and per-file "src/calculator.py    10    2    80%"
+_COVERAGE_TOTAL_RE = re.compile(r"TOTAL\s+\d+\s+\d+\s+(\d+)%")
+_COVERAGE_FILE_RE = re.compile(r"(.+?)\s+(\d+)\s+(\d+)\s+(\d+)%")
+
 
 @mcp.tool()
 async def run_pytest(
@@ -31,7 +58,7 @@ async def run_pytest(
         timeout: Maximum execution time in seconds
 
     Returns:
-        Test results including passed, failed, skipped counts and output
+        Test results including passed, failed, skipped and errored counts and output
     """
     return await _run_pytest_impl(project_path, test_path, markers, verbose, timeout)
 
@@ -49,8 +76,8 @@ async def _run_pytest_impl(
         if not path.exists():
             return {"error": f"Project path not found: {project_path}"}
 
-        # Build pytest command - always use as Python module
-        cmd = [sys.executable, "-m", "pytest"]
+        # Build pytest arguments
+        cmd: list[str] = []
 
         if test_path:
             test_full_path = Path(test_path)
@@ -68,8 +95,22 @@ async def _run_pytest_impl(
         # Add output for parsing
         cmd.extend(["--tb=short", "-q"])
 
-        # Execute pytest
-        result = await _run_command(cmd, cwd=path, timeout=timeout)
+        # Execute pytest, writing a JUnit XML report to read the counts from
+        with tempfile.TemporaryDirectory() as report_dir:
+            report_path = Path(report_dir) / "report.xml"
+            cmd.append(f"--junitxml={report_path}")
+            result = None
+            if pytest_runner.AVAILABLE:
+                # Fork from a process that has already imported pytest, rather
+                # than paying interpreter and pytest start-up on every run
+                result = await asyncio.to_thread(
+                    _run_pytest_forked, cmd, path, Path(report_dir), timeout
+                )
+            if result is None:
+                # Always use as Python module
+                cmd = [sys.executable, "-m", "pytest", *cmd]
+                result = await _run_command(cmd, cwd=path, timeout=timeout)
+            counts = _read_junit_counts(report_path)
 
         if result["returncode"] not in [0, 1] and (
             "ERROR" in result["stderr"] or "error" in result["stderr"].lower()
@@ -79,37 +120,60 @@ async def _run_pytest_impl(
         # Parse output
         output = result["stdout"] + result["stderr"]
 
-        # Extract test counts
-        passed = 0
-        failed = 0
-        skipped = 0
-        total = 0
-
-        # Look for summary line like "3 passed, 1 failed in 0.05s"
-        summary_pattern = r"(\d+)\s+passed|(\d+)\s+failed|(\d+)\s+skipped"
-        for match in re.finditer(summary_pattern, output):
-            if match.group(1):
-                passed = int(match.group(1))
-            elif match.group(2):
-                failed = int(match.group(2))
-            elif match.group(3):
-                skipped = int(match.group(3))
-
-        total = passed + failed + skipped
+        if counts is None:
+            counts = _parse_pytest_summary(output)
+        passed, failed, skipped, errors = counts
 
         return {
-            "total_tests": total,
+            "total_tests": passed + failed + skipped + errors,
             "passed": passed,
             "failed": failed,
             "skipped": skipped,
+            "errors": errors,
             "output": output,
-            "success": failed == 0,
+            "success": failed == 0 and errors == 0,
         }
 
     except Exception as e:
         return {"error": f"Pytest execution failed: {str(e)}"}
 
 
+def _read_junit_counts(report_path: Path) -> tuple[int, int, int, int] | None:
+    """Passed, failed, skipped and errored counts from a JUnit XML report, if pytest wrote one"""
+    try:
+        root = ElementTree.parse(report_path).getroot()
+    except (OSError, ElementTree.ParseError):
+        return None
+
+    tests = failed = skipped = errors = 0
+    for suite in root.iter("testsuite"):
+        tests += int(suite.get("tests", 0))
+        failed += int(suite.get("failures", 0))
+        skipped += int(suite.get("skipped", 0))
+        errors += int(suite.get("errors", 0))
+    return tests - failed - skipped - errors, failed, skipped, errors
+
+
+def _parse_pytest_summary(output: str) -> tuple[int, int, int, int]:
+    """Counts from pytest's summary line, for when no report was written"""
+    passed = 0
+    failed = 0
+    skipped = 0
+    errors = 0
+
+    for match in _PYTEST_SUMMARY_RE.finditer(output):
+        if match.group(1):
+            passed = int(match.group(1))
+        elif match.group(2):
+            failed = int(match.group(2))
+        elif match.group(3):
+            skipped = int(match.group(3))
+        elif match.group(4):
+            errors = int(match.group(4))
+
+    return passed, failed, skipped, errors
+
+
 @mcp.tool()
 async def run_unittest(
     project_path: str,
@@ -165,12 +229,12 @@ async def _run_unittest_impl(
         output = result["stdout"] + result["stderr"]
 
         # Extract test counts from output like "Ran 5 tests in 0.001s"
-        ran_match = re.search(r"Ran (\d+) test", output)
+        ran_match = _UNITTEST_RAN_RE.search(output)
         total = int(ran_match.group(1)) if ran_match else 0
 
         # Check for failures/errors
-        failed_match = re.search(r"FAILED.*failures=(\d+)", output)
-        error_match = re.search(r"errors=(\d+)", output)
+        failed_match = _UNITTEST_FAILED_RE.search(output)
+        error_match = _UNITTEST_ERRORS_RE.search(output)
 
         failed = int(failed_match.group(1)) if failed_match else 0
         errors = int(error_match.group(1)) if error_match else 0
@@ -223,35 +287,45 @@ async def _get_coverage_impl(
         if not path.exists():
             return {"error": f"Project path not found: {project_path}"}
 
-        # Build coverage command - always use as Python module
-        cmd = [sys.executable, "-m", "coverage", "run", "-m", "pytest"]
+        if _HAS_XDIST:
+            # Spread tests over all cores; pytest-cov measures the xdist
+            # workers and combines their data into .coverage
+            cmd = [sys.executable, "-m", "pytest", "-n", "auto", "--cov-report="]
+            # A bare --cov= measures everything, like coverage run without --source
+            cmd.extend(f"--cov={src_dir}" for src_dir in source_dirs or [""])
+        else:
+            # Build coverage command - always use as Python module
+            cmd = [sys.executable, "-m", "coverage", "run", "--parallel-mode"]
+            if source_dirs:
+                cmd.append(f"--source={','.join(source_dirs)}")
+            cmd.extend(["-m", "pytest"])
 
         if test_path:
             cmd.append(test_path)
 
-        if source_dirs:
-            for src_dir in source_dirs:
-                cmd.extend(["--source", src_dir])
+        # Run tests with coverage; only the data file it writes is needed
+        await _run_command(cmd, cwd=path, timeout=timeout, max_lines=0)
 
-        # Run tests with coverage
-        await _run_command(cmd, cwd=path, timeout=timeout)
+        if not _HAS_XDIST:
+            combine_cmd = [sys.executable, "-m", "coverage", "combine"]
+            await _run_command(combine_cmd, cwd=path, timeout=30, max_lines=0)
 
         # Generate report
         report_cmd = [sys.executable, "-m", "coverage", "report"]
-        report_result = await _run_command(report_cmd, cwd=path, timeout=30)
+        report_result = await _run_command(report_cmd, cwd=path, timeout=30, max_lines=None)
 
         # Parse coverage percentage
         output = report_result["stdout"]
 
         # Look for "TOTAL ... XX%"
-        total_match = re.search(r"TOTAL\s+\d+\s+\d+\s+(\d+)%", output)
+        total_match = _COVERAGE_TOTAL_RE.search(output)
         coverage_percent = int(total_match.group(1)) if total_match else 0
 
         # Parse individual file coverage
         files = []
         for line in output.splitlines():
             # Match lines like "src/calculator.py    10    2    80%"
-            file_match = re.match(r"(.+?)\s+(\d+)\s+(\d+)\s+(\d+)%", line)
+            file_match = _COVERAGE_FILE_RE.match(line)
             if file_match and not line.startswith("TOTAL"):
                 files.append(
                     {
@@ -273,8 +347,99 @@ async def _get_coverage_impl(
         return {"error": f"Coverage execution failed: {str(e)}"}
 
 
-async def _run_command(cmd: list[str], cwd: Path, timeout: int = 120) -> dict[str, Any]:
-    """Execute command and return result"""
+class _Tail:
+    """
+    The last lines of output fed to it in chunks
+
+    Earlier lines are discarded as they arrive, so memory stays bounded however
+    much a command prints.
+    """
+
+    def __init__(self, max_lines: int | None):
+        self.lines: deque[bytes] = deque(maxlen=max_lines)
+        self.seen = 0
+        self.partial = b""
+
+    def feed(self, chunk: bytes) -> None:
+        *complete, self.partial = (self.partial + chunk).split(b"\n")
+        self.seen += len(complete)
+        self.lines.extend(complete)
+
+    def text(self) -> str:
+        lines = self.lines
+        seen = self.seen
+        if self.partial:
+            seen += 1
+            lines.append(self.partial)
+
+        text = "\n".join(line.decode("utf-8", errors="replace") for line in lines)
+        if lines and not self.partial:
+            text += "\n"
+        if seen > len(lines) and lines:
+            text = f"... {seen - len(lines)} earlier lines omitted\n{text}"
+        return text
+
+
+async def _read_tail(stream: asyncio.StreamReader | None, max_lines: int | None) -> str:
+    """Read a stream to EOF, keeping only its last max_lines lines"""
+    if stream is None:
+        return ""
+
+    tail = _Tail(max_lines)
+    while chunk := await stream.read(_READ_CHUNK_SIZE):
+        tail.feed(chunk)
+    return tail.text()
+
+
+def _read_file_tail(path: Path, max_lines: int | None) -> str:
+    """Last max_lines lines of a file"""
+    tail = _Tail(max_lines)
+    with open(path, "rb") as f:
+        while chunk := f.read(_READ_CHUNK_SIZE):
+            tail.feed(chunk)
+    return tail.text()
+
+
+def _run_pytest_forked(
+    args: list[str], cwd: Path, output_dir: Path, timeout: int
+) -> dict[str, Any] | None:
+    """
+    Run pytest in a child of the warm pytest forkserver; same result as
+    _run_command, or None if the forkserver is busy with another run
+    """
+    stdout_path = output_dir / "stdout"
+    stderr_path = output_dir / "stderr"
+    try:
+        returncode = pytest_runner.run(args, str(cwd), str(stdout_path), str(stderr_path), timeout)
+    except pytest_runner.HelperBusyError:
+        return None
+    if returncode is None:
+        return {
+            "stdout": "",
+            "stderr": f"Command timed out after {timeout} seconds",
+            "returncode": -1,
+        }
+
+    return {
+        "stdout": _read_file_tail(stdout_path, _OUTPUT_TAIL_LINES),
+        "stderr": _read_file_tail(stderr_path, _OUTPUT_TAIL_LINES),
+        "returncode": returncode,
+    }
+
+
+async def _run_command(
+    cmd: list[str],
+    cwd: Path,
+    timeout: int = 120,
+    max_lines: int | None = _OUTPUT_TAIL_LINES,
+) -> dict[str, Any]:
+    """
+    Execute command and return result
+
+    Args:
+        max_lines: Lines kept from the end of stdout and of stderr
+            (None keeps everything, 0 discards the output)
+    """
     try:
         process = await asyncio.create_subprocess_exec(
             *cmd,
@@ -283,11 +448,18 @@ async def _run_command(cmd: list[str], cwd: Path, timeout: int = 120) -> dict[st
             stderr=asyncio.subprocess.PIPE,
         )
 
-        stdout, stderr = await asyncio.wait_for(process.communicate(), timeout=timeout)
+        stdout, stderr, _ = await asyncio.wait_for(
+            asyncio.gather(
+                _read_tail(process.stdout, max_lines),
+                _read_tail(process.stderr, max_lines),
+                process.wait(),
+            ),
+            timeout=timeout,
+        )
 
         return {
-            "stdout": stdout.decode("utf-8"),
-            "stderr": stderr.decode("utf-8"),
+            "stdout": stdout,
+            "stderr": stderr,
             "returncode": process.returncode,
         }
 
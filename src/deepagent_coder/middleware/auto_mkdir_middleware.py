@@ -2,6 +2,7 @@
 
 from collections.abc import Callable, Coroutine
 import logging
+import os
 from pathlib import Path
 from typing import Any
 
@@ -10,6 +11,8 @@ logger = logging.getLogger(__name__)
 
 def create_auto_mkdir_middleware(
     mcp_client: Any = None,
+    prefer_local: bool = True,
+    workspace: str | Path | None = None,
 ) -> Callable[[dict[str, Any]], Coroutine[Any, Any, dict[str, Any]]]:
     """
     Create middleware that automatically creates parent directories before file writes.
@@ -19,10 +22,25 @@ def create_auto_mkdir_middleware(
 
     Args:
         mcp_client: MCP client instance for calling create_directory tool
+        prefer_local: Create directories inside the workspace directly, using the
+            MCP tool only if that fails (e.g. when the filesystem server runs
+            sandboxed). Directories outside it are always left to the MCP tool,
+            which enforces the server's allowed directories.
+        workspace: Workspace root that relative paths are resolved against, as
+            the filesystem server does. Without it, nothing is created locally.
 
     Returns:
         Middleware function that processes tool calls
     """
+    root = Path(workspace).resolve() if workspace is not None else None
+
+    # Directories known to exist, so each is created at most once per session
+    created: set[str] = set()
+
+    def _remember(directory: str) -> None:
+        # Like mkdir -p, creating a directory also created every ancestor
+        created.add(directory)
+        created.update(str(p) for p in Path(directory).parents)
 
     async def auto_mkdir_middleware(state: dict[str, Any]) -> dict[str, Any]:
         """
@@ -54,13 +72,39 @@ def create_auto_mkdir_middleware(
                 args = tool_call.get("args", {})
                 file_path = args.get("path") or args.get("file_path")
 
-                if file_path and mcp_client:
+                if file_path and (mcp_client or prefer_local):
                     # Extract parent directory
                     path_obj = Path(file_path)
                     parent_dir = path_obj.parent
 
                     # Only create if parent is not current directory
                     if str(parent_dir) != "." and parent_dir != Path("."):
+                        # Relative paths are relative to the workspace, not to
+                        # this process's working directory. Directories outside
+                        # the workspace are left to the server's access checks.
+                        local_target = None
+                        if root is not None:
+                            target = (root / parent_dir).resolve()
+                            key = str(target)
+                            if prefer_local and target.is_relative_to(root):
+                                local_target = target
+                        else:
+                            key = os.path.normpath(parent_dir)
+                        if key in created:
+                            continue
+
+                        if local_target is not None:
+                            try:
+                                local_target.mkdir(parents=True, exist_ok=True)
+                                logger.info(f"[auto-mkdir] ✓ Created locally: {local_target}")
+                                _remember(key)
+                                continue
+                            except OSError as e:
+                                logger.debug(f"[auto-mkdir] Local creation failed: {e}")
+
+                        if not mcp_client:
+                            continue
+
                         try:
                             logger.info(f"[auto-mkdir] Creating parent directory: {parent_dir}")
 
@@ -70,6 +114,7 @@ def create_auto_mkdir_middleware(
                             )
 
                             logger.info(f"[auto-mkdir] ✓ Successfully created: {parent_dir}")
+                            _remember(key)
 
                         except Exception as e:
                             # Log but don't fail - directory might already exist
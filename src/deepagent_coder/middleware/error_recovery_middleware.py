@@ -1,115 +1,150 @@
 """Error recovery middleware for graceful error handling and retries"""
 
+import asyncio
 from collections.abc import Callable
 import logging
+import os
+import random
+import re
 from typing import Any
 
 logger = logging.getLogger(__name__)
 
+# First absolute path mentioned in an error message
+_PATH_RE = re.compile(r"/[\w/\-\.]+")
+
+# Lowercase phrases identifying each error kind that has targeted guidance
+_ERROR_PHRASES = {
+    "missing": ("parent directory does not exist", "no such file or directory"),
+    "permission": ("access denied", "permission denied"),
+    "outside": ("outside allowed directories",),
+}
+
+# All phrases as one alternation, with a group per kind, so a message is
+# classified in a single pass however many phrases there are
+_ERROR_KIND_RE = re.compile(
+    "|".join(
+        f"(?P<{kind}>{'|'.join(map(re.escape, phrases))})"
+        for kind, phrases in _ERROR_PHRASES.items()
+    )
+)
+
+# Guidance per error kind; a missing directory named in the error gets its own
+_STATIC_TIPS = {
+    "missing": (
+        "\n\n💡 TIP: Create the parent directory first using create_directory or mkdir, "
+        "then retry writing the file."
+    ),
+    "permission": (
+        "\n\n💡 TIP: Check file permissions or verify the path is within the allowed workspace."
+    ),
+    "outside": (
+        "\n\n💡 TIP: The path is outside the workspace. All file operations must be within the workspace directory. "
+        "Use relative paths or paths starting with the workspace root."
+    ),
+}
+
+_EXHAUSTED_SUFFIX = ". Please try a different approach or check the error details."
+
+
+def _recovery_message(error: Any, retry_count: int, max_retries: int) -> str:
+    """Guidance for retrying after error, specific to the kind of error where known"""
+    recovery_message = f"⚠️  An error occurred: {error}. "
+
+    # Detect specific error patterns and provide targeted guidance
+    error_text = str(error)
+    kind_match = _ERROR_KIND_RE.search(error_text.lower())
+    kind = kind_match.lastgroup if kind_match else None
+
+    # Extract directory path from error if possible
+    path_match = _PATH_RE.search(error_text) if kind == "missing" else None
+    if path_match:
+        parent_dir = os.path.dirname(path_match.group(0))
+        return recovery_message + (
+            f"\n\n💡 TIP: The parent directory '{parent_dir}' doesn't exist. "
+            f"Use the create_directory or mkdir tool to create it first, then retry writing the file."
+        )
+    if kind is not None:
+        return recovery_message + _STATIC_TIPS[kind]
+    return recovery_message + f"Attempting recovery (attempt {retry_count}/{max_retries})..."
+
 
 def create_error_recovery_middleware(
-    max_retries: int = 3, add_recovery_message: bool = True
+    max_retries: int = 3,
+    add_recovery_message: bool = True,
+    base_delay: float = 0.2,
+    max_delay: float = 10.0,
+    jitter: bool = True,
 ) -> Callable:
     """
     Create error recovery middleware
 
+    Before each retry it waits base_delay seconds, doubling with every
+    further attempt up to max_delay, so transient failures are not retried
+    in a tight loop.
+
     Args:
         max_retries: Maximum number of retry attempts
         add_recovery_message: Whether to add recovery guidance to messages
+        base_delay: Seconds to wait before the first retry (0 to retry at once)
+        max_delay: Upper bound on the wait before any retry
+        jitter: Scale each wait by a random factor between 0.5 and 1.5, so
+            agents failing together do not retry in lockstep
 
     Returns:
         Middleware function
     """
+    # Only the error differs between max-retries messages of one middleware
+    exhausted_prefix = f"⚠️  Maximum retry attempts ({max_retries}) reached. Error: "
 
     async def error_recovery_middleware(state: dict[str, Any]) -> dict[str, Any]:
         """
         Handle errors gracefully with retry logic
 
         Args:
-            state: Agent state dictionary
+            state: Agent state dictionary, carrying a step's failure as "error",
+                or several as a list under "errors"
 
         Returns:
             Modified state with error handling
         """
-        # Check if there's an error in the state
+        # Most steps have no error; leave them before doing any other work
         error = state.get("error")
-
-        if error:
-            # Track retry count
-            retry_count = state.get("retry_count", 0) + 1
-            state["retry_count"] = retry_count
-
-            logger.warning(f"Error detected (attempt {retry_count}/{max_retries}): {error}")
-
-            # Check if max retries reached
-            if retry_count >= max_retries:
-                state["max_retries_reached"] = True
-                logger.error(f"Max retries ({max_retries}) reached. " f"Error: {error}")
-
-                if add_recovery_message:
-                    state["messages"].append(
-                        {
-                            "role": "system",
-                            "content": (
-                                f"⚠️  Maximum retry attempts ({max_retries}) reached. "
-                                f"Error: {error}. Please try a different approach or "
-                                f"check the error details."
-                            ),
-                        }
-                    )
+        batch = state.get("errors")
+        if not error and not batch:
+            return state
+
+        # Errors from one step count as a single attempt, with one message
+        errors = ([error] if error else []) + list(batch or [])
+        error = "; ".join(map(str, errors)) if len(errors) > 1 else errors[0]
+
+        # Track retry count, and whether it has reached the maximum
+        retry_count = state.get("retry_count", 0) + 1
+        exhausted = retry_count >= max_retries
+        state.update(retry_count=retry_count, max_retries_reached=exhausted)
+
+        logger.warning("Error detected (attempt %d/%d): %s", retry_count, max_retries, error)
+        if exhausted:
+            logger.error("Max retries (%d) reached. Error: %s", max_retries, error)
+        else:
+            logger.info("Attempting recovery (retry %d)", retry_count)
+
+        if add_recovery_message:
+            if exhausted:
+                content = f"{exhausted_prefix}{error}{_EXHAUSTED_SUFFIX}"
             else:
-                # Add recovery guidance with specific suggestions
-                recovery_message = f"⚠️  An error occurred: {error}. "
-
-                # Detect specific error patterns and provide targeted guidance
-                error_str = str(error).lower()
-
-                if (
-                    "parent directory does not exist" in error_str
-                    or "no such file or directory" in error_str
-                ):
-                    # Extract directory path from error if possible
-                    import re
-
-                    path_match = re.search(r"/[\w/\-\.]+", str(error))
-                    if path_match:
-                        failed_path = path_match.group(0)
-                        import os
-
-                        parent_dir = os.path.dirname(failed_path)
-                        recovery_message += (
-                            f"\n\n💡 TIP: The parent directory '{parent_dir}' doesn't exist. "
-                            f"Use the create_directory or mkdir tool to create it first, then retry writing the file."
-                        )
-                    else:
-                        recovery_message += (
-                            "\n\n💡 TIP: Create the parent directory first using create_directory or mkdir, "
-                            "then retry writing the file."
-                        )
-
-                elif "access denied" in error_str or "permission denied" in error_str:
-                    recovery_message += "\n\n💡 TIP: Check file permissions or verify the path is within the allowed workspace."
-
-                elif "outside allowed directories" in error_str:
-                    recovery_message += (
-                        "\n\n💡 TIP: The path is outside the workspace. All file operations must be within the workspace directory. "
-                        "Use relative paths or paths starting with the workspace root."
-                    )
-
-                else:
-                    recovery_message += (
-                        f"Attempting recovery (attempt {retry_count}/{max_retries})..."
-                    )
-
-                if add_recovery_message:
-                    state["messages"].append(
-                        {
-                            "role": "system",
-                            "content": recovery_message,
-                        }
-                    )
-
-                logger.info(f"Attempting recovery (retry {retry_count})")
+                # Recovery guidance with specific suggestions
+                content = "\n\n".join(
+                    _recovery_message(e, retry_count, max_retries) for e in errors
+                )
+            state.setdefault("messages", []).append({"role": "system", "content": content})
+
+        if not exhausted:
+            delay = min(max_delay, base_delay * 2 ** (retry_count - 1))
+            if jitter:
+                delay *= 0.5 + random.random()
+            if delay > 0:
+                await asyncio.sleep(delay)
 
         return state
 
@@ -22,11 +22,20 @@ Example:
     response = await agent.invoke("Implement a binary search function")
 """
 
+from collections import OrderedDict
 import logging
 from typing import Any
 
+from langgraph.prebuilt import create_react_agent
+
 logger = logging.getLogger(__name__)
 
+# Agents already created, keyed by the identity of the model selector and
+# tools they were created from. Those objects are kept alongside each agent,
+# so their ids cannot be reused by other objects while the entry exists.
+_AGENT_CACHE_SIZE = 32
+_agent_cache: OrderedDict[tuple[int, ...], tuple[Any, tuple[Any, ...]]] = OrderedDict()
+
 SYSTEM_PROMPT = """You are a Code Generation Specialist, an expert software engineer focused on producing high-quality, production-ready code.
 
 Your core responsibilities:
@@ -99,19 +108,7 @@ Remember: You are producing code that other developers will read, maintain, and
 Code quality, clarity, and maintainability are just as important as functionality."""
 
 
-def get_code_generation_guidelines() -> str:
-    """
-    Get comprehensive Python code generation guidelines.
-
-    Returns:
-        str: Detailed guidelines for Python code generation including style,
-             documentation, error handling, and best practices.
-
-    Example:
-        guidelines = get_code_generation_guidelines()
-        # Use guidelines in prompts or documentation
-    """
-    return """
+_GUIDELINES = """
 ## Python Style Guide and Best Practices
 
 ### Code Style (PEP 8)
@@ -241,6 +238,26 @@ def my_function(arg: int) -> bool:
 """
 
 
+def get_code_generation_guidelines() -> str:
+    """
+    Get comprehensive Python code generation guidelines.
+
+    Returns:
+        str: Detailed guidelines for Python code generation including style,
+             documentation, error handling, and best practices.
+
+    Example:
+        guidelines = get_code_generation_guidelines()
+        # Use guidelines in prompts or documentation
+    """
+    return _GUIDELINES
+
+
+def clear_agent_cache() -> None:
+    """Forget previously created code generator agents, so the next call builds a new one"""
+    _agent_cache.clear()
+
+
 async def create_code_generator_agent(
     model_selector,
     tools: list[Any],
@@ -262,7 +279,8 @@ async def create_code_generator_agent(
                        ~/.deepagents/code_generator
 
     Returns:
-        A configured DeepAgent instance specialized for code generation
+        A configured DeepAgent instance specialized for code generation. Calls with
+        the same model selector and tools return the same agent.
 
     Example:
         from deepagent_coder.core.model_selector import ModelSelector
@@ -274,8 +292,11 @@ async def create_code_generator_agent(
             "Generate a function to validate email addresses"
         )
     """
-    # Use LangChain ReAct agent instead of deepagents (temporary workaround for langchain 1.x compatibility)
-    from langgraph.prebuilt import create_react_agent
+    key = (id(model_selector), *map(id, tools))
+    cached = _agent_cache.get(key)
+    if cached is not None:
+        _agent_cache.move_to_end(key)
+        return cached[0]
 
     logger.info("Creating code generator subagent...")
 
@@ -283,8 +304,13 @@ async def create_code_generator_agent(
     model = model_selector.get_model("code_generator")
 
     # Create the agent with specialized system prompt using ReAct pattern
+    # (LangChain ReAct agent instead of deepagents: temporary workaround for langchain 1.x compatibility)
     # Note: 'prompt' parameter changed from 'state_modifier' in langgraph 0.2+
     agent = create_react_agent(model, tools, prompt=SYSTEM_PROMPT)
 
+    _agent_cache[key] = (agent, (model_selector, *tools))
+    while len(_agent_cache) > _AGENT_CACHE_SIZE:
+        _agent_cache.popitem(last=False)
+
     logger.info("✓ Code generator subagent created successfully")
     return agent
@@ -24,12 +24,21 @@ Example:
     response = await agent.invoke("Review the authentication module for quality issues")
 """
 
+from collections import OrderedDict
 import logging
 from pathlib import Path
 from typing import Any
 
 logger = logging.getLogger(__name__)
 
+_DEFAULT_WORKSPACE = str(Path.home() / ".deepagents" / "code_review")
+
+# Agents already created, keyed by the identity of the model selector, backend
+# and tools they were created from, and the workspace. Those objects are kept
+# alongside each agent, so their ids cannot be reused while the entry exists.
+_AGENT_CACHE_SIZE = 32
+_agent_cache: OrderedDict[tuple[Any, ...], tuple[Any, tuple[Any, ...]]] = OrderedDict()
+
 SYSTEM_PROMPT = """You are a senior code reviewer providing objective, metrics-based code reviews.
 
 ## Integration with Team
@@ -315,6 +324,11 @@ Your goal is to:
 Be thorough but fair. Every piece of feedback should make the code better."""
 
 
+def clear_agent_cache() -> None:
+    """Forget previously created Code Review agents, so the next call builds a new one"""
+    _agent_cache.clear()
+
+
 async def create_code_review_agent(
     model_selector,
     tools: list[Any],
@@ -336,7 +350,8 @@ async def create_code_review_agent(
                        ~/.deepagents/code_review
 
     Returns:
-        A configured DeepAgent instance specialized for Code Review
+        A configured DeepAgent instance specialized for Code Review. Calls with the
+        same model selector, tools, backend and workspace return the same agent.
 
     Example:
         from deepagent_coder.core.model_selector import ModelSelector
@@ -348,6 +363,12 @@ async def create_code_review_agent(
             "Review the user authentication module for quality and security"
         )
     """
+    key = (id(model_selector), id(backend), workspace_path, *map(id, tools))
+    cached = _agent_cache.get(key)
+    if cached is not None:
+        _agent_cache.move_to_end(key)
+        return cached[0]
+
     # Import here to avoid import issues at module level
     from deepagents import create_deep_agent
     from deepagents.backends import FilesystemBackend
@@ -360,7 +381,7 @@ async def create_code_review_agent(
     # Set up backend for state persistence
     if backend is None:
         if workspace_path is None:
-            workspace_path = str(Path.home() / ".deepagents" / "code_review")
+            workspace_path = _DEFAULT_WORKSPACE
         backend = FilesystemBackend(root_dir=workspace_path)
         logger.debug(f"Using workspace: {workspace_path}")
 
@@ -372,5 +393,9 @@ async def create_code_review_agent(
         system_prompt=SYSTEM_PROMPT,
     )
 
+    _agent_cache[key] = (agent, (model_selector, backend, *tools))
+    while len(_agent_cache) > _AGENT_CACHE_SIZE:
+        _agent_cache.popitem(last=False)
+
     logger.info("✓ Code Review subagent created successfully")
     return agent
@@ -0,0 +1,31 @@
+"""Process pool shared by the CPU-bound analysis tools"""
+
+import atexit
+from concurrent.futures import ProcessPoolExecutor
+import multiprocessing
+import os
+
+_pool: ProcessPoolExecutor | None = None
+
+
+def _shutdown() -> None:
+    if _pool is not None:
+        _pool.shutdown(cancel_futures=True)
+
+
+def cpu_pool() -> ProcessPoolExecutor:
+    """
+    Lazily create the process pool, with one worker per CPU
+
+    Every tool module submits to this one pool, so worker processes are not
+    duplicated per module and concurrent tools do not oversubscribe the CPUs.
+    Workers are spawned rather than forked, as forking the multi-threaded
+    server can deadlock the child; they only run module-level functions.
+    """
+    global _pool
+    if _pool is None:
+        _pool = ProcessPoolExecutor(
+            max_workers=os.cpu_count(), mp_context=multiprocessing.get_context("spawn")
+        )
+        atexit.register(_shutdown)
+    return _pool
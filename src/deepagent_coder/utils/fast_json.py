@@ -0,0 +1,9 @@
+"""JSON parsing for large tool reports, shared by the servers that read them"""
+
+# orjson parses large linter, bandit and rg reports several times faster. Both
+# parsers take the raw bytes, and orjson's decode error subclasses
+# json.JSONDecodeError, so callers handle either the same way
+try:
+    from orjson import loads as json_loads  # noqa: F401
+except ImportError:
+    from json import loads as json_loads  # type: ignore[assignment]  # noqa: F401
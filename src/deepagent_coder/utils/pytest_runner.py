@@ -0,0 +1,189 @@
+"""Run pytest in processes forked from a warm helper that has already imported it"""
+
+import contextlib
+from importlib import import_module
+from importlib.metadata import entry_points
+import json
+import os
+import select
+import signal
+import subprocess
+import sys
+import threading
+import time
+from typing import Any, BinaryIO
+
+# Forking the calling process itself is unsafe once it runs threads (as an
+# asyncio server does), so runs are forked from a single-threaded helper
+# process instead. The helper imports pytest and its installed plugins once
+# up front; the plugins are usually the bulk of pytest's start-up.
+AVAILABLE = hasattr(os, "fork")
+
+# The helper replies on a pipe of its own rather than on stdout, so output
+# from its interpreter start-up or from plugins it imports cannot get mixed in
+_helper: subprocess.Popen[bytes] | None = None
+_replies: BinaryIO | None = None
+_helper_lock = threading.Lock()
+
+
+class HelperBusyError(Exception):
+    """The helper is in the middle of another run"""
+
+
+def _get_helper() -> tuple[subprocess.Popen[bytes], BinaryIO]:
+    """Start the helper process, or start it again if it has exited"""
+    global _helper, _replies
+    if _helper is None or _replies is None or _helper.poll() is not None:
+        if _helper is not None:
+            _stop_helper(_helper)
+        read_fd, write_fd = os.pipe()
+        try:
+            # Its own session, so the helper and the run it forked can be killed together
+            _helper = subprocess.Popen(
+                [sys.executable, "-m", "deepagent_coder.utils.pytest_runner", str(write_fd)],
+                stdin=subprocess.PIPE,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+                pass_fds=(write_fd,),
+                start_new_session=True,
+            )
+        except OSError:
+            os.close(read_fd)
+            raise
+        finally:
+            os.close(write_fd)
+        # Unbuffered, so select sees exactly what is left unread
+        _replies = os.fdopen(read_fd, "rb", buffering=0)
+    return _helper, _replies
+
+
+def _stop_helper(helper: subprocess.Popen[bytes]) -> None:
+    """Kill the helper along with any run it forked"""
+    global _helper, _replies
+    if _replies is not None:
+        _replies.close()
+    _helper = _replies = None
+    with contextlib.suppress(ProcessLookupError):
+        os.killpg(helper.pid, signal.SIGKILL)
+    helper.wait()
+    # The caller may remove the run's output files once this returns, so give
+    # the killed run a moment to be gone
+    deadline = time.monotonic() + 1
+    while time.monotonic() < deadline:
+        try:
+            os.killpg(helper.pid, 0)
+        except ProcessLookupError:
+            break
+        time.sleep(0.01)
+
+
+def _read_reply(replies: BinaryIO) -> int:
+    line = replies.readline()
+    if not line:
+        raise RuntimeError("pytest helper process exited")
+    return int(line)
+
+
+def run(
+    args: list[str], cwd: str, stdout_path: str, stderr_path: str, timeout: float
+) -> int | None:
+    """
+    Run pytest with args in a forked child, blocking until it finishes
+
+    The helper runs one child at a time. A call made while it is busy fails
+    straight away rather than queueing, so concurrent callers can run pytest
+    another way instead of waiting out each other's runs.
+
+    Args:
+        args: pytest command line arguments
+        cwd: Directory to run pytest from
+        stdout_path: File receiving the child's stdout
+        stderr_path: File receiving the child's stderr
+        timeout: Seconds after which the child is killed
+
+    Returns:
+        pytest's exit code, or None if it timed out
+
+    Raises:
+        HelperBusyError: If the helper is running pytest for another call
+        RuntimeError: If the helper failed; it is restarted on the next run
+    """
+    request = {"args": args, "cwd": cwd, "stdout": stdout_path, "stderr": stderr_path}
+    if not _helper_lock.acquire(blocking=False):
+        raise HelperBusyError("pytest helper is busy")
+    try:
+        helper, replies = _get_helper()
+        try:
+            if helper.stdin is None:
+                raise RuntimeError("pytest helper process has no stdin")
+            helper.stdin.write(json.dumps(request).encode() + b"\n")
+            helper.stdin.flush()
+            pid = _read_reply(replies)
+
+            finished, _, _ = select.select([replies], [], [], timeout)
+            if not finished:
+                os.kill(pid, signal.SIGKILL)
+            returncode = _read_reply(replies)
+        except (OSError, ValueError, RuntimeError) as e:
+            # The replies can no longer be trusted to match this run
+            _stop_helper(helper)
+            raise RuntimeError(f"pytest helper failed: {e}") from e
+        return returncode if finished else None
+    finally:
+        _helper_lock.release()
+
+
+def _run_child(request: dict[str, Any], preloaded: list[str]) -> None:
+    """Forked child: run pytest as 'python -m pytest' would from the requested directory"""
+    os.dup2(os.open(os.devnull, os.O_RDONLY), 0)
+    for fd, path in ((1, request["stdout"]), (2, request["stderr"])):
+        os.dup2(os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600), fd)
+    os.chdir(request["cwd"])
+    # 'python -m' puts the working directory first on sys.path
+    sys.path[0] = request["cwd"]
+
+    import pytest
+
+    # pytest would rewrite asserts in plugins it imports itself, and warns that
+    # it cannot for those the helper already imported
+    args = list(request["args"])
+    for name in preloaded:
+        args += [
+            "-W",
+            f"ignore:Module already imported so cannot be rewritten; {name}"
+            ":pytest.PytestAssertRewriteWarning",
+        ]
+    returncode = pytest.main(args)
+    sys.stdout.flush()
+    sys.stderr.flush()
+    os._exit(int(returncode))
+
+
+def _serve(reply_fd: int) -> None:
+    """Helper side: fork a pytest run for each request line on stdin, replying on reply_fd"""
+    import_module("pytest")
+    preloaded = set()
+    for entry_point in entry_points(group="pytest11"):
+        try:
+            import_module(entry_point.module)
+        except Exception:
+            # pytest reports a broken plugin itself when it loads it
+            continue
+        preloaded.add(entry_point.module.partition(".")[0])
+
+    for line in sys.stdin.buffer:
+        request = json.loads(line)
+        pid = os.fork()
+        if pid == 0:
+            try:
+                os.close(reply_fd)
+                _run_child(request, sorted(preloaded))
+            finally:
+                os._exit(3)
+        os.write(reply_fd, b"%d\n" % pid)
+        _, status = os.waitpid(pid, 0)
+        os.write(reply_fd, b"%d\n" % os.waitstatus_to_exitcode(status))
+
+
+if __name__ == "__main__":
+    _serve(int(sys.argv[1]))
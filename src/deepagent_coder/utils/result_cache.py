@@ -0,0 +1,188 @@
+"""Persistent cache of per-file analysis results, keyed by file content"""
+
+from collections.abc import Sequence
+import hashlib
+import json
+import os
+from pathlib import Path
+import sqlite3
+import time
+from typing import Any, NamedTuple
+
+# Least recently stored results are dropped beyond this many entries
+MAX_ENTRIES = 2000
+
+# Results older than this are recomputed even if the file is unchanged
+TTL_SECONDS = 24 * 3600
+
+# Files modified this recently are matched by digest only
+_RACY_SECONDS = 2.0
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    tool TEXT NOT NULL,
+    path TEXT NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    digest BLOB NOT NULL,
+    result TEXT NOT NULL,
+    created REAL NOT NULL,
+    PRIMARY KEY (tool, path)
+);
+CREATE INDEX IF NOT EXISTS results_created ON results (created);
+"""
+
+
+def default_cache_path() -> Path:
+    """Location of the shared result database"""
+    return Path.home() / ".cache" / "deepagent-coder" / "results.db"
+
+
+def file_digest(path: str) -> bytes:
+    """BLAKE2b digest of a file's contents"""
+    with open(path, "rb") as f:
+        return hashlib.file_digest(f, "blake2b").digest()
+
+
+class Fingerprint(NamedTuple):
+    """The state of a file a result was computed from"""
+
+    mtime_ns: int
+    size: int
+    digest: bytes
+
+
+class ResultCache:
+    """
+    JSON results of analysis tools, stored per (tool, path).
+
+    A lookup first compares mtime and size, which costs one stat. If those
+    differ, the file's digest is compared instead, so a touched but unchanged
+    file still hits. The tool string should identify everything besides the
+    file that the result depends on, such as the tool version and its config.
+    """
+
+    def __init__(self, db_path: str | Path | None = None):
+        """
+        Open (creating if needed) a result database
+
+        Args:
+            db_path: Database file (default: ~/.cache/deepagent-coder/results.db)
+        """
+        self.db_path = Path(db_path) if db_path is not None else default_cache_path()
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.executescript(_SCHEMA)
+        return conn
+
+    def lookup(self, tool: str, path: str) -> tuple[Fingerprint, Any | None]:
+        """
+        Find the cached result for a file
+
+        Returns:
+            The file's current fingerprint, to pass to store() after computing
+            a result, and the cached result or None
+        """
+        return self.lookup_many([(tool, path)])[0]
+
+    def lookup_many(self, items: Sequence[tuple[str, str]]) -> list[tuple[Fingerprint, Any | None]]:
+        """
+        Find the cached results for several (tool, path) pairs, over one
+        connection and in one transaction
+
+        Returns:
+            For each pair, what lookup() returns
+        """
+        conn = self._connect()
+        try:
+            with conn:
+                return [self._lookup(conn, tool, path) for tool, path in items]
+        finally:
+            conn.close()
+
+    def _lookup(
+        self, conn: sqlite3.Connection, tool: str, path: str
+    ) -> tuple[Fingerprint, Any | None]:
+        path = os.path.abspath(path)
+        st = os.stat(path)
+        row = conn.execute(
+            "SELECT mtime_ns, size, digest, result, created FROM results "
+            "WHERE tool = ? AND path = ?",
+            (tool, path),
+        ).fetchone()
+        if row is not None and row[4] >= time.time() - TTL_SECONDS:
+            mtime_ns, size, digest, result, _ = row
+            if mtime_ns == st.st_mtime_ns and size == st.st_size:
+                return Fingerprint(st.st_mtime_ns, st.st_size, digest), json.loads(result)
+            fingerprint = Fingerprint(st.st_mtime_ns, st.st_size, file_digest(path))
+            if fingerprint.digest == digest:
+                # Same content under a new mtime: remember the new stat
+                conn.execute(
+                    "UPDATE results SET mtime_ns = ?, size = ? WHERE tool = ? AND path = ?",
+                    (self._stored_mtime(fingerprint), st.st_size, tool, path),
+                )
+                return fingerprint, json.loads(result)
+            return fingerprint, None
+        return Fingerprint(st.st_mtime_ns, st.st_size, file_digest(path)), None
+
+    def store(self, tool: str, path: str, fingerprint: Fingerprint, result: Any) -> None:
+        """
+        Cache a result computed from the file state returned by lookup()
+
+        Taking the fingerprint from before the analysis means a file edited
+        while it was analysed is never cached under its new content.
+        """
+        self.store_many([(tool, path, fingerprint, result)])
+
+    def store_many(self, entries: Sequence[tuple[str, str, Fingerprint, Any]]) -> None:
+        """
+        Cache several (tool, path, fingerprint, result) entries, as store()
+        does, over one connection and in one transaction
+        """
+        now = time.time()
+        conn = self._connect()
+        try:
+            with conn:
+                conn.executemany(
+                    "INSERT OR REPLACE INTO results "
+                    "(tool, path, mtime_ns, size, digest, result, created) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    [
+                        (
+                            tool,
+                            os.path.abspath(path),
+                            self._stored_mtime(fingerprint),
+                            fingerprint.size,
+                            fingerprint.digest,
+                            json.dumps(result),
+                            now,
+                        )
+                        for tool, path, fingerprint, result in entries
+                    ],
+                )
+                self._evict(conn)
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _stored_mtime(fingerprint: Fingerprint) -> int:
+        # A file changed again within the same mtime tick would look unchanged,
+        # so recently modified files are stored with an mtime that never matches
+        if time.time() - fingerprint.mtime_ns / 1e9 < _RACY_SECONDS:
+            return -1
+        return fingerprint.mtime_ns
+
+    def _evict(self, conn: sqlite3.Connection) -> None:
+        """Drop expired results and the oldest ones beyond MAX_ENTRIES"""
+        conn.execute("DELETE FROM results WHERE created < ?", (time.time() - TTL_SECONDS,))
+        (count,) = conn.execute("SELECT COUNT(*) FROM results").fetchone()
+        if count > MAX_ENTRIES:
+            conn.execute(
+                "DELETE FROM results WHERE rowid IN "
+                "(SELECT rowid FROM results ORDER BY created LIMIT ?)",
+                (count - MAX_ENTRIES,),
+            )
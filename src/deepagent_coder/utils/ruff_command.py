@@ -0,0 +1,18 @@
+"""Command line that runs ruff, shared by the servers that lint with it"""
+
+import functools
+import os
+import sys
+
+
+@functools.cache
+def ruff_command() -> list[str]:
+    """Return the command prefix that runs ruff"""
+    # 'python -m ruff' starts an interpreter only to exec the ruff binary;
+    # calling the binary directly skips that start-up on every lint
+    try:
+        from ruff.__main__ import find_ruff_bin
+
+        return [os.fsdecode(find_ruff_bin())]
+    except (ImportError, FileNotFoundError):
+        return [sys.executable, "-m", "ruff"]
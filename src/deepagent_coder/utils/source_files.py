@@ -0,0 +1,31 @@
+"""Finding a project's Python source files"""
+
+from collections.abc import Iterator
+import os
+
+# Directories never worth scanning for project source
+SKIP_DIRS = frozenset(
+    {".git", "node_modules", ".venv", "venv", "__pycache__", ".tox", "build", "dist"}
+)
+
+
+def iter_python_files(root: str) -> Iterator[str]:
+    """
+    Yield paths of Python files under root, skipping SKIP_DIRS and symlinked dirs
+
+    Directories are listed lazily, so a caller that stops early reads no more
+    of the tree than it needs.
+    """
+    stack = [root]
+    while stack:
+        directory = stack.pop()
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        if entry.name not in SKIP_DIRS:
+                            stack.append(entry.path)
+                    elif entry.name.endswith(".py") and entry.is_file():
+                        yield entry.path
+        except OSError:
+            continue
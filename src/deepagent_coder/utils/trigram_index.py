@@ -0,0 +1,213 @@
+"""Persistent trigram index for narrowing literal searches to candidate files"""
+
+from collections.abc import Iterator
+import logging
+import os
+from pathlib import Path
+import sqlite3
+import time
+
+logger = logging.getLogger(__name__)
+
+# Files larger than this are not indexed; they are always searched
+MAX_INDEXED_BYTES = 8 * 1024 * 1024
+
+# Least recently searched files are dropped once the index holds more than this
+MAX_INDEXED_FILES = 200_000
+
+# Files modified this recently are re-indexed on every lookup
+_RACY_SECONDS = 2.0
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    id INTEGER PRIMARY KEY,
+    path TEXT NOT NULL UNIQUE,
+    mtime REAL NOT NULL,
+    size INTEGER NOT NULL,
+    indexed INTEGER NOT NULL,
+    last_used REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS trigram_post (
+    tg INTEGER NOT NULL,
+    file_id INTEGER NOT NULL,
+    PRIMARY KEY (tg, file_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS trigram_post_file ON trigram_post (file_id);
+CREATE INDEX IF NOT EXISTS files_last_used ON files (last_used);
+"""
+
+
+def default_index_path() -> Path:
+    """Location of the shared index database"""
+    return Path.home() / ".cache" / "deepagent-coder" / "trigrams.db"
+
+
+def trigrams(data: bytes) -> set[int]:
+    """
+    Distinct trigrams of data, ASCII-lowercased so one index serves
+    case-sensitive and case-insensitive searches.
+
+    Each trigram is packed into an integer as b0 << 16 | b1 << 8 | b2.
+    """
+    data = data.lower()
+    return {a << 16 | b << 8 | c for a, b, c in set(zip(data, data[1:], data[2:], strict=False))}
+
+
+def _iter_files(root: str) -> Iterator[tuple[str, os.stat_result]]:
+    """Yield the regular files below root that grep -r would search"""
+    stack = [root]
+    while stack:
+        directory = stack.pop()
+        try:
+            it = os.scandir(directory)
+        except OSError:
+            continue
+        with it:
+            for entry in it:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+                    elif entry.is_file(follow_symlinks=False):
+                        yield entry.path, entry.stat(follow_symlinks=False)
+                except OSError:
+                    continue
+
+
+class TrigramIndex:
+    """
+    Trigram postings for the files below searched directories.
+
+    Every lookup first re-stats the tree and re-indexes files whose mtime or
+    size changed, so results are never stale; the saving is in not reading
+    files that cannot contain the pattern.
+    """
+
+    def __init__(self, db_path: str | Path | None = None):
+        """
+        Open (creating if needed) an index database
+
+        Args:
+            db_path: Database file (default: ~/.cache/deepagent-coder/trigrams.db)
+        """
+        self.db_path = Path(db_path) if db_path is not None else default_index_path()
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.executescript(_SCHEMA)
+        return conn
+
+    def candidates(self, root: str, pattern: str) -> list[str]:
+        """
+        Files below root that may contain pattern, compared ASCII case-insensitively
+
+        Args:
+            root: Directory to search
+            pattern: Literal search string of at least three bytes
+
+        Returns:
+            Sorted candidate file paths
+        """
+        wanted = trigrams(pattern.encode("utf-8"))
+        if not wanted:
+            raise ValueError("pattern must be at least three bytes long")
+
+        root = os.path.abspath(root)
+        conn = self._connect()
+        try:
+            with conn:
+                ids, unindexed = self._refresh(conn, root)
+            placeholders = ",".join("?" * len(wanted))
+            rows = conn.execute(
+                f"SELECT file_id FROM trigram_post WHERE tg IN ({placeholders}) "
+                "GROUP BY file_id HAVING COUNT(*) = ?",
+                (*wanted, len(wanted)),
+            )
+            hits = {file_id for (file_id,) in rows} | unindexed
+            with conn:
+                self._evict(conn)
+        finally:
+            conn.close()
+        return sorted(path for path, file_id in ids.items() if file_id in hits)
+
+    def _refresh(self, conn: sqlite3.Connection, root: str) -> tuple[dict[str, int], set[int]]:
+        """Bring the rows for files below root up to date with the filesystem"""
+        # Paths below root sort between root + sep and root + the next character
+        low, high = root + os.sep, root + chr(ord(os.sep) + 1)
+        known = {
+            path: (file_id, mtime, size, indexed)
+            for file_id, path, mtime, size, indexed in conn.execute(
+                "SELECT id, path, mtime, size, indexed FROM files WHERE path >= ? AND path < ?",
+                (low, high),
+            )
+        }
+
+        now = time.time()
+        ids: dict[str, int] = {}
+        unindexed: set[int] = set()
+        for path, st in _iter_files(root):
+            row = known.pop(path, None)
+            if row is not None and row[1] == st.st_mtime and row[2] == st.st_size:
+                file_id, indexed = row[0], row[3]
+            else:
+                file_id, indexed = self._index_file(conn, path, st, row[0] if row else None)
+            ids[path] = file_id
+            if not indexed:
+                unindexed.add(file_id)
+
+        # Whatever was not seen on this walk no longer exists
+        gone = [(row[0],) for row in known.values()]
+        conn.executemany("DELETE FROM trigram_post WHERE file_id = ?", gone)
+        conn.executemany("DELETE FROM files WHERE id = ?", gone)
+        conn.execute(
+            "UPDATE files SET last_used = ? WHERE path >= ? AND path < ?", (now, low, high)
+        )
+        return ids, unindexed
+
+    def _index_file(
+        self, conn: sqlite3.Connection, path: str, st: os.stat_result, file_id: int | None
+    ) -> tuple[int, bool]:
+        """(Re)write the postings for one file and return its id and whether it was indexed"""
+        data = None
+        if st.st_size <= MAX_INDEXED_BYTES:
+            try:
+                with open(path, "rb") as f:
+                    data = f.read()
+            except OSError:
+                logger.debug("Could not read %s for indexing", path)
+
+        # A file changed again within the same mtime tick would look unchanged,
+        # so recently modified files are stored with an mtime that never matches
+        recent = time.time() - st.st_mtime < _RACY_SECONDS
+        values = (-1.0 if recent else st.st_mtime, st.st_size, data is not None)
+        if file_id is None:
+            cursor = conn.execute(
+                "INSERT INTO files (path, mtime, size, indexed, last_used) VALUES (?, ?, ?, ?, ?)",
+                (path, *values, time.time()),
+            )
+            file_id = cursor.lastrowid
+            assert file_id is not None
+        else:
+            conn.execute("DELETE FROM trigram_post WHERE file_id = ?", (file_id,))
+            conn.execute(
+                "UPDATE files SET mtime = ?, size = ?, indexed = ? WHERE id = ?", (*values, file_id)
+            )
+        if data is not None:
+            conn.executemany(
+                "INSERT INTO trigram_post (tg, file_id) VALUES (?, ?)",
+                ((tg, file_id) for tg in trigrams(data)),
+            )
+        return file_id, data is not None
+
+    def _evict(self, conn: sqlite3.Connection) -> None:
+        """Drop the least recently searched files beyond MAX_INDEXED_FILES"""
+        (count,) = conn.execute("SELECT COUNT(*) FROM files").fetchone()
+        if count <= MAX_INDEXED_FILES:
+            return
+        stale = conn.execute(
+            "SELECT id FROM files ORDER BY last_used LIMIT ?", (count - MAX_INDEXED_FILES,)
+        ).fetchall()
+        conn.executemany("DELETE FROM trigram_post WHERE file_id = ?", stale)
+        conn.executemany("DELETE FROM files WHERE id = ?", stale)
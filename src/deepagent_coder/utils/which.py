@@ -0,0 +1,19 @@
+"""Cached command lookup on PATH, shared by the servers that run external tools"""
+
+import os
+import shutil
+
+# Resolved command paths, keyed by command and PATH. Misses are not cached, so
+# a tool installed mid-session is found on the next lookup
+_cache: dict[tuple[str, str], str] = {}
+
+
+def which(command: str) -> str | None:
+    """shutil.which, remembering hits until PATH changes"""
+    key = (command, os.environ.get("PATH", ""))
+    found = _cache.get(key)
+    if found is None:
+        found = shutil.which(command)
+        if found is not None:
+            _cache[key] = found
+    return found
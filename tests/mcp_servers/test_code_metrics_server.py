@@ -2,13 +2,22 @@
 """Tests for code metrics MCP server"""
 
 
+from collections import Counter
+import os
+import sys
+
 import pytest
 
+from deepagent_coder.mcp_servers import code_metrics_server
 from deepagent_coder.mcp_servers.code_metrics_server import (
+    _get_cached,
+    _timed,
     analyze_dependencies,
+    analyze_files_bulk,
     calculate_complexity,
     calculate_maintainability,
     detect_duplication,
+    get_tool_metrics,
     measure_code_coverage,
 )
 
@@ -93,6 +102,101 @@ async def test_calculate_complexity_nonexistent_file():
     assert "error" in result
 
 
+@pytest.mark.asyncio
+async def test_file_cache_reuses_parse(tmp_path):
+    """Test that unchanged files are parsed once and shared across tools"""
+    test_file = tmp_path / "cached.py"
+    test_file.write_text("import os\n\ndef f():\n    return 1\n")
+
+    first = await _get_cached(test_file)
+    await calculate_complexity(str(test_file))
+    await analyze_dependencies(str(test_file))
+
+    assert await _get_cached(test_file) is first
+
+
+@pytest.mark.asyncio
+async def test_complexity_visit_shared_with_maintainability(tmp_path):
+    """Test that complexity and maintainability reuse one complexity visit"""
+    test_file = tmp_path / "shared.py"
+    test_file.write_text("def f(x):\n    if x:\n        return 1\n    return 0\n")
+
+    await calculate_complexity(str(test_file))
+    cached = await _get_cached(test_file)
+    visitor = cached.complexity
+    result = await calculate_maintainability(str(test_file))
+
+    assert result["success"] is True
+    assert (await _get_cached(test_file)).complexity is visitor
+
+
+@pytest.mark.asyncio
+async def test_maintainability_honours_coding_cookie(tmp_path):
+    """Test that non-UTF-8 sources with a PEP 263 declaration are measured"""
+    test_file = tmp_path / "latin.py"
+    source = "# -*- coding: latin-1 -*-\nNAME = 'caf\u00e9'\n\ndef f():\n    return NAME\n"
+    test_file.write_bytes(source.encode("latin-1"))
+
+    result = await calculate_maintainability(str(test_file))
+
+    assert result["success"] is True
+    assert result["sloc"] == 3
+
+
+@pytest.mark.asyncio
+async def test_maintainability_fast_mode(tmp_path):
+    """Test that fast mode approximates radon's line counts without tokenizing"""
+    test_file = tmp_path / "module.py"
+    test_file.write_text(
+        '''"""
+Module docstring
+"""
+
+# A comment
+def f(x):
+    """Short docstring"""
+    if x:
+        return 1
+    else:
+        return 0
+
+
+def g(x):
+    """
+    Docstring with a blank line
+
+    Args:
+        x: value
+    """
+    return x
+'''
+    )
+
+    exact = await calculate_maintainability(str(test_file))
+    fast = await calculate_maintainability(str(test_file), fast=True)
+
+    assert fast["success"] is True
+    for key in ("sloc", "lines_of_code", "comments", "blank", "complexity"):
+        assert fast[key] == exact[key], key
+    assert fast["maintainability_index"] == exact["maintainability_index"]
+
+
+@pytest.mark.asyncio
+async def test_file_cache_invalidated_on_change(tmp_path):
+    """Test that editing a file invalidates its cached parse"""
+    test_file = tmp_path / "changing.py"
+    test_file.write_text("def f():\n    return 1\n")
+    result = await calculate_complexity(str(test_file))
+    assert [f["name"] for f in result["functions"]] == ["f"]
+
+    test_file.write_text("def g():\n    return 2\n\ndef h():\n    return 3\n")
+    stat = test_file.stat()
+    os.utime(test_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+    result = await calculate_complexity(str(test_file))
+    assert [f["name"] for f in result["functions"]] == ["g", "h"]
+
+
 @pytest.mark.asyncio
 async def test_measure_code_coverage_with_pytest(tmp_path):
     """Test measuring code coverage with pytest"""
@@ -133,6 +237,55 @@ def test_add():
     assert "uncovered_lines" in result or "missing_lines" in result
 
 
+@pytest.mark.asyncio
+async def test_measure_code_coverage_reports_uncovered_lines(tmp_path):
+    """Test that uncovered lines are read from the coverage report"""
+    (tmp_path / "calc.py").write_text(
+        """def add(a, b):
+    return a + b
+
+def subtract(a, b):
+    return a - b
+"""
+    )
+    (tmp_path / "test_calc.py").write_text(
+        """from calc import add
+
+def test_add():
+    assert add(1, 2) == 3
+"""
+    )
+
+    result = await measure_code_coverage(
+        test_command="pytest test_calc.py", source_dir="calc", working_dir=str(tmp_path)
+    )
+
+    assert result["success"] is True
+    assert result["total_statements"] == 4
+    assert result["covered_statements"] == 3
+    assert result["coverage_percent"] == 75.0
+    assert result["uncovered_lines"] == {"calc.py": [5]}
+
+
+@pytest.mark.asyncio
+async def test_measure_code_coverage_branch_opt_in(tmp_path):
+    """Test that branch coverage is only requested when enabled"""
+    (tmp_path / "test_nothing.py").write_text("def test_nothing():\n    pass\n")
+
+    default = await measure_code_coverage(
+        test_command="pytest", source_dir=str(tmp_path), working_dir=str(tmp_path)
+    )
+    branch = await measure_code_coverage(
+        test_command="pytest",
+        source_dir=str(tmp_path),
+        working_dir=str(tmp_path),
+        enable_branch=True,
+    )
+
+    assert "--cov-branch" not in default["command"]
+    assert "--cov-branch" in branch["command"]
+
+
 @pytest.mark.asyncio
 async def test_measure_code_coverage_no_tests(tmp_path):
     """Test measuring coverage with no tests"""
@@ -186,6 +339,69 @@ async def test_detect_duplication_exact_duplicates(tmp_path):
         assert "tokens" in dup or "lines" in dup
 
 
+@pytest.mark.asyncio
+async def test_detect_duplication_finds_renamed_copy(tmp_path):
+    """Test that structurally identical functions are reported across files"""
+    body = """    result = []
+    for item in {name}:
+        if item > 0:
+            result.append(item * 2)
+    return result
+"""
+    (tmp_path / "file1.py").write_text("def process_data(data):\n" + body.format(name="data"))
+    (tmp_path / "file2.py").write_text("def handle_items(items):\n" + body.format(name="items"))
+
+    result = await detect_duplication(path=str(tmp_path), threshold=10)
+
+    assert len(result) == 1
+    dup = result[0]
+    assert sorted(dup["functions"]) == ["handle_items", "process_data"]
+    assert dup["similarity"] == 1.0
+    assert dup["tokens"] >= 10
+
+
+@pytest.mark.asyncio
+async def test_detect_duplication_groups_exact_copies(tmp_path):
+    """Test that every cross-file pair of an exact copy is reported once"""
+    body = "    total = 0\n    for value in values:\n        total += value * 2\n    return total\n"
+    for name in ("alpha", "beta", "gamma"):
+        (tmp_path / f"{name}.py").write_text(f"def {name}(values):\n" + body)
+
+    result = await detect_duplication(path=str(tmp_path), threshold=5)
+
+    pairs = sorted(tuple(sorted(dup["functions"])) for dup in result)
+    assert pairs == [("alpha", "beta"), ("alpha", "gamma"), ("beta", "gamma")]
+    assert all(dup["similarity"] == 1.0 for dup in result)
+
+
+@pytest.mark.asyncio
+async def test_detect_duplication_skips_vendor_dirs(tmp_path):
+    """Test that vendored and virtualenv directories are not scanned"""
+    body = "    total = 0\n    for value in values:\n        total += value * 2\n    return total\n"
+    (tmp_path / "app.py").write_text("def app(values):\n" + body)
+    for vendor in (".venv", "node_modules"):
+        (tmp_path / vendor).mkdir()
+        (tmp_path / vendor / "copy.py").write_text("def copy(values):\n" + body)
+
+    result = await detect_duplication(path=str(tmp_path), threshold=5)
+
+    assert result == []
+
+
+@pytest.mark.asyncio
+async def test_detect_duplication_process_pool(tmp_path, monkeypatch):
+    """Test that multi-batch scans are summarized in worker processes"""
+    monkeypatch.setattr(code_metrics_server, "_PARSE_CHUNK_SIZE", 1)
+    body = "    total = 0\n    for value in values:\n        total += value * 2\n    return total\n"
+    (tmp_path / "first.py").write_text("def first(values):\n" + body)
+    (tmp_path / "second.py").write_text("def second(values):\n" + body)
+    (tmp_path / "broken.py").write_text("def broken(:\n")
+
+    result = await detect_duplication(path=str(tmp_path), threshold=5)
+
+    assert [sorted(dup["functions"]) for dup in result] == [["first", "second"]]
+
+
 @pytest.mark.asyncio
 async def test_detect_duplication_no_duplicates(tmp_path):
     """Test detecting duplication with unique code"""
@@ -298,6 +514,33 @@ from pathlib import Path
     assert "pathlib" in import_names
 
 
+@pytest.mark.asyncio
+async def test_analyze_dependencies_classifies_stdlib(tmp_path):
+    """Test stdlib classification and imports nested in blocks and functions"""
+    test_file = tmp_path / "nested.py"
+    content = """import hashlib
+import requests
+
+try:
+    import tomllib
+except ImportError:
+    tomllib = None
+
+def load():
+    from concurrent.futures import ThreadPoolExecutor
+    return ThreadPoolExecutor
+"""
+    test_file.write_text(content)
+
+    result = await analyze_dependencies(str(test_file))
+
+    assert result["success"] is True
+    modules = [imp["module"] for imp in result["imports"]]
+    assert modules == ["hashlib", "requests", "tomllib", "concurrent.futures"]
+    assert result["stdlib_imports"] == 3
+    assert result["third_party_imports"] == 1
+
+
 @pytest.mark.asyncio
 async def test_analyze_dependencies_relative_imports(tmp_path):
     """Test analyzing relative imports"""
@@ -360,3 +603,76 @@ async def test_analyze_dependencies_nonexistent():
 
     assert result["success"] is False
     assert "error" in result
+
+
+@pytest.mark.asyncio
+async def test_analyze_files_bulk(tmp_path):
+    """Test running several metrics over several files in one call"""
+    first = tmp_path / "first.py"
+    first.write_text("import os\n\ndef f(x):\n    if x:\n        return 1\n    return 0\n")
+    second = tmp_path / "second.py"
+    second.write_text("def g():\n    return 2\n")
+
+    result = await analyze_files_bulk(
+        [str(first), str(second), str(tmp_path / "missing.py")],
+        metrics=["complexity", "dependencies"],
+    )
+
+    assert result["success"] is True
+    first_result, second_result, missing_result = result["results"]
+    assert first_result["file"] == str(first)
+    assert first_result["complexity"]["functions"][0]["complexity"] == 2
+    assert first_result["dependencies"]["stdlib_imports"] == 1
+    assert "maintainability" not in first_result
+    assert second_result["complexity"]["total_functions"] == 1
+    assert missing_result["complexity"]["success"] is False
+
+
+@pytest.mark.asyncio
+async def test_analyze_files_bulk_rejects_unknown_metric(tmp_path):
+    """Test that unknown metric names are reported"""
+    result = await analyze_files_bulk([str(tmp_path / "a.py")], metrics=["speed"])
+
+    assert result["success"] is False
+    assert "speed" in result["error"]
+
+
+@pytest.mark.asyncio
+async def test_measure_code_coverage_falls_back_to_terminal_report(tmp_path):
+    """Test that the TOTAL row is parsed when no JSON report is written"""
+    (tmp_path / "report.py").write_text(
+        "print('Name    Stmts   Miss  Cover')\n"
+        "print('calc.py     4      1    75%')\n"
+        "print('util.py    16      2    88%')\n"
+        "print('TOTAL      20      3    85%')\n"
+    )
+
+    result = await measure_code_coverage(
+        test_command=f"{sys.executable} report.py", working_dir=str(tmp_path)
+    )
+
+    assert result["success"] is True
+    assert result["coverage_percent"] == 85.0
+    assert result["total_statements"] == 20
+    assert result["covered_statements"] == 17
+
+
+@pytest.mark.asyncio
+async def test_timed_tools_record_latency_and_failures(tmp_path, monkeypatch):
+    """Test that wrapped tools feed the latency histogram and failure counter"""
+    monkeypatch.setattr(code_metrics_server, "_tool_latency", {})
+    monkeypatch.setattr(code_metrics_server, "_tool_errors", Counter())
+    test_file = tmp_path / "small.py"
+    test_file.write_text("def f():\n    return 1\n")
+    timed_complexity = _timed(calculate_complexity)
+
+    await timed_complexity(str(test_file))
+    await timed_complexity(file_path=str(tmp_path / "missing.py"))
+    metrics = await get_tool_metrics()
+
+    latency = {(entry["tool"], entry["size_bucket"]): entry for entry in metrics["latency"]}
+    small = latency["calculate_complexity", "small"]
+    assert small["count"] == 1
+    assert small["buckets"]["+Inf"] == 1
+    assert latency["calculate_complexity", "none"]["count"] == 1
+    assert metrics["errors"] == [{"tool": "calculate_complexity", "kind": "failed", "count": 1}]
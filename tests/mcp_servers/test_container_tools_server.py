@@ -9,6 +9,7 @@ from deepagent_coder.mcp_servers.container_tools_server import (
     docker_command,
     docker_compose_command,
     kubectl_command,
+    mcp,
     read_yaml_file,
     terraform_command,
     write_yaml_file,
@@ -25,7 +26,9 @@ async def test_docker_command_success():
 
         assert result["success"] is True
         assert "docker ps output" in result["output"]
-        mock_run.assert_called_once_with("docker ps", cwd=None, timeout=300, env=None)
+        mock_run.assert_called_once_with(
+            "docker ps", cwd=None, timeout=300, env=None, max_output_bytes=1_048_576, tail=False
+        )
 
 
 @pytest.mark.asyncio
@@ -38,7 +41,12 @@ async def test_docker_command_with_cwd():
 
         assert result["success"] is True
         mock_run.assert_called_once_with(
-            "docker build -t myimage .", cwd="/app", timeout=300, env=None
+            "docker build -t myimage .",
+            cwd="/app",
+            timeout=300,
+            env=None,
+            max_output_bytes=1_048_576,
+            tail=False,
         )
 
 
@@ -58,6 +66,24 @@ async def test_docker_command_failure():
         assert "Error: No such container" in result["error"]
 
 
+@pytest.mark.asyncio
+async def test_docker_command_tail_logs():
+    """Test that log tailing is passed through and truncation is reported"""
+    with patch("deepagent_coder.mcp_servers.container_tools_server.run_command") as mock_run:
+        mock_run.return_value = {
+            "stdout": "last line\n",
+            "stderr": "",
+            "returncode": 0,
+            "truncated": True,
+        }
+
+        result = await docker_command("logs web", max_output_bytes=1024, tail=True)
+
+        assert result["truncated"] is True
+        assert mock_run.call_args.kwargs["max_output_bytes"] == 1024
+        assert mock_run.call_args.kwargs["tail"] is True
+
+
 @pytest.mark.asyncio
 async def test_docker_compose_command_up():
     """Test docker-compose up command"""
@@ -73,7 +99,12 @@ async def test_docker_compose_command_up():
         assert result["success"] is True
         assert "Creating" in result["output"]
         mock_run.assert_called_once_with(
-            "docker-compose up -d", cwd="/project", timeout=600, env=None
+            "docker-compose up -d",
+            cwd="/project",
+            timeout=600,
+            env=None,
+            max_output_bytes=1_048_576,
+            tail=False,
         )
 
 
@@ -158,6 +189,20 @@ async def test_write_yaml_file_success(tmp_path):
     assert "python:3.11" in content
 
 
+@pytest.mark.asyncio
+async def test_yaml_round_trip_preserves_key_order(tmp_path):
+    """Test that written YAML reads back unchanged with keys in insertion order"""
+    yaml_file = tmp_path / "compose.yaml"
+    data = {"version": "3", "services": {"web": {"image": "nginx", "ports": ["80:80"]}}}
+
+    await write_yaml_file(str(yaml_file), data)
+    result = await read_yaml_file(str(yaml_file))
+
+    assert result["success"] is True
+    assert result["data"] == data
+    assert yaml_file.read_text().startswith("version:")
+
+
 @pytest.mark.asyncio
 async def test_write_yaml_file_invalid_data(tmp_path):
     """Test writing invalid YAML data"""
@@ -170,3 +215,19 @@ async def test_write_yaml_file_invalid_data(tmp_path):
 
     assert result["success"] is False
     assert "error" in result
+
+
+@pytest.mark.asyncio
+async def test_tools_registered_under_public_names():
+    """Test that implementations are registered under the published tool names"""
+    tools = await mcp.get_tools()
+
+    assert set(tools) == {
+        "run_docker_command",
+        "run_docker_compose_command",
+        "run_kubectl_command",
+        "run_terraform_command",
+        "read_yaml",
+        "write_yaml",
+    }
+    assert "Use this tool to interact with Kubernetes" in tools["run_kubectl_command"].description
@@ -1,17 +1,23 @@
 # tests/mcp_servers/test_filesystem_server.py
 """Comprehensive tests for filesystem operations MCP server"""
 
+import os
+
 import pytest
 
+from deepagent_coder.mcp_servers import filesystem_server
 from deepagent_coder.mcp_servers.filesystem_server import (
     _create_directory_impl,
     _delete_directory_impl,
     _delete_file_impl,
     _get_file_info_impl,
+    _list_directory_deep_impl,
     _list_directory_impl,
     _move_file_impl,
     _read_file_impl,
     _write_file_impl,
+    read_file,
+    write_file,
 )
 
 # ============================================================================
@@ -25,7 +31,7 @@ async def test_write_file_simple(tmp_path):
     file_path = tmp_path / "test.txt"
     content = "Hello World"
 
-    result = await _write_file_impl(str(file_path), content)
+    result = _write_file_impl(str(file_path), content)
 
     assert result["success"] is True
     assert result["size"] == len(content)
@@ -39,7 +45,7 @@ async def test_write_file_creates_parent_dirs(tmp_path):
     file_path = tmp_path / "subdir" / "nested" / "test.txt"
     content = "Test content"
 
-    result = await _write_file_impl(str(file_path), content)
+    result = _write_file_impl(str(file_path), content)
 
     assert result["success"] is True
     assert file_path.exists()
@@ -52,7 +58,7 @@ async def test_write_file_overwrites_existing(tmp_path):
     file_path = tmp_path / "test.txt"
     file_path.write_text("Old content")
 
-    result = await _write_file_impl(str(file_path), "New content")
+    result = _write_file_impl(str(file_path), "New content")
 
     assert result["success"] is True
     assert file_path.read_text() == "New content"
@@ -63,7 +69,7 @@ async def test_write_file_empty_content(tmp_path):
     """Test writing an empty file"""
     file_path = tmp_path / "empty.txt"
 
-    result = await _write_file_impl(str(file_path), "")
+    result = _write_file_impl(str(file_path), "")
 
     assert result["success"] is True
     assert result["size"] == 0
@@ -77,12 +83,38 @@ async def test_write_file_unicode_content(tmp_path):
     file_path = tmp_path / "unicode.txt"
     content = "Hello 世界 🌍"
 
-    result = await _write_file_impl(str(file_path), content)
+    result = _write_file_impl(str(file_path), content)
 
     assert result["success"] is True
+    assert result["size"] == len(content.encode("utf-8"))
     assert file_path.read_text(encoding="utf-8") == content
 
 
+@pytest.mark.asyncio
+async def test_write_file_large_content(tmp_path):
+    """Test that content larger than one write batch is written intact"""
+    file_path = tmp_path / "large.txt"
+    content = "línea 世界 🌍\n" * 200_000
+
+    result = _write_file_impl(str(file_path), content)
+
+    assert result["success"] is True
+    assert file_path.read_bytes() == content.encode("utf-8")
+
+
+@pytest.mark.asyncio
+async def test_large_read_write_tools_round_trip(tmp_path):
+    """Test that the tools hand large files to a worker thread and back"""
+    file_path = tmp_path / "large.txt"
+    content = "x" * 200_000
+
+    written = await write_file.fn(str(file_path), content)
+    read = await read_file.fn(str(file_path))
+
+    assert written["success"] is True
+    assert read["content"] == content
+
+
 # ============================================================================
 # read_file tests
 # ============================================================================
@@ -95,7 +127,7 @@ async def test_read_file_simple(tmp_path):
     content = "Hello World"
     file_path.write_text(content)
 
-    result = await _read_file_impl(str(file_path))
+    result = _read_file_impl(str(file_path))
 
     assert result["success"] is True
     assert result["content"] == content
@@ -108,7 +140,7 @@ async def test_read_file_not_found(tmp_path):
     """Test reading a non-existent file"""
     file_path = tmp_path / "nonexistent.txt"
 
-    result = await _read_file_impl(str(file_path))
+    result = _read_file_impl(str(file_path))
 
     assert "error" in result
     assert "not found" in result["error"].lower()
@@ -120,7 +152,7 @@ async def test_read_file_directory(tmp_path):
     dir_path = tmp_path / "testdir"
     dir_path.mkdir()
 
-    result = await _read_file_impl(str(dir_path))
+    result = _read_file_impl(str(dir_path))
 
     assert "error" in result
     assert "not a file" in result["error"].lower()
@@ -132,7 +164,7 @@ async def test_read_file_empty(tmp_path):
     file_path = tmp_path / "empty.txt"
     file_path.write_text("")
 
-    result = await _read_file_impl(str(file_path))
+    result = _read_file_impl(str(file_path))
 
     assert result["success"] is True
     assert result["content"] == ""
@@ -146,12 +178,73 @@ async def test_read_file_unicode(tmp_path):
     content = "Hello 世界 🌍"
     file_path.write_text(content, encoding="utf-8")
 
-    result = await _read_file_impl(str(file_path))
+    result = _read_file_impl(str(file_path))
 
     assert result["success"] is True
     assert result["content"] == content
 
 
+@pytest.mark.asyncio
+async def test_read_file_translates_newlines(tmp_path):
+    """Test that CRLF and CR line endings are read as LF, like text mode"""
+    file_path = tmp_path / "crlf.txt"
+    file_path.write_bytes(b"one\r\ntwo\rthree\n")
+
+    result = _read_file_impl(str(file_path))
+
+    assert result["content"] == "one\ntwo\nthree\n"
+    assert result["size"] == 15
+
+
+@pytest.mark.asyncio
+async def test_read_file_large(tmp_path):
+    """Test reading a file large enough to be memory mapped"""
+    test_file = tmp_path / "large.txt"
+    test_file.write_bytes("línea\r\n".encode() * 200_000)
+
+    result = _read_file_impl(str(test_file))
+
+    assert result["success"] is True
+    assert result["content"] == "línea\n" * 200_000
+
+
+@pytest.mark.asyncio
+@pytest.mark.skipif(not hasattr(os, "mkfifo"), reason="requires named pipes")
+async def test_read_file_fifo(tmp_path):
+    """Test that reading a named pipe is rejected instead of blocking"""
+    fifo_path = tmp_path / "pipe"
+    os.mkfifo(fifo_path)
+
+    result = _read_file_impl(str(fifo_path))
+
+    assert "not a file" in result["error"].lower()
+
+
+@pytest.mark.asyncio
+async def test_read_file_offset_length(tmp_path):
+    """Test reading a byte range of a file"""
+    test_file = tmp_path / "test.txt"
+    test_file.write_text("0123456789")
+
+    result = _read_file_impl(str(test_file), offset=3, length=4)
+
+    assert result["success"] is True
+    assert result["content"] == "3456"
+    assert result["offset"] == 3
+    assert result["length"] == 4
+    assert result["size"] == 10
+
+    tail = _read_file_impl(str(test_file), offset=8)
+    assert tail["content"] == "89"
+
+    past_end = _read_file_impl(str(test_file), offset=20, length=5)
+    assert past_end["content"] == ""
+    assert past_end["length"] == 0
+
+    negative = _read_file_impl(str(test_file), offset=-1)
+    assert "error" in negative
+
+
 # ============================================================================
 # list_directory tests
 # ============================================================================
@@ -234,6 +327,76 @@ async def test_list_directory_sorting(tmp_path):
     assert names[3] == "zebra.txt"
 
 
+@pytest.mark.asyncio
+async def test_list_directory_ignore(tmp_path):
+    """Test that entries matching ignore patterns are left out"""
+    (tmp_path / ".git").mkdir()
+    (tmp_path / "__pycache__").mkdir()
+    (tmp_path / "module.py").write_text("")
+    (tmp_path / "module.pyc").write_text("")
+
+    result = await _list_directory_impl(str(tmp_path), ignore=[".git", "__pycache__", "*.pyc"])
+
+    assert result["success"] is True
+    assert [e["name"] for e in result["entries"]] == ["module.py"]
+
+
+@pytest.mark.asyncio
+@pytest.mark.skipif(not hasattr(os, "symlink"), reason="requires symlinks")
+async def test_list_directory_symlinks(tmp_path):
+    """Test that symlinked directories and dangling links are listed"""
+    (tmp_path / "real").mkdir()
+    (tmp_path / "linked").symlink_to(tmp_path / "real")
+    (tmp_path / "dangling").symlink_to(tmp_path / "missing")
+
+    result = await _list_directory_impl(str(tmp_path))
+
+    assert result["success"] is True
+    types = {entry["name"]: entry["type"] for entry in result["entries"]}
+    assert types == {"linked": "directory", "real": "directory", "dangling": "file"}
+
+
+@pytest.mark.asyncio
+async def test_list_directory_deep(tmp_path):
+    """Test recursive listing of a directory tree"""
+    (tmp_path / "pkg" / "sub").mkdir(parents=True)
+    (tmp_path / "pkg" / "sub" / "mod.py").write_text("x = 1")
+    (tmp_path / "top.txt").write_text("content")
+
+    result = await _list_directory_deep_impl(str(tmp_path))
+
+    assert result["success"] is True
+    assert result["truncated"] is False
+    paths = [os.path.relpath(entry["path"], tmp_path) for entry in result["entries"]]
+    assert paths == [
+        "pkg",
+        os.path.join("pkg", "sub"),
+        os.path.join("pkg", "sub", "mod.py"),
+        "top.txt",
+    ]
+    assert result["entries"][2]["size"] == 5
+
+
+@pytest.mark.asyncio
+async def test_list_directory_deep_truncates(tmp_path):
+    """Test that deep listings stop at max_entries"""
+    for i in range(5):
+        (tmp_path / f"file{i}.txt").write_text("content")
+
+    result = await _list_directory_deep_impl(str(tmp_path), max_entries=3)
+
+    assert result["count"] == 3
+    assert result["truncated"] is True
+
+
+@pytest.mark.asyncio
+async def test_list_directory_deep_not_found(tmp_path):
+    """Test deep listing of a missing directory"""
+    result = await _list_directory_deep_impl(str(tmp_path / "missing"))
+
+    assert "not found" in result["error"].lower()
+
+
 # ============================================================================
 # create_directory tests
 # ============================================================================
@@ -419,6 +582,21 @@ async def test_delete_file_is_directory(tmp_path):
     assert "not a file" in result["error"].lower()
 
 
+@pytest.mark.asyncio
+async def test_delete_file_symlink(tmp_path):
+    """Test that deleting a symlink removes the link, not its target"""
+    target = tmp_path / "target.txt"
+    target.write_text("content")
+    link = tmp_path / "link.txt"
+    link.symlink_to(target)
+
+    result = await _delete_file_impl(str(link))
+
+    assert result["success"] is True
+    assert not link.exists()
+    assert target.exists()
+
+
 # ============================================================================
 # delete_directory tests
 # ============================================================================
@@ -466,6 +644,30 @@ async def test_delete_directory_recursive(tmp_path):
     assert not dir_path.exists()
 
 
+@pytest.mark.asyncio
+async def test_delete_directory_recursive_keeps_symlink_targets(tmp_path, monkeypatch):
+    """Test that recursive deletion removes symlinks without following them"""
+    # Force the thread pool path on a small tree
+    monkeypatch.setattr(filesystem_server, "_RMTREE_PARALLEL_MIN_FILES", 1)
+    outside = tmp_path / "outside"
+    outside.mkdir()
+    (outside / "keep.txt").write_text("keep")
+    dir_path = tmp_path / "tree"
+    for i in range(5):
+        sub = dir_path / f"d{i}" / "inner"
+        sub.mkdir(parents=True)
+        for j in range(20):
+            (sub / f"f{j}.txt").write_text("x")
+    (dir_path / "d0" / "linked").symlink_to(outside)
+    (dir_path / "d1" / "linked_file").symlink_to(outside / "keep.txt")
+
+    result = await _delete_directory_impl(str(dir_path), recursive=True, parallel=True)
+
+    assert result["success"] is True
+    assert not dir_path.exists()
+    assert (outside / "keep.txt").exists()
+
+
 @pytest.mark.asyncio
 async def test_delete_directory_not_found(tmp_path):
     """Test deleting a non-existent directory"""
@@ -513,6 +715,23 @@ async def test_get_file_info_file(tmp_path):
     assert "permissions" in result
 
 
+@pytest.mark.asyncio
+async def test_get_file_info_matches_fresh_stat(tmp_path):
+    """Test that cached-attribute metadata agrees with a fresh stat"""
+    file_path = tmp_path / "test.txt"
+    file_path.write_text("Hello World")
+    os.chmod(file_path, 0o640)
+
+    cached = await _get_file_info_impl(str(file_path))
+    fresh = await _get_file_info_impl(str(file_path), fresh=True)
+    stat = os.stat(file_path)
+
+    assert cached == fresh
+    assert cached["size"] == stat.st_size
+    assert cached["modified"] == pytest.approx(stat.st_mtime)
+    assert cached["permissions"] == "640"
+
+
 @pytest.mark.asyncio
 async def test_get_file_info_directory(tmp_path):
     """Test getting info for a directory"""
@@ -570,11 +789,11 @@ async def test_full_workflow(tmp_path):
     # Write file
     file_path = dir_path / "test.txt"
     content = "Test content"
-    result = await _write_file_impl(str(file_path), content)
+    result = _write_file_impl(str(file_path), content)
     assert result["success"] is True
 
     # Read file
-    result = await _read_file_impl(str(file_path))
+    result = _read_file_impl(str(file_path))
     assert result["success"] is True
     assert result["content"] == content
 
@@ -100,3 +100,45 @@ async def test_lint_project_runs_all_tools(tmp_path):
     assert "ruff" in result["results"]
     assert "mypy" in result["results"]
     assert "black" in result["results"]
+
+
+@pytest.mark.asyncio
+async def test_lint_project_fix_leaves_file_clean(tmp_path):
+    """Test that fixing runs ruff and black without clobbering each other"""
+    source = tmp_path / "messy.py"
+    source.write_text("import os\nimport sys\n\n\ndef  add(a,b):\n    return a+b\n")
+
+    result = await lint_project(str(tmp_path), fix=True)
+
+    assert "error" not in result
+    assert result["results"]["black"]["check_only"] is False
+    assert source.read_text() == "def add(a, b):\n    return a + b\n"
+
+
+@pytest.mark.asyncio
+async def test_run_mypy_reports_errors_across_runs(tmp_path):
+    """Test that repeated mypy runs through the daemon report current errors"""
+    source = tmp_path / "typed.py"
+    source.write_text("def f(x: int) -> str:\n    return x\n")
+
+    first = await run_mypy(str(source))
+    source.write_text("def f(x: int) -> str:\n    return str(x)\n")
+    second = await run_mypy(str(source))
+
+    assert first["total_issues"] == 1
+    assert first["issues"][0]["line"] == 2
+    assert second["total_issues"] == 0
+    assert second["message"] == "No type errors found"
+
+
+@pytest.mark.asyncio
+async def test_run_black_counts_reformatted_and_unchanged(tmp_path):
+    """Test that both summary counts are parsed from black's output"""
+    (tmp_path / "messy.py").write_text("x=1\n")
+    (tmp_path / "clean.py").write_text("y = 2\n")
+
+    result = await run_black(str(tmp_path), check=True)
+
+    assert result["reformatted"] == 1
+    assert result["unchanged"] == 1
+    assert result["total_files"] == 2
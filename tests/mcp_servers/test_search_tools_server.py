@@ -1,6 +1,24 @@
+import inspect
+import json
+import os
+import shutil
+import subprocess
+
 import pytest
 
-from deepagent_coder.mcp_servers.search_tools_server import find, grep, head, ls, ripgrep, tail, wc
+from deepagent_coder.mcp_servers import search_tools_server
+from deepagent_coder.mcp_servers.search_tools_server import (
+    _iter_raw_lines,
+    _parse_rg_json,
+    find,
+    grep,
+    head,
+    ls,
+    mcp,
+    ripgrep,
+    tail,
+    wc,
+)
 
 
 @pytest.fixture
@@ -83,6 +101,68 @@ def test_grep_regex_mode(temp_project):
     assert len(results) > 0
 
 
+def test_grep_colon_in_file_name(tmp_path):
+    """Test matches in files whose names contain ':' keep their path and line number"""
+    (tmp_path / "a:1:b.txt").write_text("first\nneedle: here\n")
+
+    results = grep(pattern="needle", path=str(tmp_path), recursive=True)
+
+    assert len(results) == 1
+    assert results[0]["file"].endswith("a:1:b.txt")
+    assert str(results[0]["line"]) == "2"
+    assert results[0]["text"].strip() == "needle: here"
+
+
+def test_grep_pages_results(tmp_path):
+    """Test grep returns one page of matches and where the next one starts"""
+    (tmp_path / "data.txt").write_text("".join(f"match {i}\n" for i in range(5)))
+
+    first = grep(pattern="match", path=str(tmp_path), max_results=2)
+    second = grep(pattern="match", path=str(tmp_path), max_results=2, offset=2)
+    last = grep(pattern="match", path=str(tmp_path), max_results=2, offset=4)
+
+    assert [m["text"] for m in first[:2]] == ["match 0", "match 1"]
+    assert first[2] == {"truncated": True, "next_offset": 2}
+    assert [m["text"] for m in second[:2]] == ["match 2", "match 3"]
+    assert second[2] == {"truncated": True, "next_offset": 4}
+    assert [m["text"] for m in last] == ["match 4"]
+
+
+def test_grep_indexed_matches_unindexed(temp_project, tmp_path, monkeypatch):
+    """Test an index-narrowed grep returns the same matches as a full scan"""
+    monkeypatch.setattr(
+        "deepagent_coder.utils.trigram_index.default_index_path", lambda: tmp_path / "index.db"
+    )
+
+    full = grep(pattern="World", path=str(temp_project))
+    indexed = grep(pattern="World", path=str(temp_project), indexed=True)
+
+    assert len(full) == 2
+    assert sorted((r["file"], r["line"]) for r in indexed) == sorted(
+        (r["file"], r["line"]) for r in full
+    )
+    assert grep(pattern="absent", path=str(temp_project), indexed=True) == []
+
+
+def test_grep_indexed_matches_any_line_of_pattern(tmp_path, monkeypatch):
+    """Test an indexed search for several lines finds files holding any one of them"""
+    monkeypatch.setattr(
+        "deepagent_coder.utils.trigram_index.default_index_path", lambda: tmp_path / "index.db"
+    )
+    project = tmp_path / "project"
+    project.mkdir()
+    (project / "a.txt").write_text("alpha\n")
+    (project / "b.txt").write_text("bravo\n")
+
+    plain = grep(pattern="alpha\nbravo", path=str(project))
+    indexed = grep(pattern="alpha\nbravo", path=str(project), indexed=True)
+
+    assert len(plain) == 2
+    assert sorted((r["file"], r["line"]) for r in indexed) == sorted(
+        (r["file"], r["line"]) for r in plain
+    )
+
+
 def test_find_files_by_name(temp_project):
     """Test finding files by name"""
     results = find(path=str(temp_project), name="main.py", type="f")
@@ -116,6 +196,30 @@ def test_find_with_max_depth(temp_project):
     assert len(results) >= 2  # src and tests
 
 
+def test_find_does_not_follow_symlinks(temp_project):
+    """Test find lists symlinks as links and does not descend into them"""
+    (temp_project / "linked").symlink_to(temp_project / "src")
+
+    files = find(path=str(temp_project), type="f", name="main.py")
+    links = find(path=str(temp_project), type="l")
+
+    assert files == [str(temp_project / "src" / "main.py")]
+    assert links == [str(temp_project / "linked")]
+
+
+def test_find_parallel_matches_serial(temp_project):
+    """Test the threaded walk finds the same paths in the same order"""
+    for i in range(5):
+        (temp_project / "src" / f"pkg{i}").mkdir()
+        (temp_project / "src" / f"pkg{i}" / "mod.py").write_text("")
+
+    serial = find(path=str(temp_project), extension="py")
+    parallel = find(path=str(temp_project), extension="py", parallel=True)
+
+    assert parallel == serial
+    assert len(serial) == 8
+
+
 def test_ls_basic(temp_project):
     """Test basic directory listing"""
     results = ls(path=str(temp_project))
@@ -146,6 +250,63 @@ def test_ls_all_files(temp_project):
     assert any(".hidden" in str(r) for r in results)
 
 
+def test_ls_long_format_fields(tmp_path):
+    """Test ls -l style fields, including symlink targets"""
+    (tmp_path / "data.txt").write_text("12345")
+    (tmp_path / "link").symlink_to("data.txt")
+
+    results = ls(path=str(tmp_path), long_format=True)
+
+    assert [r["name"] for r in results] == ["data.txt", "link -> data.txt"]
+    assert results[0]["permissions"].startswith("-")
+    assert results[0]["size"] == "5"
+    assert results[1]["permissions"].startswith("l")
+
+
+def test_ls_reuses_listing_until_directory_changes(tmp_path, monkeypatch):
+    """Test an unchanged directory is not re-read and a changed one is"""
+    (tmp_path / "a.txt").write_text("a")
+    os.utime(tmp_path, (1_000_000_000, 1_000_000_000))
+    assert ls(path=str(tmp_path)) == ["a.txt"]
+
+    def fail(path):
+        raise AssertionError("directory was re-read")
+
+    monkeypatch.setattr("os.scandir", fail)
+    assert ls(path=str(tmp_path)) == ["a.txt"]
+    monkeypatch.undo()
+
+    (tmp_path / "b.txt").write_text("b")
+    assert ls(path=str(tmp_path)) == ["a.txt", "b.txt"]
+
+
+def test_find_and_ls_page_results(tmp_path):
+    """Test find and ls stop at max_results and report the next offset"""
+    for i in range(4):
+        (tmp_path / f"f{i}.txt").write_text("x")
+
+    assert ls(path=str(tmp_path), max_results=3) == [
+        "f0.txt",
+        "f1.txt",
+        "f2.txt",
+        "Truncated: more results, next_offset=3",
+    ]
+    assert ls(path=str(tmp_path), max_results=3, offset=3) == ["f3.txt"]
+
+    found = find(path=str(tmp_path), type="f", max_results=3)
+    assert len(found) == 4
+    assert found[-1] == "Truncated: more results, next_offset=3"
+    rest = find(path=str(tmp_path), type="f", max_results=3, offset=3)
+    assert sorted(found[:3] + rest) == sorted(str(tmp_path / f"f{i}.txt") for i in range(4))
+
+
+def test_ls_missing_path(tmp_path):
+    """Test ls reports a missing path as an error"""
+    results = ls(path=str(tmp_path / "missing"))
+
+    assert "error" in results[0]
+
+
 def test_head_reads_first_lines(temp_project):
     """Test reading first N lines of file"""
     content = head(file_path=str(temp_project / "src" / "main.py"), lines=2)
@@ -163,6 +324,23 @@ def test_head_default_lines(temp_project):
     assert len(content) > 0
 
 
+def test_head_large_file(tmp_path):
+    """Test head on a file large enough to be read through a mapping"""
+    path = tmp_path / "big.txt"
+    path.write_text("".join(f"line {i}  \n" for i in range(20000)))
+
+    result = head(file_path=str(path), lines=3)
+
+    assert result == "line 0\nline 1\nline 2"
+
+
+def test_head_missing_file(tmp_path):
+    """Test head reports a file that cannot be opened"""
+    result = head(file_path=str(tmp_path / "missing.txt"))
+
+    assert result.startswith("Error:")
+
+
 def test_tail_reads_last_lines(temp_project):
     """Test reading last N lines of file"""
     content = tail(file_path=str(temp_project / "src" / "main.py"), lines=2)
@@ -171,6 +349,25 @@ def test_tail_reads_last_lines(temp_project):
     assert len(content) > 0
 
 
+def test_tail_spans_blocks(tmp_path):
+    """Test tail on a file larger than one read block"""
+    file_path = tmp_path / "big.log"
+    file_path.write_text("".join(f"line {i}\n" for i in range(100_000)))
+
+    content = tail(file_path=str(file_path), lines=3)
+
+    assert content == "line 99997\nline 99998\nline 99999"
+
+
+def test_head_and_tail_report_invalid_utf8(tmp_path):
+    """Test head and tail both report undecodable lines instead of replacing them"""
+    file_path = tmp_path / "binary.log"
+    file_path.write_bytes(b"\xff\xfe\n")
+
+    assert head(file_path=str(file_path)).startswith("Error:")
+    assert tail(file_path=str(file_path)).startswith("Error:")
+
+
 def test_wc_counts_lines(temp_project):
     """Test counting lines in file"""
     result = wc(file_path=str(temp_project / "src" / "main.py"), lines=True)
@@ -198,6 +395,17 @@ def test_wc_counts_characters(temp_project):
     assert result["characters"] > 0
 
 
+def test_wc_counts_across_chunks(tmp_path, monkeypatch):
+    """Test words and line endings split between read chunks are counted once"""
+    monkeypatch.setattr("deepagent_coder.mcp_servers.search_tools_server._WC_CHUNK_SIZE", 3)
+    path = tmp_path / "data.txt"
+    path.write_bytes("héllo wörld\r\nsecond line\rlast".encode())
+
+    result = wc(file_path=str(path), lines=True, words=True, chars=True)
+
+    assert result == {"lines": 3, "words": 5, "characters": 28}
+
+
 def test_ripgrep_basic_search(temp_project):
     """Test basic ripgrep search"""
     results = ripgrep(pattern="hello", path=str(temp_project / "src"))
@@ -233,3 +441,99 @@ def test_ripgrep_fallback_to_grep(temp_project, monkeypatch):
 
     # Should still work via grep fallback
     assert isinstance(results, list)
+
+
+def test_parse_rg_json_keeps_only_matches():
+    """Test ripgrep JSON parsing, including a file name containing colons"""
+    records = [
+        {"type": "begin", "data": {"path": {"text": "a:b.py"}}},
+        {
+            "type": "context",
+            "data": {"path": {"text": "a:b.py"}, "lines": {"text": "x\n"}, "line_number": 1},
+        },
+        {
+            "type": "match",
+            "data": {
+                "path": {"text": "a:b.py"},
+                "lines": {"text": "def hello():\n"},
+                "line_number": 2,
+                "submatches": [{"match": {"text": "hello"}, "start": 4, "end": 9}],
+            },
+        },
+        {"type": "end", "data": {"path": {"text": "a:b.py"}}},
+    ]
+    # rg writes compact JSON, one record per line
+    lines = [json.dumps(r, separators=(",", ":")).encode() + b"\n" for r in records]
+    lines.append(b'{"type":"match","data":\n')
+
+    matches = list(_parse_rg_json(lines))
+
+    assert matches == [{"file": "a:b.py", "line": 2, "text": "def hello():", "column": 4}]
+    assert list(_parse_rg_json(lines, context=True)) == [
+        {"file": "a:b.py", "line": 1, "text": "x", "column": 0},
+        *matches,
+    ]
+
+
+@pytest.mark.parametrize("backend", ["rg", "grep"])
+def test_grep_backends_agree(tmp_path, monkeypatch, backend):
+    """Test grep reports context lines and keeps indentation with either backend"""
+    if backend == "rg" and shutil.which("rg") is None:
+        pytest.skip("ripgrep not installed")
+    if backend == "grep":
+        monkeypatch.setattr(search_tools_server, "which", lambda command: None)
+    source = tmp_path / "mod.py"
+    source.write_text("def f():\n    needle = 1\n    return needle\n\nother = 2\n")
+
+    results = grep("needle = 1", path=str(source), context_before=1, context_after=1)
+
+    assert [(r["line"], r["text"]) for r in results] == [
+        ("1", "def f():"),
+        ("2", "    needle = 1"),
+        ("3", "    return needle"),
+    ]
+
+
+@pytest.mark.parametrize("backend", ["rg", "grep"])
+def test_grep_non_recursive_skips_directories(tmp_path, monkeypatch, backend):
+    """Test a directory is only searched with recursive=True, whichever backend runs"""
+    if backend == "rg" and shutil.which("rg") is None:
+        pytest.skip("ripgrep not installed")
+    if backend == "grep":
+        monkeypatch.setattr(search_tools_server, "which", lambda command: None)
+    (tmp_path / "mod.py").write_text("needle = 1\n")
+
+    assert grep("needle", path=str(tmp_path), recursive=False) == []
+    assert len(grep("needle", path=str(tmp_path / "mod.py"), recursive=False)) == 1
+
+
+def test_iter_lines_times_out():
+    """Test that a streamed command is killed after its timeout"""
+    with pytest.raises(subprocess.TimeoutExpired):
+        list(_iter_raw_lines(["sh", "-c", "echo first; exec sleep 10"], timeout=1))
+
+
+@pytest.mark.asyncio
+async def test_tools_run_off_the_event_loop(temp_project):
+    """Test the registered tools are async and return the plain functions' results"""
+    tools = await mcp.get_tools()
+
+    for name in ("grep", "find", "ls", "head", "tail", "wc", "ripgrep"):
+        assert inspect.iscoroutinefunction(tools[name].fn)
+    assert "pattern" in tools["grep"].parameters["properties"]
+
+    path = str(temp_project / "src" / "main.py")
+    assert await tools["head"].fn(file_path=path, lines=2) == head(file_path=path, lines=2)
+
+
+@pytest.mark.parametrize("parallel", [False, True])
+def test_find_times_out(tmp_path, monkeypatch, parallel):
+    """Test a walk past the find timeout is abandoned with an error"""
+    for i in range(3):
+        (tmp_path / f"d{i}" / "sub").mkdir(parents=True)
+    monkeypatch.setattr(search_tools_server, "_FIND_TIMEOUT", -1)
+
+    results = find(path=str(tmp_path), name="missing.txt", parallel=parallel)
+
+    assert len(results) == 1
+    assert results[0].startswith("Error: Find timed out after")
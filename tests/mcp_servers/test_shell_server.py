@@ -3,6 +3,7 @@
 
 import pytest
 
+from deepagent_coder.mcp_servers import shell_server
 from deepagent_coder.mcp_servers.shell_server import (
     check_command_exists,
     get_shell_info,
@@ -42,6 +43,42 @@ async def test_run_command_with_env():
     assert "custom_value" in result["stdout"]
 
 
+@pytest.mark.asyncio
+async def test_run_command_inherits_env(monkeypatch):
+    """Test the server's environment reaches commands with and without overrides"""
+    monkeypatch.setenv("INHERITED_VAR", "from_server")
+
+    result = await run_command("echo $INHERITED_VAR")
+    assert result["stdout"].strip() == "from_server"
+
+    result = await run_command("echo $INHERITED_VAR $MY_VAR", env={"MY_VAR": "custom"})
+    assert result["stdout"].strip() == "from_server custom"
+
+
+def test_direct_argv_only_for_plain_programs():
+    """Test that only commands without shell syntax skip the shell"""
+    assert shell_server._direct_argv("git status --short") == ("git", "status", "--short")
+    assert shell_server._direct_argv("grep 'a b' \"c d\"") == ("grep", "a b", "c d")
+    assert shell_server._direct_argv("ls | wc -l") is None
+    assert shell_server._direct_argv("echo $HOME") is None
+    assert shell_server._direct_argv("ls *.py") is None
+    assert shell_server._direct_argv("cd /tmp") is None
+    assert shell_server._direct_argv("FOO=1 env") is None
+    assert shell_server._direct_argv("./script.sh") is None
+    assert shell_server._direct_argv("echo 'unterminated") is None
+
+
+@pytest.mark.asyncio
+async def test_run_command_direct_argv(tmp_path):
+    """Test a directly executed command receives quoted arguments intact"""
+    (tmp_path / "a b.txt").write_text("x")
+
+    result = await run_command("ls 'a b.txt'", cwd=str(tmp_path))
+
+    assert result["returncode"] == 0
+    assert result["stdout"] == "a b.txt\n"
+
+
 @pytest.mark.asyncio
 async def test_run_command_timeout():
     """Test command timeout"""
@@ -52,6 +89,36 @@ async def test_run_command_timeout():
     assert result["returncode"] != 0
 
 
+@pytest.mark.asyncio
+async def test_run_command_max_output_bytes():
+    """Test that capped output keeps the head and reports truncation"""
+    result = await run_command("seq 1 100000", max_output_bytes=10)
+
+    assert result["returncode"] == 0
+    assert result["stdout"] == "1\n2\n3\n4\n5\n"
+    assert result["truncated"] is True
+
+
+@pytest.mark.asyncio
+async def test_run_command_max_output_bytes_tail():
+    """Test that tail mode keeps whole trailing lines"""
+    result = await run_command("seq 1 100000", max_output_bytes=20, tail=True)
+
+    assert result["returncode"] == 0
+    assert result["stdout"] == "99998\n99999\n100000\n"
+    assert result["truncated"] is True
+
+
+@pytest.mark.asyncio
+async def test_run_command_raw_bytes():
+    """Test that encoding=None returns undecoded output"""
+    result = await run_command("printf 'caf\\303\\251\\377'", encoding=None)
+
+    assert result["returncode"] == 0
+    assert result["stdout"] == b"caf\xc3\xa9\xff"
+    assert result["stderr"] == b""
+
+
 @pytest.mark.asyncio
 async def test_run_command_stderr():
     """Test command that outputs to stderr"""
@@ -89,6 +156,25 @@ async def test_get_shell_info():
     assert result["platform"] in ["linux", "darwin", "win32"]
 
 
+@pytest.mark.asyncio
+async def test_get_shell_info_probes_version_once(monkeypatch):
+    """Test that the shell version probe runs once per shell"""
+    calls = []
+
+    async def fake_run_command(command, *args, **kwargs):
+        calls.append(command)
+        return {"stdout": "fakesh 1.0\n", "stderr": "", "returncode": 0}
+
+    monkeypatch.setattr(shell_server, "run_command", fake_run_command)
+    monkeypatch.setattr(shell_server, "_shell_versions", {})
+
+    first = await get_shell_info()
+    second = await get_shell_info()
+
+    assert first["version"] == second["version"] == "fakesh 1.0"
+    assert len(calls) == 1
+
+
 @pytest.mark.asyncio
 async def test_check_command_exists():
     """Test checking if command exists"""
@@ -102,6 +188,22 @@ async def test_check_command_exists():
     assert result["exists"] is False
 
 
+@pytest.mark.asyncio
+async def test_check_command_exists_follows_path_changes(tmp_path, monkeypatch):
+    """Test that cached lookups see tools added to PATH or installed later"""
+    tool = tmp_path / "fresh_tool_12345"
+    monkeypatch.setenv("PATH", str(tmp_path))
+
+    assert (await check_command_exists(tool.name))["exists"] is False
+
+    tool.write_text("#!/bin/sh\n")
+    tool.chmod(0o755)
+    assert (await check_command_exists(tool.name))["path"] == str(tool)
+
+    monkeypatch.setenv("PATH", "/nonexistent")
+    assert (await check_command_exists(tool.name))["exists"] is False
+
+
 @pytest.mark.asyncio
 async def test_run_command_multiline():
     """Test running multi-line command"""
@@ -1,17 +1,34 @@
 # tests/mcp_servers/test_static_analysis_server.py
 """Tests for static analysis MCP server"""
 
+import os
+import subprocess
+import sys
 
 import pytest
 
 from deepagent_coder.mcp_servers.static_analysis_server import (
+    _contains_python,
+    _lint_command,
+    _parse_cached,
     check_type_coverage,
+    check_type_coverage_many,
     documentation_coverage,
+    documentation_coverage_many,
+    full_coverage,
     run_linter,
     security_scan,
 )
 
 
+@pytest.fixture(autouse=True)
+def result_cache_path(tmp_path, monkeypatch):
+    """Keep cached results out of the user's cache directory"""
+    path = tmp_path / "results.db"
+    monkeypatch.setattr("deepagent_coder.utils.result_cache.default_cache_path", lambda: path)
+    return path
+
+
 @pytest.mark.asyncio
 async def test_run_linter_pylint_clean_code(tmp_path):
     """Test running pylint on clean Python code"""
@@ -77,6 +94,20 @@ async def test_run_linter_auto_detect(tmp_path):
     assert result["linter_used"] in ["pylint", "ruff", "flake8"]
 
 
+@pytest.mark.asyncio
+async def test_run_linter_prefers_ruff(tmp_path):
+    """Test Python files default to ruff when it is installed"""
+    pytest.importorskip("ruff")
+    test_file = tmp_path / "test.py"
+    test_file.write_text("import os\n")
+
+    result = await run_linter(str(test_file))
+
+    assert result["success"] is True
+    assert result["linter_used"] == "ruff"
+    assert [issue["type"] for issue in result["issues"]] == ["F401"]
+
+
 @pytest.mark.asyncio
 async def test_run_linter_with_config(tmp_path):
     """Test running linter with custom config file"""
@@ -91,6 +122,120 @@ async def test_run_linter_with_config(tmp_path):
     assert result["success"] is True
 
 
+@pytest.mark.asyncio
+async def test_run_linter_batch_groups_issues_by_file(tmp_path):
+    """Test linting several files in one run attributes issues to each file"""
+    clean = tmp_path / "clean.py"
+    clean.write_text("x = 1\n")
+    unused = tmp_path / "unused.py"
+    unused.write_text("import os\n")
+
+    result = await run_linter(linter="ruff", file_paths=[str(clean), str(unused)])
+
+    assert result["success"] is True
+    assert result["files"] == [str(clean), str(unused)]
+    assert result["issues_by_file"][str(clean)] == []
+    assert [i["type"] for i in result["issues_by_file"][str(unused)]] == ["F401"]
+    assert result["issues"][0]["file"] == str(unused)
+    assert result["total_issues"] == 1
+
+
+@pytest.mark.asyncio
+async def test_run_linter_batch_missing_file(tmp_path):
+    """Test a batch with a missing file reports it instead of linting"""
+    present = tmp_path / "a.py"
+    present.write_text("x = 1\n")
+
+    result = await run_linter(file_paths=[str(present), str(tmp_path / "b.py")])
+
+    assert result["success"] is False
+    assert "b.py" in result["error"]
+
+
+@pytest.mark.asyncio
+async def test_run_linter_reuses_results_for_unchanged_files(tmp_path, monkeypatch):
+    """Test an unchanged file is not linted again, and a changed one is"""
+    source = tmp_path / "unused.py"
+    source.write_text("import os\n")
+    os.utime(source, (1, 1))
+    runs = []
+
+    async def flake8(cmd):
+        runs.append(cmd)
+        lines = source.read_text().splitlines()
+        return "".join(
+            f"{source}:{n}:1: F401 imported but unused\n" for n in range(1, len(lines) + 1)
+        ).encode()
+
+    monkeypatch.setattr("deepagent_coder.mcp_servers.static_analysis_server._run_tool", flake8)
+    first = await run_linter(file_paths=[str(source)], linter="flake8")
+    assert await run_linter(file_paths=[str(source)], linter="flake8") == first
+    assert len(runs) == 1
+
+    source.write_text("import os\nimport sys\n")
+    result = await run_linter(file_paths=[str(source)], linter="flake8")
+    assert len(runs) == 2
+    assert result["total_issues"] == 2
+
+
+@pytest.mark.asyncio
+async def test_run_linter_does_not_cache_ruff(tmp_path, monkeypatch):
+    """Test ruff runs every time, as it is faster than the result cache"""
+    source = tmp_path / "unused.py"
+    source.write_text("import os\n")
+    runs = []
+
+    async def ruff(cmd):
+        runs.append(cmd)
+        return b"[]"
+
+    monkeypatch.setattr("deepagent_coder.mcp_servers.static_analysis_server._run_tool", ruff)
+    await run_linter(str(source), linter="ruff")
+    await run_linter(str(source), linter="ruff")
+    assert len(runs) == 2
+
+
+@pytest.mark.asyncio
+async def test_since_ref_keeps_only_changed_files(tmp_path):
+    """Test since_ref skips files unchanged since the ref, counting uncommitted work"""
+
+    def git(*args):
+        subprocess.run(["git", "-C", str(tmp_path), *args], check=True, capture_output=True)
+
+    git("init", "-q")
+    a, b, c = (tmp_path / name for name in ("a.py", "b.py", "c.py"))
+    a.write_text("x = 1\n")
+    b.write_text("y = 1\n")
+    git("add", "a.py", "b.py")
+    git("-c", "user.email=t@example.com", "-c", "user.name=t", "commit", "-q", "-m", "init")
+    b.write_text("import os\n")
+    c.write_text("import sys\n")
+    paths = [str(a), str(b), str(c)]
+
+    result = await run_linter(file_paths=paths, linter="ruff", since_ref="HEAD")
+    assert result["success"] is True
+    assert result["files"] == [str(b), str(c)]
+    assert result["skipped"] == [str(a)]
+    assert result["total_issues"] == 2
+
+    coverage = await documentation_coverage_many(paths, since_ref="HEAD")
+    assert [r["file"] for r in coverage["results"]] == [str(b), str(c)]
+
+    result = await run_linter(file_paths=paths, linter="ruff", since_ref="no-such-ref")
+    assert result["success"] is False
+
+
+def test_lint_command_runs_ruff_binary():
+    """Test ruff runs as its native binary rather than through the interpreter"""
+    ruff = pytest.importorskip("ruff")
+
+    cmd = _lint_command("ruff", ["a.py"], None)
+
+    assert cmd == [ruff.find_ruff_bin(), "check", "--output-format=json", "a.py"]
+    assert _lint_command("ruff", ["a.py"], None) == cmd
+    assert _lint_command("pylint", ["a.py"], None)[:3] == [sys.executable, "-m", "pylint"]
+
+
 @pytest.mark.asyncio
 async def test_run_linter_nonexistent_file():
     """Test linting non-existent file"""
@@ -176,6 +321,19 @@ async def test_security_scan_auto_detect_language(tmp_path):
     assert "language_detected" in result or "vulnerabilities" in result
 
 
+def test_contains_python_skips_vendored_dirs(tmp_path):
+    """Test Python detection ignores virtualenvs and finds nested sources"""
+    (tmp_path / ".venv" / "lib").mkdir(parents=True)
+    (tmp_path / ".venv" / "lib" / "site.py").write_text("")
+    (tmp_path / "web").mkdir()
+    (tmp_path / "web" / "index.js").write_text("")
+    assert not _contains_python(str(tmp_path))
+
+    (tmp_path / "web" / "tools").mkdir()
+    (tmp_path / "web" / "tools" / "build.py").write_text("")
+    assert _contains_python(str(tmp_path))
+
+
 @pytest.mark.asyncio
 async def test_security_scan_nonexistent_path():
     """Test security scan on non-existent path"""
@@ -380,3 +538,113 @@ async def test_documentation_coverage_nonexistent():
 
     assert result["success"] is False
     assert "error" in result
+
+
+@pytest.mark.asyncio
+async def test_coverage_many_matches_single_file_results(tmp_path, monkeypatch):
+    """Test the batch coverage tools keep input order across worker chunks"""
+    monkeypatch.setattr(
+        "deepagent_coder.mcp_servers.static_analysis_server._ANALYSIS_CHUNK_SIZE", 2
+    )
+    monkeypatch.setattr("deepagent_coder.mcp_servers.static_analysis_server._POOL_MIN_BYTES", 0)
+    paths = []
+    for i in range(3):
+        source = tmp_path / f"mod{i}.py"
+        source.write_text(f'def f{i}(x: int) -> int:\n    """Doc"""\n    return x\n')
+        paths.append(str(source))
+    (tmp_path / "broken.py").write_text("def broken(:\n")
+    paths.insert(1, str(tmp_path / "broken.py"))
+    paths.append(str(tmp_path / "missing.py"))
+
+    types = await check_type_coverage_many(paths)
+    docs = await documentation_coverage_many(paths)
+
+    assert [r["success"] for r in types["results"]] == [True, False, True, True, False]
+    assert [r.get("file") for r in docs["results"][:1]] == [paths[0]]
+    for path, type_result, doc_result in zip(paths, types["results"], docs["results"], strict=True):
+        assert type_result == await check_type_coverage(path)
+        assert doc_result == await documentation_coverage(path)
+
+
+@pytest.mark.asyncio
+async def test_full_coverage_combines_both_reports(tmp_path):
+    """Test full coverage reports both metrics, counting nested and async functions"""
+    test_file = tmp_path / "mixed.py"
+    content = """\"\"\"Module.\"\"\"
+
+class Service:
+    \"\"\"A service.\"\"\"
+
+    async def fetch(self, key: str) -> bytes:
+        def helper(x):
+            return x
+
+        return helper(key)
+"""
+    test_file.write_text(content)
+
+    result = await full_coverage(str(test_file))
+
+    assert result["success"] is True
+    assert result["total_functions"] == 2
+    assert result["typed_functions"] == 1
+    assert [f["name"] for f in result["untyped_functions"]] == ["helper"]
+    assert result["total_items"] == 3
+    assert [i["name"] for i in result["undocumented_items"]] == ["fetch", "helper"]
+    assert result["module_docstring"] is True
+    assert result == {
+        **await check_type_coverage(str(test_file)),
+        **await documentation_coverage(str(test_file)),
+    }
+
+
+@pytest.mark.asyncio
+async def test_coverage_finds_definitions_inside_blocks(tmp_path):
+    """Test definitions under if/try/with/match are counted, and lambdas are not"""
+    test_file = tmp_path / "blocks.py"
+    test_file.write_text("""
+try:
+    import fast
+except ImportError:
+    def fallback(): pass
+else:
+    pass
+finally:
+    def cleanup(): pass
+if fast:
+    class Fast: pass
+with open(__file__) as f:
+    def reader(): pass
+match f:
+    case _:
+        async def matched(): pass
+key = lambda x: [y for y in x]
+""")
+
+    result = await documentation_coverage(str(test_file))
+
+    assert [i["name"] for i in result["undocumented_items"]] == [
+        "fallback",
+        "cleanup",
+        "Fast",
+        "reader",
+        "matched",
+    ]
+
+
+@pytest.mark.asyncio
+async def test_coverage_tools_share_parsed_tree(tmp_path):
+    """Test a file is parsed once for both coverage tools, and again once it changes"""
+    test_file = tmp_path / "shared.py"
+    test_file.write_text("def f(x: int) -> int:\n    return x\n")
+    os.utime(test_file, (1, 1))
+    _parse_cached.cache_clear()
+
+    assert (await check_type_coverage(str(test_file)))["typed_functions"] == 1
+    assert (await documentation_coverage(str(test_file)))["total_items"] == 1
+    assert _parse_cached.cache_info().misses == 1
+    assert _parse_cached.cache_info().hits == 1
+
+    test_file.write_text("def f(x):\n    return x\n")
+    assert (await check_type_coverage(str(test_file)))["typed_functions"] == 0
+    assert _parse_cached.cache_info().misses == 2
@@ -1,10 +1,13 @@
 # tests/mcp_servers/test_testing_server.py
 from pathlib import Path
+import sys
 
 import pytest
 
 from deepagent_coder.mcp_servers.testing_server import _get_coverage_impl as get_coverage
+from deepagent_coder.mcp_servers.testing_server import _run_command
 from deepagent_coder.mcp_servers.testing_server import _run_pytest_impl as run_pytest
+from deepagent_coder.utils import pytest_runner
 
 
 @pytest.fixture
@@ -67,6 +70,17 @@ async def test_run_pytest_executes_tests(test_project):
     assert result["failed"] >= 1
 
 
+@pytest.mark.asyncio
+async def test_run_pytest_runs_while_forkserver_busy(test_project):
+    """Test a run does not wait for one already using the pytest forkserver"""
+    with pytest_runner._helper_lock:
+        result = await run_pytest(test_project)
+
+    assert "error" not in result
+    assert result["total_tests"] >= 3
+    assert result["failed"] >= 1
+
+
 @pytest.mark.asyncio
 async def test_run_pytest_with_specific_file(test_project):
     """Test running pytest on specific file"""
@@ -77,6 +91,41 @@ async def test_run_pytest_with_specific_file(test_project):
     assert result["total_tests"] >= 3
 
 
+@pytest.mark.asyncio
+async def test_run_pytest_counts_from_report(test_project):
+    """Test counts come from the report, not from words in the test output"""
+    test_file = Path(test_project) / "tests" / "test_noisy.py"
+    test_file.write_text(
+        """
+import pytest
+
+@pytest.fixture
+def broken():
+    raise RuntimeError("99 passed, 0 failed")
+
+def test_noisy():
+    print("12 passed, 7 skipped")
+    assert False
+
+def test_broken_fixture(broken):
+    pass
+
+@pytest.mark.skip
+def test_skipped():
+    pass
+"""
+    )
+
+    result = await run_pytest(test_project, test_path=str(test_file))
+
+    assert result["passed"] == 0
+    assert result["failed"] == 1
+    assert result["skipped"] == 1
+    assert result["errors"] == 1
+    assert result["total_tests"] == 3
+    assert result["success"] is False
+
+
 @pytest.mark.asyncio
 async def test_run_pytest_with_markers(test_project):
     """Test running pytest with markers"""
@@ -113,6 +162,19 @@ async def test_get_coverage_reports_coverage(test_project):
     assert result["coverage_percent"] <= 100
 
 
+@pytest.mark.asyncio
+async def test_get_coverage_measures_source_dirs(test_project):
+    """Test coverage is measured for, and limited to, the given source directories"""
+    result = await get_coverage(test_project, source_dirs=["src"])
+
+    assert result["success"] is True
+    assert [f["file"] for f in result["files"]] == [
+        str(Path("src") / "__init__.py"),
+        str(Path("src") / "calculator.py"),
+    ]
+    assert result["coverage_percent"] == 100
+
+
 @pytest.mark.asyncio
 async def test_run_pytest_handles_nonexistent_path():
     """Test pytest with non-existent path"""
@@ -120,3 +182,19 @@ async def test_run_pytest_handles_nonexistent_path():
 
     assert "error" in result
     assert "not found" in result["error"].lower()
+
+
+@pytest.mark.asyncio
+async def test_run_command_keeps_output_tail(tmp_path):
+    """Test only the last lines of a long output are kept"""
+    cmd = [sys.executable, "-c", "for i in range(5000): print(i)\nprint('end', end='')"]
+
+    result = await _run_command(cmd, cwd=tmp_path, max_lines=3)
+    assert result["stdout"] == "... 4998 earlier lines omitted\n4998\n4999\nend"
+    assert result["returncode"] == 0
+
+    result = await _run_command(cmd, cwd=tmp_path, max_lines=None)
+    assert result["stdout"].splitlines()[0] == "0"
+
+    result = await _run_command(cmd, cwd=tmp_path, max_lines=0)
+    assert result["stdout"] == ""
@@ -0,0 +1,112 @@
+# tests/middleware/test_auto_mkdir_middleware.py
+from types import SimpleNamespace
+from unittest.mock import AsyncMock
+
+import pytest
+
+from deepagent_coder.middleware.auto_mkdir_middleware import create_auto_mkdir_middleware
+
+
+def _write_call(path):
+    """State whose last message asks to write a file"""
+    message = SimpleNamespace(tool_calls=[{"name": "write_file", "args": {"path": path}}])
+    return {"messages": [message]}
+
+
+@pytest.mark.asyncio
+async def test_auto_mkdir_creates_parent_directory(tmp_path):
+    """Test the parent of a written file is created"""
+    client = AsyncMock()
+    middleware = create_auto_mkdir_middleware(client, prefer_local=False)
+
+    await middleware(_write_call(str(tmp_path / "pkg" / "mod.py")))
+
+    client.call_tool.assert_awaited_once_with("create_directory", {"path": str(tmp_path / "pkg")})
+
+
+@pytest.mark.asyncio
+async def test_auto_mkdir_creates_each_directory_once(tmp_path):
+    """Test directories already created, or created as ancestors, are not created again"""
+    client = AsyncMock()
+    middleware = create_auto_mkdir_middleware(client, prefer_local=False)
+
+    await middleware(_write_call(str(tmp_path / "a" / "b" / "one.py")))
+    await middleware(_write_call(str(tmp_path / "a" / "b" / "two.py")))
+    await middleware(_write_call(str(tmp_path / "a" / "three.py")))
+    await middleware(_write_call(str(tmp_path / "c" / "four.py")))
+
+    created = [call.args[1]["path"] for call in client.call_tool.await_args_list]
+    assert created == [str(tmp_path / "a" / "b"), str(tmp_path / "c")]
+
+
+@pytest.mark.asyncio
+async def test_auto_mkdir_retries_after_failure(tmp_path):
+    """Test a directory whose creation failed is attempted again"""
+    client = AsyncMock()
+    client.call_tool.side_effect = [RuntimeError("server busy"), None]
+    middleware = create_auto_mkdir_middleware(client, prefer_local=False)
+
+    await middleware(_write_call(str(tmp_path / "pkg" / "one.py")))
+    await middleware(_write_call(str(tmp_path / "pkg" / "two.py")))
+
+    assert client.call_tool.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_auto_mkdir_creates_directories_locally(tmp_path):
+    """Test directories are created without an MCP round trip by default"""
+    client = AsyncMock()
+    middleware = create_auto_mkdir_middleware(client, workspace=tmp_path)
+
+    await middleware(_write_call(str(tmp_path / "a" / "b" / "mod.py")))
+
+    assert (tmp_path / "a" / "b").is_dir()
+    client.call_tool.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_auto_mkdir_falls_back_to_mcp(tmp_path):
+    """Test the MCP tool is used when the directory cannot be created locally"""
+    (tmp_path / "blocker").write_text("not a directory")
+    client = AsyncMock()
+    middleware = create_auto_mkdir_middleware(client, workspace=tmp_path)
+
+    await middleware(_write_call(str(tmp_path / "blocker" / "sub" / "mod.py")))
+
+    client.call_tool.assert_awaited_once_with(
+        "create_directory", {"path": str(tmp_path / "blocker" / "sub")}
+    )
+
+
+@pytest.mark.asyncio
+async def test_auto_mkdir_resolves_relative_paths_in_workspace(tmp_path, monkeypatch):
+    """Test relative paths are created under the workspace, not the working directory"""
+    workspace = tmp_path / "workspace"
+    workspace.mkdir()
+    monkeypatch.chdir(tmp_path)
+    client = AsyncMock()
+    middleware = create_auto_mkdir_middleware(client, workspace=workspace)
+
+    await middleware(_write_call("./src/pkg/mod.py"))
+    await middleware(_write_call(str(workspace / "src" / "pkg" / "other.py")))
+
+    assert (workspace / "src" / "pkg").is_dir()
+    assert not (tmp_path / "src").exists()
+    client.call_tool.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_auto_mkdir_leaves_paths_outside_workspace_to_mcp(tmp_path):
+    """Test directories outside the workspace are not created locally"""
+    workspace = tmp_path / "workspace"
+    workspace.mkdir()
+    client = AsyncMock()
+    middleware = create_auto_mkdir_middleware(client, workspace=workspace)
+
+    await middleware(_write_call(str(tmp_path / "elsewhere" / "mod.py")))
+    await middleware(_write_call("../escape/mod.py"))
+
+    assert not (tmp_path / "elsewhere").exists()
+    assert not (tmp_path / "escape").exists()
+    created = [call.args[1]["path"] for call in client.call_tool.await_args_list]
+    assert created == [str(tmp_path / "elsewhere"), "../escape"]
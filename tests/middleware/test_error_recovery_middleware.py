@@ -86,3 +86,97 @@ async def test_error_recovery_clears_error_on_success():
     result2 = await middleware(state2)
     # Retry count should not increase without error
     assert result2.get("retry_count", 0) <= 1
+
+
+@pytest.mark.asyncio
+async def test_error_recovery_names_missing_parent_directory():
+    """Test a missing-directory error suggests creating the failed path's parent"""
+    middleware = create_error_recovery_middleware()
+
+    state = {
+        "messages": [],
+        "error": "No such file or directory: /work/src/pkg/module.py",
+    }
+
+    result = await middleware(state)
+    assert "'/work/src/pkg' doesn't exist" in result["messages"][-1]["content"]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    ("error", "tip"),
+    [
+        ("Parent directory does not exist", "Create the parent directory first"),
+        ("Permission denied", "Check file permissions"),
+        ("Path outside allowed directories", "The path is outside the workspace"),
+        ("Connection failed", "Attempting recovery (attempt 1/3)"),
+    ],
+)
+async def test_error_recovery_guidance_per_error_kind(error, tip):
+    """Test each kind of error gets its matching guidance"""
+    middleware = create_error_recovery_middleware()
+
+    result = await middleware({"messages": [], "error": error})
+    assert tip in result["messages"][-1]["content"]
+
+
+@pytest.mark.asyncio
+async def test_error_recovery_without_messages_only_tracks_retries():
+    """Test no message is added when recovery messages are disabled"""
+    middleware = create_error_recovery_middleware(max_retries=2, add_recovery_message=False)
+
+    state = {"messages": [], "error": "No such file or directory: /work/a.py"}
+
+    result = await middleware(state)
+    assert result["messages"] == []
+    result = await middleware(result)
+    assert result["messages"] == []
+    assert result["max_retries_reached"] is True
+
+
+@pytest.mark.asyncio
+async def test_error_recovery_backs_off_exponentially(monkeypatch):
+    """Test retries wait twice as long each attempt, capped at max_delay"""
+    delays = []
+
+    async def record(delay):
+        delays.append(delay)
+
+    monkeypatch.setattr(
+        "deepagent_coder.middleware.error_recovery_middleware.asyncio.sleep", record
+    )
+    middleware = create_error_recovery_middleware(
+        max_retries=10, base_delay=1.0, max_delay=5.0, jitter=False
+    )
+
+    state = {"messages": [], "error": "Rate limited"}
+    for _ in range(4):
+        state = await middleware(state)
+
+    assert delays == [1.0, 2.0, 4.0, 5.0]
+
+
+@pytest.mark.asyncio
+async def test_error_recovery_handles_batched_errors_as_one_attempt():
+    """Test several errors from one step add one retry and one combined message"""
+    middleware = create_error_recovery_middleware(base_delay=0)
+
+    state = {"messages": [], "errors": ["Permission denied", "Path outside allowed directories"]}
+
+    result = await middleware(state)
+    assert result["retry_count"] == 1
+    assert len(result["messages"]) == 1
+    content = result["messages"][0]["content"]
+    assert "Check file permissions" in content
+    assert "The path is outside the workspace" in content
+
+
+@pytest.mark.asyncio
+async def test_error_recovery_state_without_messages():
+    """Test a state with no message list gets one, and retries below the limit are flagged"""
+    middleware = create_error_recovery_middleware(base_delay=0)
+
+    result = await middleware({"error": "Connection failed"})
+    assert result["retry_count"] == 1
+    assert result["max_retries_reached"] is False
+    assert len(result["messages"]) == 1
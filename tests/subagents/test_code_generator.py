@@ -50,3 +50,21 @@ async def test_code_generator_creation():
             del sys.modules["deepagents"]
         if "deepagents.backend" in sys.modules:
             del sys.modules["deepagents.backend"]
+
+
+@pytest.mark.asyncio
+async def test_code_generator_reuses_agent_for_same_inputs():
+    """Test the agent is built once per model selector and tools, until the cache is cleared."""
+    from deepagent_coder.core.model_selector import ModelSelector
+    from deepagent_coder.subagents.code_generator import (
+        clear_agent_cache,
+        create_code_generator_agent,
+    )
+
+    selector = ModelSelector()
+    agent = await create_code_generator_agent(selector, [])
+
+    assert await create_code_generator_agent(selector, []) is agent
+    assert await create_code_generator_agent(ModelSelector(), []) is not agent
+    clear_agent_cache()
+    assert await create_code_generator_agent(selector, []) is not agent
@@ -0,0 +1,18 @@
+"""Tests for the shared process pool"""
+
+import os
+
+from deepagent_coder.utils.executors import cpu_pool
+
+
+def test_cpu_pool_is_shared():
+    """Test every caller gets the same pool, running work in another process"""
+    pool = cpu_pool()
+
+    assert cpu_pool() is pool
+    assert pool.submit(os.getpid).result() != os.getpid()
+
+
+def test_cpu_pool_spawns_workers():
+    """Test workers are spawned, not forked from the multi-threaded server"""
+    assert cpu_pool()._mp_context.get_start_method() == "spawn"
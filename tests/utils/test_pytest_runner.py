@@ -0,0 +1,94 @@
+"""Tests for the forked pytest runner"""
+
+import pytest
+
+from deepagent_coder.utils import pytest_runner
+
+pytestmark = pytest.mark.skipif(not pytest_runner.AVAILABLE, reason="needs os.fork")
+
+
+def _run(tmp_path, source, timeout=60):
+    (tmp_path / "test_sample.py").write_text(source)
+    stdout = tmp_path / "stdout"
+    stderr = tmp_path / "stderr"
+    returncode = pytest_runner.run(
+        ["-q", "-p", "no:cacheprovider"], str(tmp_path), str(stdout), str(stderr), timeout
+    )
+    return returncode, stdout.read_text()
+
+
+def test_run_reports_exit_code_and_output(tmp_path):
+    """Test a run's exit code and output come back as from 'python -m pytest'"""
+    returncode, output = _run(tmp_path, "def test_ok():\n    assert True\n")
+    assert returncode == 0
+    assert "1 passed" in output
+    assert "cannot be rewritten" not in output
+
+    returncode, output = _run(tmp_path, "def test_bad():\n    assert 1 == 2\n")
+    assert returncode == 1
+    assert "assert 1 == 2" in output
+
+
+def test_run_imports_from_working_directory(tmp_path):
+    """Test modules next to the tests import like under 'python -m pytest'"""
+    (tmp_path / "helper_mod.py").write_text("VALUE = 3\n")
+    returncode, _ = _run(
+        tmp_path, "from helper_mod import VALUE\n\ndef test_value():\n    assert VALUE == 3\n"
+    )
+    assert returncode == 0
+
+
+def test_run_kills_timed_out_run(tmp_path):
+    """Test a run past its timeout is killed, and the next run still works"""
+    returncode, _ = _run(tmp_path, "import time\n\ndef test_slow():\n    time.sleep(60)\n", 1)
+    assert returncode is None
+
+    returncode, _ = _run(tmp_path, "def test_ok():\n    pass\n")
+    assert returncode == 0
+
+
+def test_run_fails_fast_while_helper_busy(tmp_path):
+    """Test a run does not queue behind one the helper is already running"""
+    with pytest_runner._helper_lock, pytest.raises(pytest_runner.HelperBusyError):
+        _run(tmp_path, "def test_ok():\n    pass\n")
+
+
+def _restart_helper():
+    if pytest_runner._helper is not None:
+        pytest_runner._stop_helper(pytest_runner._helper)
+
+
+def test_run_ignores_output_printed_by_the_helper(tmp_path, monkeypatch):
+    """Test output printed while the helper starts does not corrupt its replies"""
+    site = tmp_path / "site"
+    site.mkdir()
+    (site / "sitecustomize.py").write_text("print('12345')\nprint('noise')\n")
+    with monkeypatch.context() as m:
+        m.setenv("PYTHONPATH", str(site))
+        _restart_helper()
+        try:
+            for _ in range(2):
+                returncode, output = _run(tmp_path, "def test_ok():\n    pass\n")
+                assert returncode == 0
+                assert "1 passed" in output
+        finally:
+            _restart_helper()
+
+
+def test_run_restarts_helper_after_protocol_error(tmp_path, monkeypatch):
+    """Test a garbled reply fails that run and the next run uses a fresh helper"""
+    _run(tmp_path, "def test_ok():\n    pass\n")
+    helper = pytest_runner._helper
+
+    def garbled(replies):
+        raise ValueError("invalid literal for int()")
+
+    with monkeypatch.context() as m:
+        m.setattr(pytest_runner, "_read_reply", garbled)
+        with pytest.raises(RuntimeError):
+            _run(tmp_path, "def test_ok():\n    pass\n")
+    assert helper is not None and helper.poll() is not None
+
+    returncode, _ = _run(tmp_path, "def test_ok():\n    pass\n")
+    assert returncode == 0
+    assert pytest_runner._helper is not helper
@@ -0,0 +1,84 @@
+import os
+
+from deepagent_coder.utils import result_cache
+from deepagent_coder.utils.result_cache import ResultCache
+
+
+def test_lookup_misses_then_hits(tmp_path):
+    cache = ResultCache(tmp_path / "results.db")
+    source = tmp_path / "a.py"
+    source.write_text("x = 1\n")
+    os.utime(source, (1, 1))
+
+    fingerprint, cached = cache.lookup("tool", str(source))
+    assert cached is None
+    cache.store("tool", str(source), fingerprint, {"issues": [1]})
+
+    assert cache.lookup("tool", str(source))[1] == {"issues": [1]}
+    assert cache.lookup("other-tool", str(source))[1] is None
+
+
+def test_touched_file_hits_by_digest(tmp_path):
+    cache = ResultCache(tmp_path / "results.db")
+    source = tmp_path / "a.py"
+    source.write_text("x = 1\n")
+    os.utime(source, (1, 1))
+    fingerprint, _ = cache.lookup("tool", str(source))
+    cache.store("tool", str(source), fingerprint, "result")
+
+    os.utime(source, (2, 2))
+
+    assert cache.lookup("tool", str(source))[1] == "result"
+
+
+def test_changed_file_misses(tmp_path):
+    cache = ResultCache(tmp_path / "results.db")
+    source = tmp_path / "a.py"
+    source.write_text("x = 1\n")
+    os.utime(source, (1, 1))
+    fingerprint, _ = cache.lookup("tool", str(source))
+    cache.store("tool", str(source), fingerprint, "result")
+
+    source.write_text("x = 22\n")
+
+    assert cache.lookup("tool", str(source))[1] is None
+
+
+def test_expired_and_excess_results_are_dropped(tmp_path, monkeypatch):
+    monkeypatch.setattr(result_cache, "MAX_ENTRIES", 2)
+    cache = ResultCache(tmp_path / "results.db")
+    sources = []
+    for i in range(3):
+        source = tmp_path / f"{i}.py"
+        source.write_text(f"x = {i}\n")
+        fingerprint, _ = cache.lookup("tool", str(source))
+        cache.store("tool", str(source), fingerprint, i)
+        sources.append(source)
+
+    assert cache.lookup("tool", str(sources[0]))[1] is None
+    assert cache.lookup("tool", str(sources[2]))[1] == 2
+
+    monkeypatch.setattr(result_cache, "TTL_SECONDS", -1)
+    assert cache.lookup("tool", str(sources[2]))[1] is None
+
+
+def test_lookup_many_and_store_many(tmp_path):
+    cache = ResultCache(tmp_path / "results.db")
+    sources = []
+    for i in range(3):
+        source = tmp_path / f"{i}.py"
+        source.write_text(f"x = {i}\n")
+        os.utime(source, (1, 1))
+        sources.append(str(source))
+
+    lookups = cache.lookup_many([("tool", source) for source in sources])
+    assert [cached for _, cached in lookups] == [None, None, None]
+    cache.store_many(
+        [
+            ("tool", source, fingerprint, i)
+            for i, (source, (fingerprint, _)) in enumerate(zip(sources, lookups, strict=True))
+        ]
+    )
+
+    lookups = cache.lookup_many([("tool", source) for source in sources] + [("other", sources[0])])
+    assert [cached for _, cached in lookups] == [0, 1, 2, None]
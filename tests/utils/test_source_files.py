@@ -0,0 +1,15 @@
+"""Tests for finding Python source files"""
+
+from deepagent_coder.utils.source_files import iter_python_files
+
+
+def test_iter_python_files_skips_vendored_and_linked_dirs(tmp_path):
+    """Test only project .py files are found, outside skipped and symlinked directories"""
+    (tmp_path / "pkg").mkdir()
+    (tmp_path / "pkg" / "mod.py").write_text("")
+    (tmp_path / "pkg" / "notes.txt").write_text("")
+    (tmp_path / ".venv" / "lib").mkdir(parents=True)
+    (tmp_path / ".venv" / "lib" / "dep.py").write_text("")
+    (tmp_path / "linked").symlink_to(tmp_path / "pkg")
+
+    assert list(iter_python_files(str(tmp_path))) == [str(tmp_path / "pkg" / "mod.py")]
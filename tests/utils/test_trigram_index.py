@@ -0,0 +1,57 @@
+import os
+
+import pytest
+
+from deepagent_coder.utils.trigram_index import TrigramIndex, trigrams
+
+
+@pytest.fixture
+def tree(tmp_path):
+    root = tmp_path / "tree"
+    (root / "pkg").mkdir(parents=True)
+    (root / "pkg" / "a.py").write_text("def needle():\n    pass\n")
+    (root / "pkg" / "b.py").write_text("def haystack():\n    pass\n")
+    (root / "c.txt").write_text("NEEDLE in caps\n")
+    return root
+
+
+def test_trigrams_fold_ascii_case():
+    assert trigrams(b"AbCd") == trigrams(b"abcd")
+    assert len(trigrams(b"abcd")) == 2
+    assert trigrams(b"ab") == set()
+
+
+def test_candidates_narrow_to_matching_files(tree, tmp_path):
+    index = TrigramIndex(tmp_path / "index.db")
+
+    candidates = index.candidates(str(tree), "needle")
+
+    assert candidates == [str(tree / "c.txt"), str(tree / "pkg" / "a.py")]
+
+
+def test_candidates_follow_changes(tree, tmp_path):
+    index = TrigramIndex(tmp_path / "index.db")
+    index.candidates(str(tree), "needle")
+
+    (tree / "pkg" / "b.py").write_text("needle = 1\n")
+    os.utime(tree / "pkg" / "b.py", (1, 1))
+    (tree / "c.txt").unlink()
+
+    candidates = index.candidates(str(tree), "needle")
+
+    assert candidates == [str(tree / "pkg" / "a.py"), str(tree / "pkg" / "b.py")]
+
+
+def test_candidates_keep_unindexed_large_files(tree, tmp_path, monkeypatch):
+    monkeypatch.setattr("deepagent_coder.utils.trigram_index.MAX_INDEXED_BYTES", 20)
+    index = TrigramIndex(tmp_path / "index.db")
+
+    candidates = index.candidates(str(tree), "zzz")
+
+    # Both .py files are over the limit, so they cannot be ruled out
+    assert candidates == [str(tree / "pkg" / "a.py"), str(tree / "pkg" / "b.py")]
+
+
+def test_candidates_reject_short_patterns(tree, tmp_path):
+    with pytest.raises(ValueError):
+        TrigramIndex(tmp_path / "index.db").candidates(str(tree), "ab")
@@ -0,0 +1,34 @@
+"""Tests for the cached command lookup"""
+
+import os
+
+from deepagent_coder.utils.which import which
+
+
+def _make_tool(directory, name):
+    tool = directory / name
+    tool.write_text("#!/bin/sh\n")
+    tool.chmod(0o755)
+    return str(tool)
+
+
+def test_which_finds_tools_installed_later(tmp_path, monkeypatch):
+    """Test a miss is not remembered, so a tool installed mid-session is found"""
+    monkeypatch.setenv("PATH", str(tmp_path))
+    assert which("late-tool") is None
+
+    tool = _make_tool(tmp_path, "late-tool")
+    assert which("late-tool") == tool
+
+
+def test_which_follows_path_changes(tmp_path, monkeypatch):
+    """Test a remembered hit is only reused under the same PATH"""
+    first, second = tmp_path / "first", tmp_path / "second"
+    first.mkdir()
+    second.mkdir()
+    _make_tool(first, "tool")
+    monkeypatch.setenv("PATH", str(first))
+    assert which("tool") == os.path.join(first, "tool")
+
+    monkeypatch.setenv("PATH", str(second))
+    assert which("tool") is None